@@ -0,0 +1,147 @@
+import importlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pytest
+
+from benchmarks.fake_pachd import FakePachd
+from benchmarks.scenario import Scenario
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+# injected latency (in seconds) of every call served by the fake pachd
+PACHD_LATENCY = float(os.getenv("PACHD_LATENCY", 0))
+
+# set to rewrite the budgets from the current measurements
+BENCHMARK_RECORD = os.getenv("BENCHMARK_RECORD", "").lower() in ("1", "true", "yes")
+
+# headroom granted when recording (RPC counts are deterministic and recorded as is)
+SECONDS_MARGIN = 3.0
+SECONDS_FLOOR = 0.5
+PEAK_MARGIN = 1.5
+PEAK_FLOOR = 1024 * 1024
+
+os.environ.setdefault("TOKEN", "BENCHMARK")
+os.environ.setdefault("CLOUD_PROVIDER", "LOCAL")
+os.environ.setdefault("SERVICE_HOSTNAME", "localhost")
+os.environ.setdefault("CONTENT_CACHE_DIR", tempfile.mkdtemp(prefix="kaos-benchmark-cache-"))
+os.environ.setdefault("JOB_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="kaos-benchmark-jobs-"), "jobs.sqlite"))
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="kaos-benchmark-metrics-"))
+
+# measurements of the session, by route
+MEASUREMENTS = {}
+
+
+class Measurement:
+
+    def __init__(self, status: int, rpcs: int, seconds: float, peak: int):
+        self.status = status
+        self.rpcs = rpcs
+        self.seconds = seconds
+        self.peak = peak
+
+    def to_budget(self):
+        return {
+            "rpcs": self.rpcs,
+            "seconds": round(max(self.seconds * SECONDS_MARGIN, SECONDS_FLOOR), 3),
+            "peak_bytes": int(max(self.peak * PEAK_MARGIN, self.peak + PEAK_FLOOR))
+        }
+
+
+def load_budgets():
+    if not os.path.exists(BUDGETS_PATH):
+        return {"latency": PACHD_LATENCY, "routes": {}}
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def pachd():
+    server = FakePachd(latency=PACHD_LATENCY)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def backend(pachd):
+    # the app connects to pachd when its module is imported
+    os.environ["PACHD_SERVICE_HOST"] = "localhost"
+    os.environ["PACHD_SERVICE_PORT_API_GRPC_PORT"] = str(pachd.port)
+    return importlib.import_module("kaos_backend.app")
+
+
+@pytest.fixture()
+def scenario(pachd, backend):
+    pachd.reset()
+    reset_caches(backend)
+    headers = {"X-Token": os.getenv("TOKEN")}
+    return Scenario(pachd, backend.app.test_client(), headers).seed()
+
+
+@pytest.fixture(scope="session")
+def budgets():
+    return load_budgets()
+
+
+def reset_caches(backend, content=True):
+    client = backend.pachyderm_client
+    with backend.app.app_context():
+        client.invalidate_metadata()
+        client.job_index.clear()
+        client.bundle_index.clear()
+        client.commit_index.clear()
+    if content and client.content_cache is not None:
+        client.content_cache.clear()
+        client.finished_commits.clear()
+    if content and backend.job_store is not None:
+        backend.job_store.clear()
+
+
+def measure(scenario: Scenario, backend, method: str, path: str, warm: bool = False, **kwargs):
+    """
+    Serves a single request (with cold caches) and measures the calls it issued to pachd, its wall time and the peak of
+    memory allocated while serving it (the in-process pachd included).
+
+    With `warm`, the request is served once beforehand and only the metadata caches are reset in between (as when the
+    same content or finished job is read again after the metadata snapshot expired).
+    """
+    reset_caches(backend)
+    if warm:
+        backend.app.test_client().open(path, method=method, headers=scenario.headers, **kwargs)
+        reset_caches(backend, content=False)
+    client = backend.app.test_client()
+    scenario.pachd.reset_calls()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        response = client.open(path, method=method, headers=scenario.headers, **kwargs)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(response.status_code, scenario.pachd.call_count, seconds, peak), response
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not MEASUREMENTS:
+        return
+
+    terminalreporter.section("route benchmarks")
+    terminalreporter.write_line(f"{'route':<60} {'rpcs':>6} {'seconds':>9} {'peak KiB':>10}")
+    for name, m in sorted(MEASUREMENTS.items()):
+        terminalreporter.write_line(f"{name:<60} {m.rpcs:>6} {m.seconds:>9.3f} {m.peak / 1024:>10.0f}")
+
+    if BENCHMARK_RECORD:
+        budgets = load_budgets()
+        budgets["latency"] = PACHD_LATENCY
+        budgets["routes"].update({name: m.to_budget() for name, m in MEASUREMENTS.items()})
+        with open(BUDGETS_PATH, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        terminalreporter.write_line(f"budgets recorded in {BUDGETS_PATH}")
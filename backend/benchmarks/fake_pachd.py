@@ -0,0 +1,782 @@
+import hashlib
+import inspect
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+from google.protobuf import empty_pb2, wrappers_pb2
+from google.protobuf.timestamp_pb2 import Timestamp
+from python_pachyderm.client.pfs import pfs_pb2 as pfs_proto
+from python_pachyderm.client.pfs import pfs_pb2_grpc as pfs_grpc
+from python_pachyderm.client.pps import pps_pb2 as pps_proto
+from python_pachyderm.client.pps import pps_pb2_grpc as pps_grpc
+
+# size of the chunks streamed by GetFile (same as pachd)
+CHUNK_SIZE = 3 * 1024 * 1024
+
+STATS_BRANCH = "stats"
+
+
+class FakePachdError(Exception):
+
+    def __init__(self, code: grpc.StatusCode, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def not_found(message: str):
+    return FakePachdError(grpc.StatusCode.NOT_FOUND, message)
+
+
+def timestamp(t: float = None):
+    ts = Timestamp()
+    ts.FromNanoseconds(int((time.time() if t is None else t) * 1e9))
+    return ts
+
+
+def normalize(path: str):
+    path = "/" + path.strip("/")
+    return re.sub("/+", "/", path)
+
+
+def glob_to_regex(pattern: str):
+    """
+    Translates a Pachyderm glob (`*` stays within a directory, `**` crosses directories) into a regex
+    """
+    regex = ""
+    i = 0
+    pattern = normalize(pattern)
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if c == "*":
+            regex += "[^/]*"
+        elif c == "?":
+            regex += "[^/]"
+        elif c == "[":
+            end = pattern.find("]", i)
+            if end < 0:
+                regex += re.escape(c)
+            else:
+                regex += pattern[i:end + 1]
+                i = end
+        else:
+            regex += re.escape(c)
+        i += 1
+    return re.compile(regex + "$")
+
+
+def is_glob(path: str):
+    return any(c in path for c in "*?[")
+
+
+class _File:
+    __slots__ = ("key", "size", "commit_id")
+
+    def __init__(self, key: str, size: int, commit_id: str):
+        self.key = key
+        self.size = size
+        self.commit_id = commit_id
+
+
+class _Commit:
+
+    def __init__(self, repo: str, commit_id: str, parent, branch: str, description: str, provenance: list):
+        self.repo = repo
+        self.id = commit_id
+        self.parent = parent
+        self.branch = branch
+        self.description = description
+        self.provenance = provenance
+        self.started = time.time()
+        self.finished = None
+        # files are inherited from the parent commit (copy-on-write of the mapping only)
+        self.files = dict(parent.files) if parent else {}
+
+    @property
+    def size_bytes(self):
+        return sum(f.size for f in self.files.values())
+
+
+class _Repo:
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.created = time.time()
+        self.commits = OrderedDict()
+        self.branches = OrderedDict()
+
+
+class FakePachd:
+    """
+    In-process Pachyderm daemon speaking the PFS/PPS gRPC APIs used by `PachydermClient`.
+
+    State lives in memory (file contents optionally on disk) and every call is delayed by `latency` seconds, to emulate
+    the round-trip to a real cluster. Pipelines never run: jobs and datums are seeded with `add_job`.
+    """
+
+    def __init__(self, latency: float = 0.0, data_dir: str = None):
+        """
+        FakePachd constructor.
+
+        Args:
+            latency (float): delay (in seconds) injected before serving each call
+            data_dir (str): directory storing file contents (in memory if None)
+        """
+        self.latency = latency
+        self.data_dir = data_dir
+        self.lock = threading.RLock()
+        self.calls = {}
+        self.server = None
+        self.port = None
+        self.reset()
+
+    # lifecycle
+
+    def start(self, port: int = 0, max_workers: int = 64):
+        self.server = grpc.server(ThreadPoolExecutor(max_workers=max_workers),
+                                  options=[("grpc.max_receive_message_length", -1)])
+        pfs_grpc.add_APIServicer_to_server(_PfsServicer(self), self.server)
+        pps_grpc.add_APIServicer_to_server(_PpsServicer(self), self.server)
+        self.port = self.server.add_insecure_port(f"localhost:{port}")
+        self.server.start()
+        return self.port
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop(None)
+            self.server = None
+
+    def reset(self):
+        with self.lock:
+            self.repos = OrderedDict()
+            self.pipelines = OrderedDict()
+            self.jobs = OrderedDict()
+            self.datums = {}
+            self.logs = {}
+            self.blobs = {}
+        self.reset_calls()
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls = {}
+
+    @property
+    def call_count(self):
+        return sum(self.calls.values())
+
+    def record_call(self, method: str):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # file contents
+
+    def store(self, data: bytes):
+        key = hashlib.sha256(data).hexdigest()
+        if self.data_dir is None:
+            self.blobs[key] = data
+        else:
+            path = os.path.join(self.data_dir, key)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(data)
+        return key
+
+    def load(self, key: str):
+        if self.data_dir is None:
+            return self.blobs[key]
+        with open(os.path.join(self.data_dir, key), "rb") as f:
+            return f.read()
+
+    # PFS state
+
+    def repo(self, name: str):
+        try:
+            return self.repos[name]
+        except KeyError:
+            raise not_found(f"repo {name} not found")
+
+    def create_repo(self, name: str, description: str = "", update: bool = False):
+        with self.lock:
+            if name in self.repos:
+                if not update:
+                    raise FakePachdError(grpc.StatusCode.ALREADY_EXISTS, f"repo {name} already exists")
+                self.repos[name].description = description
+            else:
+                self.repos[name] = _Repo(name, description)
+            return self.repos[name]
+
+    def resolve(self, repo_name: str, ref: str, headless: bool = False):
+        """
+        Resolves a commit id or branch name into a commit (None for a branch without commits, if `headless`)
+        """
+        with self.lock:
+            repo = self.repo(repo_name)
+            commit_id = repo.branches.get(ref, ref)
+            if commit_id is None and headless:
+                return None
+            if commit_id is None or commit_id not in repo.commits:
+                raise not_found(f"commit {ref} not found in repo {repo_name}")
+            return repo.commits[commit_id]
+
+    def start_commit(self, repo_name: str, branch: str = "", parent: str = "", description: str = "",
+                     provenance: list = ()):
+        with self.lock:
+            repo = self.repo(repo_name)
+            parent_commit = None
+            if parent:
+                parent_commit = self.resolve(repo_name, parent)
+            elif branch and repo.branches.get(branch):
+                parent_commit = repo.commits[repo.branches[branch]]
+            commit = _Commit(repo_name, uuid.uuid4().hex, parent_commit, branch, description, list(provenance))
+            repo.commits[commit.id] = commit
+            if branch:
+                repo.branches[branch] = commit.id
+            return commit
+
+    def finish_commit(self, repo_name: str, ref: str, description: str = None):
+        with self.lock:
+            commit = self.resolve(repo_name, ref)
+            if description:
+                commit.description = description
+            commit.finished = time.time()
+            return commit
+
+    def put_file(self, repo_name: str, ref: str, path: str, data: bytes, delimiter=pfs_proto.NONE):
+        with self.lock:
+            commit = self.resolve(repo_name, ref)
+            path = normalize(path)
+            if delimiter == pfs_proto.LINE:
+                # one file per line, named after the line index (as pachd does)
+                for i, line in enumerate(data.splitlines(keepends=True)):
+                    commit.files[f"{path}/{i:016x}"] = _File(self.store(line), len(line), commit.id)
+            else:
+                commit.files[path] = _File(self.store(data), len(data), commit.id)
+
+    def commit_files(self, repo_name: str, branch: str, files: dict, description: str = "", provenance: list = (),
+                     inherit: bool = True, finished: bool = True):
+        """
+        Seeds a commit on `branch` with `files` (path -> bytes) and returns its id.
+
+        `provenance` holds the (repo, commit id, branch) the commit derives from. Output commits of pipelines hold the
+        output of their job only (`inherit=False`), input commits add files on top of their parent.
+        """
+        with self.lock:
+            if repo_name not in self.repos:
+                self.create_repo(repo_name)
+            commit = self.start_commit(repo_name, branch, description=description, provenance=provenance)
+            if not inherit:
+                commit.files = {}
+            for path, data in files.items():
+                self.put_file(repo_name, commit.id, path, data)
+            if finished:
+                commit.finished = time.time()
+            return commit.id
+
+    def file_infos(self, commit: _Commit, path: str, children: bool):
+        """
+        Lists the files (and implicit directories) matched by `path`: a glob, a file or the children of a directory
+        """
+        if is_glob(path):
+            regex = glob_to_regex(path)
+            return [info for p, info in self.__tree(commit).items() if regex.match(p)]
+
+        path = normalize(path)
+        tree = self.__tree(commit)
+        if path not in tree:
+            raise not_found(f"file {path.lstrip('/')} not found in repo {commit.repo} at commit {commit.id}")
+        info = tree[path]
+        if info.file_type == pfs_proto.DIR and children:
+            prefix = path.rstrip("/") + "/"
+            return [i for p, i in tree.items() if p != path and p.startswith(prefix) and "/" not in p[len(prefix):]]
+        return [info]
+
+    def __tree(self, commit: _Commit):
+        tree = OrderedDict()
+        dirs = {}
+        for path in sorted(commit.files):
+            f = commit.files[path]
+            tree[path] = self.file_info(commit, path, pfs_proto.FILE, f.size, f.commit_id)
+            parent = os.path.dirname(path)
+            while True:
+                size, commit_id = dirs.get(parent, (0, f.commit_id))
+                dirs[parent] = (size + f.size, max(commit_id, f.commit_id, key=self.__commit_order(commit)))
+                if parent == "/":
+                    break
+                parent = os.path.dirname(parent)
+
+        for path, (size, commit_id) in dirs.items():
+            tree[path] = self.file_info(commit, path, pfs_proto.DIR, size, commit_id)
+        return OrderedDict(sorted(tree.items()))
+
+    def __commit_order(self, commit: _Commit):
+        order = {c: i for i, c in enumerate(self.repos[commit.repo].commits)}
+        return lambda commit_id: order.get(commit_id, -1)
+
+    @staticmethod
+    def file_info(commit: _Commit, path: str, file_type: int, size: int, commit_id: str):
+        return pfs_proto.FileInfo(
+            file=pfs_proto.File(commit=pfs_proto.Commit(repo=pfs_proto.Repo(name=commit.repo), id=commit_id),
+                                path=path),
+            file_type=file_type,
+            size_bytes=size)
+
+    def commit_info(self, commit: _Commit):
+        info = pfs_proto.CommitInfo(
+            commit=pfs_proto.Commit(repo=pfs_proto.Repo(name=commit.repo), id=commit.id),
+            description=commit.description,
+            started=timestamp(commit.started),
+            size_bytes=commit.size_bytes,
+            provenance=[pfs_proto.CommitProvenance(
+                commit=pfs_proto.Commit(repo=pfs_proto.Repo(name=repo), id=commit_id),
+                branch=pfs_proto.Branch(repo=pfs_proto.Repo(name=repo), name=branch))
+                for repo, commit_id, branch in commit.provenance])
+        if commit.branch:
+            info.branch.CopyFrom(pfs_proto.Branch(repo=pfs_proto.Repo(name=commit.repo), name=commit.branch))
+        if commit.parent:
+            info.parent_commit.CopyFrom(pfs_proto.Commit(repo=pfs_proto.Repo(name=commit.repo), id=commit.parent.id))
+        if commit.finished:
+            info.finished.CopyFrom(timestamp(commit.finished))
+        return info
+
+    # PPS state
+
+    def pipeline(self, name: str):
+        try:
+            return self.pipelines[name]
+        except KeyError:
+            raise not_found(f"pipeline {name} not found")
+
+    def create_pipeline(self, request: pps_proto.CreatePipelineRequest):
+        name = request.pipeline.name
+        with self.lock:
+            if name in self.pipelines and not request.update:
+                raise FakePachdError(grpc.StatusCode.ALREADY_EXISTS, f"pipeline {name} already exists")
+
+            previous = self.pipelines.get(name)
+            info = pps_proto.PipelineInfo(
+                id=uuid.uuid4().hex,
+                pipeline=request.pipeline,
+                version=previous.version + 1 if previous else 1,
+                transform=request.transform,
+                parallelism_spec=request.parallelism_spec,
+                created_at=previous.created_at if previous else timestamp(),
+                state=pps_proto.PIPELINE_STANDBY if request.standby else pps_proto.PIPELINE_RUNNING,
+                output_branch=request.output_branch or "master",
+                resource_requests=request.resource_requests,
+                resource_limits=request.resource_limits,
+                input=request.input,
+                description=request.description,
+                enable_stats=request.enable_stats,
+                service=request.service,
+                standby=request.standby,
+                datum_tries=request.datum_tries)
+            self.pipelines[name] = info
+
+            # output repo (and branches) owned by the pipeline
+            repo = self.create_repo(name, update=True)
+            repo.branches.setdefault(info.output_branch, None)
+            if request.enable_stats:
+                repo.branches.setdefault(STATS_BRANCH, None)
+
+            # input branches are created (without commits) if missing
+            for pfs_input in self.__pfs_inputs(request.input):
+                if pfs_input.repo in self.repos:
+                    self.repos[pfs_input.repo].branches.setdefault(pfs_input.branch or "master", None)
+            return info
+
+    def __pfs_inputs(self, pps_input: pps_proto.Input):
+        if pps_input.HasField("pfs"):
+            yield pps_input.pfs
+        for child in list(pps_input.cross) + list(pps_input.union):
+            yield from self.__pfs_inputs(child)
+
+    def delete_pipeline(self, name: str):
+        with self.lock:
+            self.pipeline(name)
+            del self.pipelines[name]
+            self.repos.pop(name, None)
+            for job_id in [j for j, job in self.jobs.items() if job.pipeline.name == name]:
+                self.delete_job(job_id)
+
+    def add_job(self, pipeline: str, state=pps_proto.JOB_SUCCESS, output_commit: str = None, datums: list = (),
+                stats_commit: str = None, data_skipped: int = 0, duration: int = 60, logs: list = ()):
+        """
+        Seeds a job of `pipeline` and returns its id.
+
+        Args:
+            pipeline (str): pipeline name
+            state (int): job state
+            output_commit (str): id of the output commit (in the pipeline repo)
+            datums (list): inputs of each datum, as lists of (repo, commit id, path)
+            stats_commit (str): id of the commit on the stats branch (if any)
+            data_skipped (int): number of skipped datums
+            duration (int): run time in seconds
+            logs (list): log lines of the job
+
+        """
+        with self.lock:
+            self.pipeline(pipeline)
+            job_id = uuid.uuid4().hex
+            started = time.time()
+            n_datums = len(datums) + data_skipped
+            done = state in (pps_proto.JOB_SUCCESS, pps_proto.JOB_FAILURE, pps_proto.JOB_KILLED)
+            job = pps_proto.JobInfo(
+                job=pps_proto.Job(id=job_id),
+                pipeline=pps_proto.Pipeline(name=pipeline),
+                started=timestamp(started),
+                state=state,
+                output_repo=pfs_proto.Repo(name=pipeline),
+                output_branch=self.pipelines[pipeline].output_branch,
+                data_processed=len(datums) if done else 0,
+                data_skipped=data_skipped,
+                data_total=n_datums,
+                stats=pps_proto.ProcessStats())
+            job.stats.process_time.FromSeconds(duration)
+            if done:
+                job.finished.CopyFrom(timestamp(started + duration))
+            if output_commit:
+                job.output_commit.CopyFrom(pfs_proto.Commit(repo=pfs_proto.Repo(name=pipeline), id=output_commit))
+            if stats_commit:
+                job.stats_commit.CopyFrom(pfs_proto.Commit(repo=pfs_proto.Repo(name=pipeline), id=stats_commit))
+
+            # newest first
+            self.jobs[job_id] = job
+            self.jobs.move_to_end(job_id, last=False)
+
+            self.datums[job_id] = [self.__datum_info(job_id, inputs, done) for inputs in datums]
+            self.logs[job_id] = [pps_proto.LogMessage(pipeline_name=pipeline, job_id=job_id, message=line,
+                                                      ts=timestamp(started)) for line in logs]
+            return job_id
+
+    @staticmethod
+    def datum_id(inputs: list):
+        """
+        Id of the datum made of `inputs` (deterministic, so outputs keyed by datum can be seeded before the job)
+        """
+        return hashlib.sha256(repr(list(inputs)).encode()).hexdigest()[:32]
+
+    def __datum_info(self, job_id: str, inputs: list, done: bool):
+        datum_id = self.datum_id(inputs)
+        data = []
+        for repo, commit_id, path in inputs:
+            commit = self.resolve(repo, commit_id)
+            f = commit.files.get(normalize(path))
+            data.append(self.file_info(commit, normalize(path), pfs_proto.FILE if f else pfs_proto.DIR,
+                                       f.size if f else 0, commit.id))
+        return pps_proto.DatumInfo(datum=pps_proto.Datum(id=datum_id, job=pps_proto.Job(id=job_id)),
+                                   state=pps_proto.SUCCESS if done else pps_proto.STARTING,
+                                   data=data)
+
+    def job(self, job_id: str):
+        try:
+            return self.jobs[job_id]
+        except KeyError:
+            raise not_found(f"job {job_id} not found")
+
+    def delete_job(self, job_id: str):
+        with self.lock:
+            self.job(job_id)
+            del self.jobs[job_id]
+            self.datums.pop(job_id, None)
+            self.logs.pop(job_id, None)
+
+    def set_pipeline_state(self, pipeline: str, state: int):
+        with self.lock:
+            self.pipeline(pipeline).state = state
+
+    def add_pipeline_logs(self, pipeline: str, lines: list):
+        with self.lock:
+            self.logs[pipeline] = [pps_proto.LogMessage(pipeline_name=pipeline, message=line, ts=timestamp())
+                                   for line in lines]
+
+
+def _serve(method):
+    """
+    Counts the call, injects latency and translates `FakePachdError` into a gRPC status
+    """
+    name = method.__name__
+
+    def unary(self, request, context):
+        self.pachd.record_call(name)
+        try:
+            return method(self, request, context)
+        except FakePachdError as e:
+            context.abort(e.code, e.message)
+
+    def streaming(self, request, context):
+        self.pachd.record_call(name)
+        try:
+            yield from method(self, request, context)
+        except FakePachdError as e:
+            context.abort(e.code, e.message)
+
+    return streaming if inspect.isgeneratorfunction(method) else unary
+
+
+class _PfsServicer(pfs_grpc.APIServicer):
+
+    def __init__(self, pachd: FakePachd):
+        self.pachd = pachd
+
+    @_serve
+    def CreateRepo(self, request, context):
+        self.pachd.create_repo(request.repo.name, request.description, request.update)
+        return empty_pb2.Empty()
+
+    @_serve
+    def InspectRepo(self, request, context):
+        with self.pachd.lock:
+            repo = self.pachd.repo(request.repo.name)
+            return self.__repo_info(repo)
+
+    @_serve
+    def ListRepo(self, request, context):
+        with self.pachd.lock:
+            return pfs_proto.ListRepoResponse(repo_info=[self.__repo_info(r) for r in self.pachd.repos.values()])
+
+    def __repo_info(self, repo: _Repo):
+        head_sizes = [repo.commits[c].size_bytes for c in repo.branches.values() if c]
+        return pfs_proto.RepoInfo(repo=pfs_proto.Repo(name=repo.name), created=timestamp(repo.created),
+                                  size_bytes=max(head_sizes, default=0), description=repo.description,
+                                  branches=[pfs_proto.Branch(repo=pfs_proto.Repo(name=repo.name), name=b)
+                                            for b in repo.branches])
+
+    @_serve
+    def DeleteRepo(self, request, context):
+        with self.pachd.lock:
+            if request.all:
+                self.pachd.repos.clear()
+            elif request.repo.name in self.pachd.repos:
+                del self.pachd.repos[request.repo.name]
+            elif not request.force:
+                raise not_found(f"repo {request.repo.name} not found")
+        return empty_pb2.Empty()
+
+    @_serve
+    def StartCommit(self, request, context):
+        provenance = [(p.commit.repo.name, p.commit.id, p.branch.name) for p in request.provenance]
+        commit = self.pachd.start_commit(request.parent.repo.name, request.branch, request.parent.id,
+                                         request.description, provenance)
+        return pfs_proto.Commit(repo=pfs_proto.Repo(name=commit.repo), id=commit.id)
+
+    @_serve
+    def FinishCommit(self, request, context):
+        self.pachd.finish_commit(request.commit.repo.name, request.commit.id, request.description)
+        return empty_pb2.Empty()
+
+    @_serve
+    def InspectCommit(self, request, context):
+        with self.pachd.lock:
+            return self.pachd.commit_info(self.pachd.resolve(request.commit.repo.name, request.commit.id))
+
+    @_serve
+    def ListCommitStream(self, request, context):
+        with self.pachd.lock:
+            repo = self.pachd.repo(request.repo.name)
+            if request.to.id:
+                commits = []
+                commit = self.pachd.resolve(repo.name, request.to.id)
+                while commit is not None:
+                    commits.append(commit)
+                    commit = commit.parent
+            else:
+                commits = list(reversed(repo.commits.values()))
+            if request.number:
+                commits = commits[:request.number]
+            infos = [self.pachd.commit_info(c) for c in commits]
+        yield from infos
+
+    @_serve
+    def CreateBranch(self, request, context):
+        with self.pachd.lock:
+            repo = self.pachd.repo(request.branch.repo.name)
+            head = None
+            if request.head.id:
+                head = self.pachd.resolve(repo.name, request.head.id).id
+            repo.branches[request.branch.name] = head or repo.branches.get(request.branch.name)
+        return empty_pb2.Empty()
+
+    @_serve
+    def ListBranch(self, request, context):
+        with self.pachd.lock:
+            repo = self.pachd.repo(request.repo.name)
+            infos = []
+            for name, head in repo.branches.items():
+                info = pfs_proto.BranchInfo(branch=pfs_proto.Branch(repo=pfs_proto.Repo(name=repo.name), name=name),
+                                            name=name)
+                if head:
+                    info.head.CopyFrom(pfs_proto.Commit(repo=pfs_proto.Repo(name=repo.name), id=head))
+                infos.append(info)
+            return pfs_proto.BranchInfos(branch_info=infos)
+
+    @_serve
+    def PutFile(self, request_iterator, context):
+        # a request naming a file starts a new one (several files can be put by a single stream)
+        target = None
+        chunks = []
+        for request in request_iterator:
+            if request.HasField("file"):
+                self.__put_file(target, chunks)
+                target, chunks = request, []
+            chunks.append(request.value)
+        self.__put_file(target, chunks)
+        return empty_pb2.Empty()
+
+    def __put_file(self, target, chunks: list):
+        if target is not None:
+            self.pachd.put_file(target.file.commit.repo.name, target.file.commit.id, target.file.path,
+                                b"".join(chunks), target.delimiter)
+
+    @_serve
+    def GetFile(self, request, context):
+        with self.pachd.lock:
+            commit = self.pachd.resolve(request.file.commit.repo.name, request.file.commit.id)
+            infos = [i for i in self.pachd.file_infos(commit, request.file.path, children=False)
+                     if i.file_type == pfs_proto.FILE]
+            if not infos:
+                raise not_found(f"file {request.file.path} not found in repo {commit.repo} at commit {commit.id}")
+            keys = [commit.files[i.file.path].key for i in infos]
+
+        data = b"".join(self.pachd.load(key) for key in keys)
+        end = request.offset_bytes + request.size_bytes if request.size_bytes else len(data)
+        data = data[request.offset_bytes:end]
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield wrappers_pb2.BytesValue(value=data[offset:offset + CHUNK_SIZE])
+
+    @_serve
+    def InspectFile(self, request, context):
+        with self.pachd.lock:
+            commit = self.pachd.resolve(request.file.commit.repo.name, request.file.commit.id)
+            return self.pachd.file_infos(commit, request.file.path, children=False)[0]
+
+    @_serve
+    def ListFileStream(self, request, context):
+        with self.pachd.lock:
+            commit = self.pachd.resolve(request.file.commit.repo.name, request.file.commit.id, headless=True)
+            # listing a missing path yields nothing (as pachd 1.9 does)
+            infos = self.__existing(commit, request.file.path or "/", children=True)
+        yield from infos
+
+    @_serve
+    def GlobFileStream(self, request, context):
+        with self.pachd.lock:
+            commit = self.pachd.resolve(request.commit.repo.name, request.commit.id, headless=True)
+            infos = self.__existing(commit, request.pattern, children=False)
+        yield from infos
+
+    def __existing(self, commit: _Commit, path: str, children: bool):
+        if commit is None:
+            return []
+        try:
+            return self.pachd.file_infos(commit, path, children=children)
+        except FakePachdError:
+            return []
+
+    @_serve
+    def DeleteAll(self, request, context):
+        with self.pachd.lock:
+            self.pachd.repos.clear()
+        return empty_pb2.Empty()
+
+
+class _PpsServicer(pps_grpc.APIServicer):
+
+    def __init__(self, pachd: FakePachd):
+        self.pachd = pachd
+
+    @_serve
+    def CreatePipeline(self, request, context):
+        self.pachd.create_pipeline(request)
+        return empty_pb2.Empty()
+
+    @_serve
+    def InspectPipeline(self, request, context):
+        with self.pachd.lock:
+            return self.pachd.pipeline(request.pipeline.name)
+
+    @_serve
+    def ListPipeline(self, request, context):
+        with self.pachd.lock:
+            infos = list(self.pachd.pipelines.values())
+        if request.pipeline.name:
+            infos = [i for i in infos if i.pipeline.name == request.pipeline.name]
+        return pps_proto.PipelineInfos(pipeline_info=infos)
+
+    @_serve
+    def DeletePipeline(self, request, context):
+        with self.pachd.lock:
+            names = list(self.pachd.pipelines) if request.all else [request.pipeline.name]
+            for name in names:
+                self.pachd.delete_pipeline(name)
+        return empty_pb2.Empty()
+
+    @_serve
+    def ListJobStream(self, request, context):
+        with self.pachd.lock:
+            jobs = [j for j in self.pachd.jobs.values()
+                    if not request.pipeline.name or j.pipeline.name == request.pipeline.name]
+            if request.pipeline.name:
+                self.pachd.pipeline(request.pipeline.name)
+        yield from jobs
+
+    @_serve
+    def InspectJob(self, request, context):
+        with self.pachd.lock:
+            return self.pachd.job(request.job.id)
+
+    @_serve
+    def DeleteJob(self, request, context):
+        self.pachd.delete_job(request.job.id)
+        return empty_pb2.Empty()
+
+    @_serve
+    def ListDatumStream(self, request, context):
+        with self.pachd.lock:
+            job = self.pachd.job(request.job.id)
+            output = job.output_commit
+            if output.id and self.pachd.resolve(output.repo.name, output.id).finished is None:
+                raise FakePachdError(grpc.StatusCode.UNKNOWN, f"output commit {output.id} not finished")
+            datums = list(self.pachd.datums.get(request.job.id, []))
+        for datum in datums:
+            yield pps_proto.ListDatumStreamResponse(datum_info=datum, total_pages=1, page=0)
+
+    @_serve
+    def GetLogs(self, request, context):
+        with self.pachd.lock:
+            if request.job.id:
+                self.pachd.job(request.job.id)
+                logs = list(self.pachd.logs.get(request.job.id, []))
+            else:
+                # pipeline logs span every job of the pipeline
+                self.pachd.pipeline(request.pipeline.name)
+                logs = list(self.pachd.logs.get(request.pipeline.name, []))
+                for job_id, job in reversed(self.pachd.jobs.items()):
+                    if job.pipeline.name == request.pipeline.name:
+                        logs.extend(self.pachd.logs.get(job_id, []))
+        if request.datum.id:
+            logs = [log for log in logs if log.datum_id == request.datum.id]
+        if request.tail:
+            logs = logs[-request.tail:]
+        yield from logs
+
+    @_serve
+    def DeleteAll(self, request, context):
+        with self.pachd.lock:
+            self.pachd.pipelines.clear()
+            self.pachd.jobs.clear()
+            self.pachd.datums.clear()
+            self.pachd.logs.clear()
+        return empty_pb2.Empty()
@@ -0,0 +1,229 @@
+import json
+import os
+import zipfile
+from io import BytesIO
+
+from python_pachyderm.client.pps import pps_pb2 as pps_proto
+
+from benchmarks.fake_pachd import FakePachd
+from kaos_backend.constants import BUILD_NOTEBOOK_PIPELINE_PREFIX, BUILD_SERVE_PIPELINE_PREFIX, \
+    BUILD_TRAIN_PIPELINE_PREFIX, HYPER_REPO_PREFIX, INGESTION_PIPELINE_PREFIX, MANIFEST_REPO_PREFIX, \
+    MODEL_REPO_PREFIX, NOTEBOOK_PIPELINE_PREFIX, NOTEBOOK_SOURCE_REPO_PREFIX, SERVE_SOURCE_REPO_PREFIX, \
+    TRAIN_PIPELINE_PREFIX, TRAIN_SOURCE_REPO_PREFIX
+
+TRAIN_FILES = ["model/__init__.py", "model/requirements.txt", "model/train", "Dockerfile"]
+SERVE_FILES = ["model/__init__.py", "model/web-requirements.txt", "model/serve", "Dockerfile"]
+NOTEBOOK_FILES = ["model/__init__.py", "Dockerfile"]
+
+# pipeline_args.json of a bundle, posted back by the build pipelines
+PIPELINE_ARGS = {"cpu": None, "memory": None, "gpu": 0}
+
+
+def bundle_zip(root: str, files: list, size: int = 256):
+    """
+    Zipped source bundle (single root directory) as uploaded by the CLI
+
+    Entries get a fixed modification time, so zipping the same files twice gives the same bundle (as the CLI does for
+    an unchanged source directory).
+    """
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        for f in files:
+            entry = zipfile.ZipInfo(os.path.join(root, f), date_time=(2019, 10, 1, 0, 0, 0))
+            z.writestr(entry, f"# {f}\n".encode() + b"x" * size)
+    return buffer.getvalue()
+
+
+class Scenario:
+    """
+    Workspace seeded on a `FakePachd`, shaped like the state of a cluster after some days of use.
+
+    Workspace resources are created through the backend routes (as the CLI and the build pipelines do). Pipelines do
+    not run on the fake, so their jobs, datums and output commits are seeded directly.
+    """
+
+    def __init__(self,
+                 pachd: FakePachd,
+                 client,
+                 headers: dict,
+                 workspace: str = "bench",
+                 user: str = "bencher",
+                 train_jobs: int = 10,
+                 hyperparams: int = 3,
+                 build_jobs: int = 5,
+                 endpoints: int = 3,
+                 notebooks: int = 2,
+                 model_size: int = 64 * 1024):
+        self.pachd = pachd
+        self.client = client
+        self.headers = headers
+        self.workspace = workspace
+        self.user = user
+        self.train_jobs = train_jobs
+        self.hyperparams = hyperparams
+        self.build_jobs = build_jobs
+        self.endpoints = endpoints
+        self.notebooks = notebooks
+        self.model_size = model_size
+
+        self.train_job_ids = []
+        self.running_job_id = None
+        self.build_train_job_ids = []
+        self.build_serve_job_ids = []
+        self.build_notebook_job_ids = []
+        self.model_ids = []
+        self.endpoint_names = []
+        self.notebook_names = []
+
+    def repo(self, prefix: str):
+        return f"{prefix}-{self.workspace}"
+
+    def post(self, path: str, **kwargs):
+        response = self.client.post(path, headers=self.headers, **kwargs)
+        assert response.status_code == 200, response.data
+        return response.get_json()
+
+    def seed(self):
+        ws = self.workspace
+
+        # workspace: repos and build pipelines
+        self.post(f"/workspace/{ws}?user={self.user}")
+
+        # training data: manifest -> ingestion
+        manifest = b"".join(json.dumps({"url": f"http://data/{i}.csv", "path": f"{i}.csv"}).encode() + b"\n"
+                            for i in range(8))
+        data_glob = self.post(f"/data/{ws}/manifest?user={self.user}",
+                              data={"data": (BytesIO(manifest), "manifest.json")})["glob_name"]
+        manifest_commit = self.head(self.repo(MANIFEST_REPO_PREFIX))
+        ingestion_commit = self.pachd.commit_files(
+            self.repo(INGESTION_PIPELINE_PREFIX), "master",
+            {f"/{data_glob}/{i}.csv": b"a,b,c\n" * 512 for i in range(8)},
+            provenance=[(self.repo(MANIFEST_REPO_PREFIX), manifest_commit, "master")],
+            inherit=False)
+        self.pachd.add_job(self.repo(INGESTION_PIPELINE_PREFIX), output_commit=ingestion_commit,
+                           datums=[[(self.repo(MANIFEST_REPO_PREFIX), manifest_commit, f"/{data_glob}/{i:016x}")]
+                                   for i in range(8)])
+
+        # hyper-parameters
+        params = {"lr": [1 / i for i in range(1, self.hyperparams + 1)]}
+        hyper_glob = self.post(f"/data/{ws}/params?user={self.user}",
+                               data={"data": (BytesIO(json.dumps(params).encode()), "params.json")})["glob_name"]
+        hyper_commit = self.head(self.repo(HYPER_REPO_PREFIX))
+        hyper_files = sorted(f.file.path for f in self.pachd.file_infos(
+            self.pachd.resolve(self.repo(HYPER_REPO_PREFIX), hyper_commit), f"/{hyper_glob}", children=True))
+
+        # training code: source -> build-train (image) -> train pipeline
+        for i in range(self.build_jobs):
+            image_glob = self.post(f"/train/{ws}?user={self.user}",
+                                   data={"data": (BytesIO(bundle_zip(f"train{i}", TRAIN_FILES)), "bundle.zip")})[
+                "glob_name"]
+            self.build_image(BUILD_TRAIN_PIPELINE_PREFIX, TRAIN_SOURCE_REPO_PREFIX, image_glob,
+                             self.build_train_job_ids)
+
+        image = self.image_name(BUILD_TRAIN_PIPELINE_PREFIX, image_glob)
+        self.post(f"/internal/train_pipeline/{ws}/{self.user}?registry=registry&image_name={image}",
+                  json=PIPELINE_ARGS)
+        self.post(f"/internal/train_pipeline/{ws}/{self.user}?registry=registry&image_name={image}",
+                  json=dict(PIPELINE_ARGS, hyper_name=f"{hyper_glob}/*", parallelism=2))
+
+        output_branch = self.pachd.pipelines[self.repo(TRAIN_PIPELINE_PREFIX)].output_branch
+        image_commit = self.head(self.repo(BUILD_TRAIN_PIPELINE_PREFIX))
+        source_commit = self.head(self.repo(TRAIN_SOURCE_REPO_PREFIX))
+        provenance = [(self.repo(TRAIN_SOURCE_REPO_PREFIX), source_commit, "master"),
+                      (self.repo(BUILD_TRAIN_PIPELINE_PREFIX), image_commit, "master"),
+                      (self.repo(INGESTION_PIPELINE_PREFIX), ingestion_commit, "master"),
+                      (self.repo(HYPER_REPO_PREFIX), hyper_commit, "master")]
+
+        # one datum per hyper-parameter file
+        datums = [[(self.repo(BUILD_TRAIN_PIPELINE_PREFIX), image_commit, f"/{image}"),
+                   (self.repo(INGESTION_PIPELINE_PREFIX), ingestion_commit, f"/{data_glob}"),
+                   (self.repo(HYPER_REPO_PREFIX), hyper_commit, hyper_file)] for hyper_file in hyper_files]
+        for i in range(self.train_jobs):
+            self.train(i, output_branch, provenance, datums)
+
+        # a search still running (output commit open)
+        running_commit = self.pachd.commit_files(self.repo(MODEL_REPO_PREFIX), output_branch, {},
+                                                 provenance=provenance, inherit=False, finished=False)
+        self.running_job_id = self.pachd.add_job(self.repo(TRAIN_PIPELINE_PREFIX), state=pps_proto.JOB_RUNNING,
+                                                 output_commit=running_commit, datums=datums)
+
+        # serving: source (with model) -> build-serve (image) -> serve pipelines
+        for i in range(self.endpoints):
+            self.deploy(i)
+
+        # notebooks: source -> build-notebook (image) -> notebook pipelines
+        for i in range(self.notebooks):
+            self.notebook(i)
+
+        return self
+
+    def head(self, repo: str):
+        return self.pachd.resolve(repo, "master").id
+
+    def image_name(self, pipeline_prefix: str, glob_name: str):
+        return f"{self.repo(pipeline_prefix)}:{glob_name.split(':')[-1]}"
+
+    def build_image(self, pipeline_prefix: str, source_prefix: str, glob_name: str, job_ids: list):
+        """
+        Emulates a job of a build pipeline: one image file per source bundle
+        """
+        image = self.image_name(pipeline_prefix, glob_name)
+        source_commit = self.head(self.repo(source_prefix))
+        image_commit = self.pachd.commit_files(
+            self.repo(pipeline_prefix), "master", {f"/{image}": f"built {image}".encode()},
+            provenance=[(self.repo(source_prefix), source_commit, "master")])
+        job_ids.append(self.pachd.add_job(self.repo(pipeline_prefix), output_commit=image_commit,
+                                          datums=[[(self.repo(source_prefix), source_commit, f"/{glob_name}")]],
+                                          logs=[f"Step {s}/12 : building {image}" for s in range(1, 13)]))
+        return image, image_commit
+
+    def train(self, i: int, output_branch: str, provenance: list, datums: list):
+        """
+        Emulates a hyper-parameter search job of the train pipeline: one model per datum
+        """
+        model_repo = self.repo(MODEL_REPO_PREFIX)
+        outputs, stats = {}, {}
+        for d, inputs in enumerate(datums):
+            model_id = f"{i:03x}{d:03x}"
+            model = {f"/{model_id}/model/model.pkl": os.urandom(self.model_size),
+                     f"/{model_id}/metrics/metrics.json": json.dumps({"accuracy": 0.5 + d / 10,
+                                                                      "loss": 1 / (d + 1)}).encode()}
+            outputs.update(model)
+            stats.update({f"/{self.pachd.datum_id(inputs)}/pfs/out{path}": b"" for path in model})
+            self.model_ids.append(f"{output_branch}:{model_id}")
+
+        output_commit = self.pachd.commit_files(model_repo, output_branch, outputs, provenance=provenance,
+                                                inherit=False)
+        stats_commit = self.pachd.commit_files(model_repo, "stats", stats, inherit=False)
+        self.train_job_ids.append(self.pachd.add_job(
+            self.repo(TRAIN_PIPELINE_PREFIX), output_commit=output_commit, stats_commit=stats_commit, datums=datums,
+            logs=[f"epoch {e}: loss={1 / (e + 1):0.4f}" for e in range(50)]))
+
+    def deploy(self, i: int):
+        ws = self.workspace
+        model_id = self.model_ids[-1 - i % self.hyperparams]
+        serve_glob = self.post(f"/inference/{ws}/{model_id}?user={self.user}",
+                               data={"data": (BytesIO(bundle_zip(f"serve{i}", SERVE_FILES)), "bundle.zip")})[
+            "glob_name"]
+        image, image_commit = self.build_image(BUILD_SERVE_PIPELINE_PREFIX, SERVE_SOURCE_REPO_PREFIX, serve_glob,
+                                               self.build_serve_job_ids)
+
+        before = set(self.pachd.pipelines)
+        self.post(f"/internal/serve_pipeline/{ws}/{self.user}?registry=registry&image_name={image}",
+                  json=PIPELINE_ARGS)
+        name = (set(self.pachd.pipelines) - before).pop()
+        self.pachd.set_pipeline_state(name, pps_proto.PIPELINE_RUNNING)
+        self.pachd.add_job(name, datums=[[(self.repo(BUILD_SERVE_PIPELINE_PREFIX), image_commit, f"/{image}")]],
+                           state=pps_proto.JOB_RUNNING, logs=[f"GET /predict 200 {r}ms" for r in range(100)])
+        self.endpoint_names.append(name)
+
+    def notebook(self, i: int):
+        ws = self.workspace
+        user = f"{self.user}{i}"
+        notebook_glob = self.post(f"/notebook/{ws}?user={user}",
+                                  data=bundle_zip(f"notebook{i}", NOTEBOOK_FILES))["glob_name"]
+        image, _ = self.build_image(BUILD_NOTEBOOK_PIPELINE_PREFIX, NOTEBOOK_SOURCE_REPO_PREFIX, notebook_glob,
+                                    self.build_notebook_job_ids)
+        self.post(f"/internal/notebook_pipeline/{ws}/{user}?registry=registry&image_name={image}",
+                  json=PIPELINE_ARGS)
+        self.notebook_names.append(f"{NOTEBOOK_PIPELINE_PREFIX}-{ws}-{user}")
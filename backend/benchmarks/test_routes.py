@@ -0,0 +1,292 @@
+import json
+import os
+from io import BytesIO
+
+import pytest
+from python_pachyderm.client.pps import pps_pb2 as pps_proto
+
+from benchmarks.conftest import BENCHMARK_RECORD, MEASUREMENTS, PACHD_LATENCY, measure, reset_caches
+from benchmarks.scenario import NOTEBOOK_FILES, PIPELINE_ARGS, SERVE_FILES, TRAIN_FILES, Scenario, bundle_zip
+
+
+def upload(data: bytes, name: str = "bundle.zip"):
+    return {"data": {"data": (BytesIO(data), name)}}
+
+
+# name -> (method, path and request arguments built from the scenario, expected status)
+ROUTES = {
+    # workspace
+    "GET /workspace": ("GET", lambda s: ("/workspace", {}), 200),
+    "POST /workspace/<workspace>": ("POST", lambda s: (f"/workspace/other?user={s.user}", {}), 200),
+    "POST /workspace": ("POST", lambda s: (f"/workspace?user={s.user}",
+                                           {"json": {"workspaces": [f"team{i}" for i in range(10)]}}), 200),
+    "GET /workspace/<workspace>": ("GET", lambda s: (f"/workspace/{s.workspace}", {}), 200),
+    "DELETE /workspace/<workspace>": ("DELETE", lambda s: (f"/workspace/{s.workspace}", {}), 200),
+
+    # data
+    "POST /data/<workspace>/features": (
+        "POST", lambda s: (f"/data/{s.workspace}/features?user={s.user}",
+                           upload(bundle_zip("features", ["part-0.csv", "part-1.csv"], size=64 * 1024))), 200),
+    "POST /data/<workspace>/manifest": (
+        "POST", lambda s: (f"/data/{s.workspace}/manifest?user={s.user}",
+                           upload(b'{"url": "http://data/new.csv", "path": "new.csv"}\n', "manifest.json")), 200),
+    "POST /data/<workspace>/params": (
+        "POST", lambda s: (f"/data/{s.workspace}/params?user={s.user}",
+                           upload(json.dumps({"lr": [0.1, 0.2], "depth": [3, 5, 7]}).encode(), "params.json")), 200),
+    # 2,000-point grid (a single batched put)
+    "POST /data/<workspace>/params?grid": (
+        "POST", lambda s: (f"/data/{s.workspace}/params?user={s.user}",
+                           upload(json.dumps({"lr": list(range(20)), "depth": list(range(10)),
+                                              "width": list(range(10))}).encode(), "params.json")), 200),
+    "POST /data/<workspace>/notebook": (
+        "POST", lambda s: (f"/data/{s.workspace}/notebook?user={s.user}",
+                           {"data": bundle_zip("notebook-data", ["data.csv"], size=64 * 1024)}), 200),
+
+    # train
+    "GET /train/<workspace>": ("GET", lambda s: (f"/train/{s.workspace}", {}), 200),
+    "GET /train/<workspace>?limit": ("GET", lambda s: (f"/train/{s.workspace}?limit=1&state=JOB_SUCCESS", {}), 200),
+    "POST /train/<workspace>": (
+        "POST", lambda s: (f"/train/{s.workspace}?user={s.user}", upload(bundle_zip("new-train", TRAIN_FILES))), 200),
+    "GET /train/<workspace>/<job_id>": ("GET", lambda s: (f"/train/{s.workspace}/{s.train_job_ids[-1]}", {}), 200),
+    "GET /train/<workspace>/<job_id>?sort_by": (
+        "GET", lambda s: (f"/train/{s.workspace}/{s.train_job_ids[-1]}?sort_by=accuracy", {}), 200),
+    "GET /train/<workspace>/inspect": ("GET", lambda s: (f"/train/{s.workspace}/inspect", {}), 200),
+    "GET /train/<workspace>/<job_id>/bundle": (
+        "GET", lambda s: (f"/train/{s.workspace}/{s.train_job_ids[-1]}/bundle", {}), 200),
+    "GET /train/<workspace>/<job_id>/logs": (
+        "GET", lambda s: (f"/train/{s.workspace}/{s.train_job_ids[-1]}/logs", {}), 200),
+    "GET /train/<workspace>/<job_id>/logs/stream": (
+        "GET", lambda s: (f"/train/{s.workspace}/{s.train_job_ids[-1]}/logs/stream", {"buffered": True}), 200),
+    "GET /train/<workspace>/<model_id>/provenance": (
+        "GET", lambda s: (f"/train/{s.workspace}/{s.model_ids[-1]}/provenance", {}), 200),
+    "DELETE /train/<workspace>/<job_id>": (
+        "DELETE", lambda s: (f"/train/{s.workspace}/{s.running_job_id}", {}), 200),
+
+    # inference
+    "GET /inference/<workspace>": ("GET", lambda s: (f"/inference/{s.workspace}", {}), 200),
+    "POST /inference/<workspace>/<model_id>": (
+        "POST", lambda s: (f"/inference/{s.workspace}/{s.model_ids[-1]}?user={s.user}",
+                           upload(bundle_zip("new-serve", SERVE_FILES))), 200),
+    "GET /inference/<workspace>/<endpoint_name>/bundle": (
+        "GET", lambda s: (f"/inference/{s.workspace}/{s.endpoint_names[0]}/bundle", {}), 200),
+    "GET /inference/<workspace>/<endpoint_name>/provenance": (
+        "GET", lambda s: (f"/inference/{s.workspace}/{s.endpoint_names[0]}/provenance", {}), 200),
+    "GET /inference/<workspace>/build/<job_id>/logs": (
+        "GET", lambda s: (f"/inference/{s.workspace}/build/{s.build_serve_job_ids[0]}/logs", {}), 200),
+    "GET /inference/<endpoint_name>/logs": ("GET", lambda s: (f"/inference/{s.endpoint_names[0]}/logs", {}), 200),
+    "GET /inference/<endpoint_name>/logs/stream": (
+        "GET", lambda s: (f"/inference/{s.endpoint_names[0]}/logs/stream", {"buffered": True}), 200),
+    "DELETE /inference/<endpoint_name>": ("DELETE", lambda s: (f"/inference/{s.endpoint_names[0]}", {}), 200),
+
+    # notebook
+    "GET /notebook/<workspace>": ("GET", lambda s: (f"/notebook/{s.workspace}", {}), 200),
+    "POST /notebook/<workspace>": (
+        "POST", lambda s: (f"/notebook/{s.workspace}?user=newcomer", {"data": bundle_zip("nb", NOTEBOOK_FILES)}), 200),
+    "GET /notebook/<workspace>/build/<job_id>/logs": (
+        "GET", lambda s: (f"/notebook/{s.workspace}/build/{s.build_notebook_job_ids[0]}/logs", {}), 200),
+    "DELETE /notebook/<notebook_name>": ("DELETE", lambda s: (f"/notebook/{s.notebook_names[0]}", {}), 200),
+
+    # internal
+    "DELETE /internal/resources": ("DELETE", lambda s: ("/internal/resources", {}), 200),
+    "GET /internal/health": ("GET", lambda s: ("/internal/health", {}), 200),
+    "GET /internal/metrics": ("GET", lambda s: ("/internal/metrics", {}), 200),
+    "POST /internal/train_pipeline/<workspace>/<user>": (
+        "POST", lambda s: (f"/internal/train_pipeline/{s.workspace}/{s.user}?registry=registry"
+                           f"&image_name=build-train-{s.workspace}:0123456789", {"json": PIPELINE_ARGS}), 200),
+    "POST /internal/notebook_pipeline/<workspace>/<user>": (
+        "POST", lambda s: (f"/internal/notebook_pipeline/{s.workspace}/newcomer?registry=registry"
+                           f"&image_name=build-notebook-{s.workspace}:0123456789", {"json": PIPELINE_ARGS}), 200),
+    "POST /internal/serve_pipeline/<workspace>/<user>": (
+        "POST", lambda s: (f"/internal/serve_pipeline/{s.workspace}/{s.user}?registry=registry"
+                           f"&image_name=build-serve-{s.workspace}:0123456789", {"json": PIPELINE_ARGS}), 200),
+}
+
+# read-only routes replayed with the content cache warm (name -> route of `ROUTES`)
+WARM_ROUTES = {
+    f"{name} (warm)": name for name in ("GET /train/<workspace>/<job_id>",
+                                        "GET /train/<workspace>/<job_id>?sort_by",
+                                        "GET /train/<workspace>/<job_id>/bundle",
+                                        "GET /train/<workspace>/<model_id>/provenance",
+                                        "GET /inference/<workspace>/<endpoint_name>/provenance",
+                                        "GET /inference/<workspace>/<endpoint_name>/bundle")
+}
+
+
+def test_every_route_is_benchmarked(backend):
+    # TrainController has no get_build_logs (the route always fails)
+    unbenchmarked = {"GET /train/<workspace>/build/<job_id>/logs"}
+
+    rules = {f"{method} {rule.rule}" for rule in backend.app.url_map.iter_rules() if rule.endpoint != "static"
+             for method in rule.methods - {"HEAD", "OPTIONS"}}
+    assert rules - unbenchmarked == {name.split("?")[0] for name in ROUTES}
+
+
+@pytest.mark.parametrize("name", sorted(ROUTES) + sorted(WARM_ROUTES))
+def test_route_budget(name, scenario, backend, budgets):
+    method, build, status = ROUTES[WARM_ROUTES.get(name, name)]
+    path, kwargs = build(scenario)
+
+    measurement, response = measure(scenario, backend, method, path, warm=name in WARM_ROUTES, **kwargs)
+    assert measurement.status == status, response.data
+    MEASUREMENTS[name] = measurement
+
+    if BENCHMARK_RECORD:
+        return
+
+    budget = budgets["routes"].get(name)
+    assert budget is not None, f"no budget recorded for {name} (run with BENCHMARK_RECORD=1)"
+
+    assert measurement.rpcs <= budget["rpcs"], \
+        f"{name} issued {measurement.rpcs} pachd calls (budget: {budget['rpcs']})"
+    assert measurement.peak <= budget["peak_bytes"], \
+        f"{name} peaked at {measurement.peak} bytes (budget: {budget['peak_bytes']})"
+    # wall time only compares under the latency the budget was recorded with
+    if PACHD_LATENCY == budgets["latency"]:
+        assert measurement.seconds <= budget["seconds"], \
+            f"{name} took {measurement.seconds:.3f}s (budget: {budget['seconds']}s)"
+
+
+def test_train_info_rpcs_do_not_grow_with_trials(pachd, backend):
+    rpcs = {}
+    for trials in (3, 500):
+        pachd.reset()
+        reset_caches(backend)
+        scenario = Scenario(pachd, backend.app.test_client(), {"X-Token": os.getenv("TOKEN")}, train_jobs=1,
+                            hyperparams=trials, build_jobs=1, endpoints=0, notebooks=0, model_size=16).seed()
+
+        measurement, response = measure(scenario, backend, "GET",
+                                        f"/train/{scenario.workspace}/{scenario.train_job_ids[-1]}?sort_by=accuracy")
+        assert measurement.status == 200, response.data
+        assert response.get_json()["page_count"] == trials // 10 + 1
+        rpcs[trials] = measurement.rpcs
+
+    assert rpcs[500] == rpcs[3]
+
+
+def test_train_info_resolves_the_page_only(pachd, backend, mocker):
+    pachd.reset()
+    reset_caches(backend)
+    scenario = Scenario(pachd, backend.app.test_client(), {"X-Token": os.getenv("TOKEN")}, train_jobs=1,
+                        hyperparams=500, build_jobs=1, endpoints=0, notebooks=0, model_size=16).seed()
+    mocker.patch.object(backend.job_service, "job_store", None)
+    fan_out = mocker.spy(backend.job_service, "memoized_fan_out")
+
+    # without materialization, the page is picked before any provenance lookup
+    measurement, response = measure(scenario, backend, "GET",
+                                    f"/train/{scenario.workspace}/{scenario.train_job_ids[-1]}?sort_by=loss&page_id=3")
+    assert measurement.status == 200, response.data
+    assert response.get_json()["page_count"] == 51
+
+    # code listing, data commit and the 3 described commits of each of the 10 partitions of the page
+    lookups = [len(args[1]) for args, _ in fan_out.call_args_list if args[0] in ("list_file", "inspect_commit")]
+    assert sum(lookups) == 5 * 10
+
+
+def test_listing_rpcs_do_not_grow_with_pipelines(pachd, backend):
+    rpcs = {}
+    for n in (1, 20):
+        pachd.reset()
+        reset_caches(backend)
+        scenario = Scenario(pachd, backend.app.test_client(), {"X-Token": os.getenv("TOKEN")}, train_jobs=1,
+                            build_jobs=1, endpoints=n, notebooks=n).seed()
+
+        for route, key in (("inference", "endpoints"), ("notebook", "notebooks")):
+            measurement, response = measure(scenario, backend, "GET", f"/{route}/{scenario.workspace}")
+            assert measurement.status == 200, response.data
+            assert len(response.get_json()["response"][key]) == n
+            rpcs[route, n] = measurement.rpcs
+
+    assert rpcs["inference", 20] == rpcs["inference", 1]
+    assert rpcs["notebook", 20] == rpcs["notebook", 1]
+
+
+def test_duplicate_bundle_check_does_not_scan_bundles(scenario, backend):
+    # a bundle of many files, then a resubmission of the same bundle (deduplicated through the bundle index)
+    files = TRAIN_FILES + [f"model/data/{i}.csv" for i in range(50)]
+    path = f"/train/{scenario.workspace}?user={scenario.user}"
+    client = backend.app.test_client()
+    assert client.post(path, headers=scenario.headers, **upload(bundle_zip("big-train", files))).status_code == 200
+
+    scenario.pachd.reset_calls()
+    assert client.post(path, headers=scenario.headers, **upload(bundle_zip("big-train", files))).status_code == 200
+    assert scenario.pachd.calls.get("ListBranch") == 1
+    assert "InspectFile" not in scenario.pachd.calls and "StartCommit" not in scenario.pachd.calls
+
+
+def test_workspace_teardown_deletes_every_resource(scenario, backend):
+    pipelines = [name for name in scenario.pachd.pipelines if scenario.workspace in name]
+    response = backend.app.test_client().delete(f"/workspace/{scenario.workspace}", headers=scenario.headers)
+    assert response.status_code == 200, response.data
+
+    report = response.get_json()
+    assert report["failed"] == {} and report["skipped"] == []
+    assert not [name for name in list(scenario.pachd.pipelines) + list(scenario.pachd.repos)
+                if scenario.workspace in name]
+    assert pipelines and {f"pipeline/{name}" for name in pipelines} <= set(report["deleted"])
+
+
+def test_workspace_provisioning_lists_the_cluster_once(scenario, backend):
+    client = backend.app.test_client()
+    workspaces = [f"team{i}" for i in range(5)]
+    scenario.pachd.reset_calls()
+    response = client.post(f"/workspace?user={scenario.user}", headers=scenario.headers,
+                           json={"workspaces": workspaces + ["TEAM0"]})
+    assert response.status_code == 200, response.data
+
+    report = response.get_json()
+    assert report["failed"] == {} and report["skipped"] == []
+    assert scenario.pachd.calls["ListRepo"] == 1 and scenario.pachd.calls["ListPipeline"] == 1
+    assert scenario.pachd.calls["CreateRepo"] == 10 * len(workspaces)
+    assert all(f"build-train-{workspace}" in scenario.pachd.pipelines for workspace in workspaces)
+
+    # provisioning again only creates what is missing
+    del scenario.pachd.pipelines["build-serve-team0"]
+    response = client.post(f"/workspace?user={scenario.user}", headers=scenario.headers,
+                           json={"workspaces": workspaces})
+    assert response.get_json()["created"] == ["pipeline/build-serve-team0"]
+
+    # as well as the master branch of an existing repo (created before its pipeline)
+    source_repo = "source-train-team1"
+    del scenario.pachd.repos[source_repo].branches["master"]
+    del scenario.pachd.pipelines["build-train-team1"]
+    response = client.post(f"/workspace?user={scenario.user}", headers=scenario.headers,
+                           json={"workspaces": workspaces})
+    assert response.get_json()["created"] == [f"branch/{source_repo}", "pipeline/build-train-team1"]
+    assert "master" in scenario.pachd.repos[source_repo].branches
+
+    response = client.post(f"/workspace?user={scenario.user}", headers=scenario.headers, json={"workspaces": []})
+    assert response.status_code == 400
+
+
+def test_log_stream_filters(scenario, backend):
+    client = backend.app.test_client()
+    job_id = scenario.train_job_ids[-1]
+    path = f"/train/{scenario.workspace}/{job_id}/logs/stream"
+
+    def records(query=""):
+        response = client.get(f"{path}{query}", headers=scenario.headers)
+        assert response.status_code == 200, response.data
+        assert response.mimetype == "application/x-ndjson"
+        return [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert len(records()) == 50
+    assert [r["message"] for r in records("?tail=2")] == ["epoch 48: loss=0.0204", "epoch 49: loss=0.0200"]
+    assert records("?since=2999-01-01T00:00:00") == []
+
+    scenario.pachd.logs[job_id][3].datum_id = "datum-3"
+    assert [r["message"] for r in records("?datum_id=datum-3")] == ["epoch 3: loss=0.2500"]
+
+    assert client.get(f"{path}?tail=-1", headers=scenario.headers).status_code == 400
+    assert client.get(f"{path}?since=yesterday", headers=scenario.headers).status_code == 400
+    assert client.get(f"/train/{scenario.workspace}/unknown/logs/stream",
+                      headers=scenario.headers).status_code == 404
+
+
+def test_log_stream_of_running_job_is_its_own(scenario, backend):
+    job_id = scenario.running_job_id
+    scenario.pachd.logs[job_id] = [pps_proto.LogMessage(job_id=job_id, message="epoch 0")]
+
+    response = backend.app.test_client().get(f"/train/{scenario.workspace}/{job_id}/logs/stream",
+                                             headers=scenario.headers)
+    assert response.status_code == 200, response.data
+    assert [json.loads(line)["message"] for line in response.data.decode().splitlines()] == ["epoch 0"]
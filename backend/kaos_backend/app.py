@@ -2,7 +2,13 @@ import logging
 import os
 
 from flask import Flask
+from kaos_backend.clients.async_pachyderm import AsyncPachydermClient
+from kaos_backend.clients.channel import ChannelPool
+from kaos_backend.clients.content_cache import ContentCache
+from kaos_backend.clients.job_store import JobStore
 from kaos_backend.clients.pachyderm import PachydermClient
+from kaos_backend.constants import CONTENT_CACHE_BYTES, CONTENT_CACHE_DIR, JOB_STORE_PATH, \
+    METRICS_DIR, METRICS_FLUSH_INTERVAL, WORKERS
 from kaos_backend.controllers.data import DataController
 from kaos_backend.controllers.inference import InferenceController
 from kaos_backend.controllers.internal import InternalController
@@ -17,16 +23,28 @@ from kaos_backend.routes.notebook import build_notebook_blueprint
 from kaos_backend.routes.train import build_train_blueprint
 from kaos_backend.routes.workspace import build_workspace_blueprint
 from kaos_backend.services.job_service import JobService
-from python_pachyderm import PfsClient, PpsClient
+from kaos_backend.util.admission import AdmissionController, register_admission_control
+from kaos_backend.util.metrics import METRICS, register_request_metrics
 
 PACHY_HOST = os.getenv("PACHD_SERVICE_HOST", "localhost")
 PACHY_PORT = os.getenv("PACHD_SERVICE_PORT_API_GRPC_PORT", 30650)
 
-pfs_client = PfsClient(PACHY_HOST, PACHY_PORT)
-pps_client = PpsClient(PACHY_HOST, PACHY_PORT)
+# single (lazily connected) channel per worker, shared by PFS and PPS
+channel_pool = ChannelPool(PACHY_HOST, PACHY_PORT)
+pfs_client = channel_pool.pfs_client()
+pps_client = channel_pool.pps_client()
 
-pachyderm_client = PachydermClient(pps_client, pfs_client)
-job_service = JobService(pachyderm_client)
+# commit-addressed content survives restarts, in one directory (and share of the size cap) per worker
+content_cache = ContentCache.for_worker(CONTENT_CACHE_DIR, CONTENT_CACHE_BYTES // WORKERS) \
+    if CONTENT_CACHE_BYTES > 0 else None
+
+pachyderm_client = PachydermClient(pps_client, pfs_client, channel_pool=channel_pool, content_cache=content_cache)
+# non-blocking stubs for concurrent fan-outs (run on a background event loop)
+async_pachyderm_client = AsyncPachydermClient(PACHY_HOST, PACHY_PORT, job_index=pachyderm_client.job_index)
+# finished training jobs, materialized on first computation
+job_store = JobStore(JOB_STORE_PATH) if JOB_STORE_PATH else None
+
+job_service = JobService(pachyderm_client, async_client=async_pachyderm_client, job_store=job_store)
 
 train_blueprint = build_train_blueprint(TrainController(job_service))
 inference_blueprint = build_inference_blueprint(InferenceController(job_service))
@@ -45,6 +63,12 @@ app.register_blueprint(data_blueprint)
 app.register_blueprint(train_blueprint)
 
 register_application_exception(app)
+register_request_metrics(app)
+if METRICS_DIR:
+    # /internal/metrics aggregates the metrics of every worker
+    METRICS.share(METRICS_DIR, METRICS_FLUSH_INTERVAL)
+# uploads are read in memory: admit them against the share of the memory limit of this worker
+register_admission_control(app, AdmissionController.for_worker(pachyderm_client.memory_limit))
 
 # setup logging
 gunicorn_logger = logging.getLogger('gunicorn.error')
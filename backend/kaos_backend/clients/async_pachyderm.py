@@ -0,0 +1,217 @@
+import asyncio
+import os
+
+import grpc
+import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
+from flask import current_app as app
+from kaos_backend.clients.channel import DEADLINES, KEEPALIVE_OPTIONS, deadline_class
+from kaos_backend.clients.job_index import JobIndex
+from kaos_backend.util.error_handling import handle_pachyderm_async_error
+from kaos_backend.util.metrics import METRICS
+from python_pachyderm.client.pfs import pfs_pb2_grpc as pfs_grpc
+from python_pachyderm.client.pps import pps_pb2 as proto
+from python_pachyderm.client.pps import pps_pb2_grpc as pps_grpc
+from python_pachyderm.util import commit_from, get_address, get_metadata
+
+
+class AsyncPachydermClient:
+    """
+    Asyncio counterpart of `PachydermClient`, built on grpc.aio stubs.
+
+    Mirrors the read operations of `PachydermClient` (same names, arguments and results) so fan-outs can await many
+    lookups concurrently. Mutations stay on the blocking client.
+    """
+
+    def __init__(self, host=None, port=None, auth_token=None, options=None, deadlines=None, job_index: JobIndex = None):
+        """
+        AsyncPachydermClient constructor.
+
+        Args:
+            host (str): pachd host
+            port (int): pachd gRPC port
+            auth_token (str): Pachyderm auth token (if any)
+            options (list): gRPC channel options (keepalive settings by default)
+            deadlines (dict): deadline (in seconds) by deadline class
+            job_index (JobIndex): job index shared with the blocking client (if any)
+        """
+        self.address = get_address(host, port)
+        self.metadata = get_metadata(auth_token)
+        self.options = KEEPALIVE_OPTIONS if options is None else options
+        self.deadlines = deadlines or DEADLINES
+        self.job_index = job_index
+        self._job_refreshes = {}
+        self._owner = None
+        self._channel = None
+        self._pfs_stub = None
+        self._pps_stub = None
+
+    def _stubs(self):
+        # aio channels are bound to the event loop (and process) that created them
+        owner = (os.getpid(), asyncio.get_event_loop())
+        if self._owner != owner:
+            if self._channel is not None:
+                self.__close(self._channel, *self._owner)
+            self._channel = grpc.aio.insecure_channel(self.address, options=self.options)
+            self._pfs_stub = pfs_grpc.APIStub(self._channel)
+            self._pps_stub = pps_grpc.APIStub(self._channel)
+            self._owner = owner
+        return self._pfs_stub, self._pps_stub
+
+    @staticmethod
+    def __close(channel, pid: int, loop: asyncio.AbstractEventLoop):
+        # closed on its own loop (as soon as it runs); a channel inherited through a fork is the parent's to close
+        if pid == os.getpid() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(channel.close(), loop)
+
+    @property
+    def pfs_stub(self):
+        return self._stubs()[0]
+
+    @property
+    def pps_stub(self):
+        return self._stubs()[1]
+
+    def __call(self, stub, method: str, request):
+        # same method names as the (intercepted) blocking channel, e.g. /pfs.API/GetFile
+        qualified = f"/{'pfs' if stub is self._pfs_stub else 'pps'}.API/{method}"
+        METRICS.record_rpc(qualified, request.ByteSize())
+        timeout = self.deadlines.get(deadline_class(method))
+        return qualified, getattr(stub, method)(request, metadata=self.metadata, timeout=timeout)
+
+    async def __unary(self, stub, method: str, request):
+        qualified, call = self.__call(stub, method, request)
+        response = await call
+        METRICS.record_bytes(qualified, received_bytes=response.ByteSize())
+        return response
+
+    async def __stream(self, stub, method: str, request):
+        qualified, call = self.__call(stub, method, request)
+        responses = [item async for item in call]
+        METRICS.record_bytes(qualified, received_bytes=sum(item.ByteSize() for item in responses))
+        return responses
+
+    @handle_pachyderm_async_error
+    async def list_pipelines(self):
+        app.logger.debug("@%s: list pipelines", AsyncPachydermClient.__name__)
+        response = await self.__unary(self.pps_stub, "ListPipeline", proto.ListPipelineRequest())
+        return [p.pipeline.name for p in response.pipeline_info]
+
+    @handle_pachyderm_async_error
+    async def list_repos(self):
+        app.logger.debug("@%s: list repos", AsyncPachydermClient.__name__)
+        response = await self.__unary(self.pfs_stub, "ListRepo", pfs_proto.ListRepoRequest())
+        return [r.repo.name for r in response.repo_info]
+
+    @handle_pachyderm_async_error
+    async def inspect_pipeline(self, pipeline: str):
+        app.logger.debug("@%s: inspect pipeline %s", AsyncPachydermClient.__name__, pipeline)
+        request = proto.InspectPipelineRequest(pipeline=proto.Pipeline(name=pipeline))
+        return await self.__unary(self.pps_stub, "InspectPipeline", request)
+
+    async def check_pipeline_exists(self, pipeline: str):
+        return pipeline in await self.list_pipelines()
+
+    async def check_repo_exists(self, repo: str):
+        return repo in await self.list_repos()
+
+    @handle_pachyderm_async_error
+    async def check_branch_exists(self, repo: str, branch: str):
+        app.logger.debug("@%s: check branch %s exists in %s", AsyncPachydermClient.__name__, branch, repo)
+        request = pfs_proto.ListBranchRequest(repo=pfs_proto.Repo(name=repo))
+        response = await self.__unary(self.pfs_stub, "ListBranch", request)
+        return branch in [b.branch.name for b in response.branch_info]
+
+    @handle_pachyderm_async_error
+    async def list_file(self, commit: str, path: str, history=-1):
+        app.logger.debug("@%s: list file from commit %s in path %s", AsyncPachydermClient.__name__, commit, path)
+        request = pfs_proto.ListFileRequest(file=pfs_proto.File(commit=commit_from(commit), path=path),
+                                            history=history)
+        return await self.__stream(self.pfs_stub, "ListFileStream", request)
+
+    @handle_pachyderm_async_error
+    async def inspect_file(self, commit: str, path: str):
+        app.logger.debug("@%s: inspect file from commit %s in path %s", AsyncPachydermClient.__name__, commit, path)
+        request = pfs_proto.InspectFileRequest(file=pfs_proto.File(commit=commit_from(commit), path=path))
+        return await self.__unary(self.pfs_stub, "InspectFile", request)
+
+    @handle_pachyderm_async_error
+    async def list_commit(self, repo: str, to_commit=None):
+        app.logger.debug("@%s: list commit %s in repo %s", AsyncPachydermClient.__name__, to_commit, repo)
+        request = pfs_proto.ListCommitRequest(repo=pfs_proto.Repo(name=repo))
+        if to_commit is not None:
+            request.to.CopyFrom(commit_from(to_commit))
+        return await self.__stream(self.pfs_stub, "ListCommitStream", request)
+
+    @handle_pachyderm_async_error
+    async def inspect_commit(self, commit: str):
+        app.logger.debug("@%s: inspect commit %s", AsyncPachydermClient.__name__, commit)
+        request = pfs_proto.InspectCommitRequest(commit=commit_from(commit))
+        return await self.__unary(self.pfs_stub, "InspectCommit", request)
+
+    @handle_pachyderm_async_error
+    async def get_blob(self, repo: str, commit: str, path: str):
+        app.logger.debug("@%s: get blob from %s/%s in path %s", AsyncPachydermClient.__name__, repo, commit, path)
+        request = pfs_proto.GetFileRequest(file=pfs_proto.File(commit=commit_from(f"{repo}/{commit}"), path=path))
+        return b"".join([chunk.value for chunk in await self.__stream(self.pfs_stub, "GetFile", request)])
+
+    @handle_pachyderm_async_error
+    async def inspect_job(self, job_id: str):
+        app.logger.debug("@%s: inspect job %s", AsyncPachydermClient.__name__, job_id)
+        return await self.__unary(self.pps_stub, "InspectJob", proto.InspectJobRequest(job=proto.Job(id=job_id)))
+
+    async def get_job_info(self, job_id: str):
+        return await self.inspect_job(job_id)
+
+    @handle_pachyderm_async_error
+    async def get_jobs(self, pipeline_name: str, history=-1):
+        app.logger.debug("@%s: list jobs from pipeline %s", AsyncPachydermClient.__name__, pipeline_name)
+        request = proto.ListJobRequest(pipeline=proto.Pipeline(name=pipeline_name), history=history)
+        return await self.__stream(self.pps_stub, "ListJobStream", request)
+
+    async def check_job_exists(self, pipeline_name: str, job_id: str):
+        return await self.__job_state(pipeline_name, job_id) is not None
+
+    async def check_job_running(self, pipeline_name: str, job_id: str):
+        return await self.__job_state(pipeline_name, job_id) in (proto.JOB_STARTING, proto.JOB_RUNNING)
+
+    async def __job_state(self, pipeline_name: str, job_id: str):
+        if self.job_index is None:
+            jobs = await self.get_jobs(pipeline_name)
+            return next((job.state for job in jobs if job.job.id == job_id), None)
+
+        # served from the job index like the blocking client, refreshed incrementally on a miss
+        state = self.job_index.lookup(pipeline_name, job_id)
+        if state is not None:
+            return state
+
+        # concurrent misses (e.g. in a fan-out) share a single refresh of the pipeline
+        key = (asyncio.get_event_loop(), pipeline_name)
+        refresh = self._job_refreshes.get(key)
+        if refresh is None:
+            refresh = asyncio.ensure_future(self.__refresh_jobs(pipeline_name))
+            self._job_refreshes[key] = refresh
+            refresh.add_done_callback(lambda _: self._job_refreshes.pop(key, None))
+        entry = await asyncio.shield(refresh)
+        return entry.states.get(job_id)
+
+    @handle_pachyderm_async_error
+    async def __refresh_jobs(self, pipeline_name: str):
+        app.logger.debug("@%s: refresh jobs of pipeline %s", AsyncPachydermClient.__name__, pipeline_name)
+        refresh = self.job_index.begin_refresh(pipeline_name)
+        request = proto.ListJobRequest(pipeline=proto.Pipeline(name=pipeline_name), history=-1)
+        qualified, call = self.__call(self.pps_stub, "ListJobStream", request)
+        received_bytes = 0
+        async for job in call:
+            received_bytes += job.ByteSize()
+            if refresh.add(job):
+                # every older job is already known (and finished)
+                call.cancel()
+                break
+        METRICS.record_bytes(qualified, received_bytes=received_bytes)
+        return refresh.finish()
+
+    @handle_pachyderm_async_error
+    async def list_datum(self, job_id: str):
+        app.logger.debug("@%s: list datum by job %s", AsyncPachydermClient.__name__, job_id)
+        request = proto.ListDatumRequest(job=proto.Job(id=job_id))
+        return await self.__stream(self.pps_stub, "ListDatumStream", request)
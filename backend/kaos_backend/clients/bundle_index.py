@@ -0,0 +1,44 @@
+import threading
+
+
+class BundleIndex:
+    """
+    Per-repo index of the (non-empty) top-level bundles on master, by name. Bundle names embed the hash of their
+    content (see `BundleHash`), so a name identifies a bundle.
+
+    An entry is only valid for the head commit it was built from: when commits land on master, the entry is rebuilt
+    from a single listing of the new head (which also builds the index of existing repos).
+    """
+
+    def __init__(self):
+        self._repos = {}
+        self._lock = threading.Lock()
+
+    def contains(self, repo: str, head: str, name: str, list_bundles: callable):
+        """
+        Checks whether a bundle is on master.
+
+        Args:
+            repo (str): repo name
+            head (str): id of the head commit of master
+            name (str): bundle name
+            list_bundles (callable): returns the names of the bundles under `head`
+
+        """
+        with self._lock:
+            entry = self._repos.get(repo)
+
+        if entry is None or entry[0] != head:
+            entry = (head, frozenset(list_bundles()))
+            with self._lock:
+                self._repos[repo] = entry
+
+        return name in entry[1]
+
+    def forget(self, repo: str):
+        with self._lock:
+            self._repos.pop(repo, None)
+
+    def clear(self):
+        with self._lock:
+            self._repos.clear()
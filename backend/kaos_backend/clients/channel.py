@@ -0,0 +1,282 @@
+import os
+import threading
+
+import grpc
+from python_pachyderm import PfsClient, PpsClient
+from python_pachyderm.client.pfs import pfs_pb2_grpc as pfs_grpc
+from python_pachyderm.client.pps import pps_pb2_grpc as pps_grpc
+from python_pachyderm.util import get_address, get_metadata
+
+from kaos_backend.constants import FAST_DEADLINE, STREAMING_DEADLINE, MUTATION_DEADLINE, GRPC_KEEPALIVE_MS
+from kaos_backend.util.metrics import METRICS
+
+# deadline classes
+FAST = "fast"
+STREAMING = "streaming"
+MUTATION = "mutation"
+UNBOUNDED = "unbounded"
+
+# quick metadata lookups
+FAST_METHODS = {
+    "InspectRepo", "ListRepo", "StartCommit", "InspectCommit", "CreateBranch", "InspectBranch", "ListBranch",
+    "InspectFile", "InspectJob", "InspectDatum", "InspectPipeline", "ListPipeline", "GetVersion",
+}
+
+# data transfers and (potentially) large listings
+STREAMING_METHODS = {
+    "PutFile", "GetFile", "ListFile", "ListFileStream", "GlobFile", "GlobFileStream", "WalkFile", "ListCommit",
+    "ListCommitStream", "ListJob", "ListJobStream", "ListDatum", "ListDatumStream",
+}
+
+# calls that block until something happens on the cluster (e.g. followed logs)
+UNBOUNDED_METHODS = {
+    "GetLogs", "SubscribeCommit", "FlushCommit", "FlushJob",
+}
+
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", GRPC_KEEPALIVE_MS),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", -1),
+]
+
+DEADLINES = {
+    FAST: FAST_DEADLINE,
+    STREAMING: STREAMING_DEADLINE,
+    MUTATION: MUTATION_DEADLINE,
+    UNBOUNDED: None,
+}
+
+
+def deadline_class(method: str):
+    """
+    Determines the deadline class of a fully qualified gRPC method (e.g. /pfs.API/GetFile)
+    """
+    name = method.split('/')[-1]
+    if name in FAST_METHODS:
+        return FAST
+    elif name in STREAMING_METHODS:
+        return STREAMING
+    elif name in UNBOUNDED_METHODS:
+        return UNBOUNDED
+    return MUTATION
+
+
+class DeadlineInterceptor(grpc.UnaryUnaryClientInterceptor,
+                          grpc.UnaryStreamClientInterceptor,
+                          grpc.StreamUnaryClientInterceptor,
+                          grpc.StreamStreamClientInterceptor):
+    """
+    Applies a per-call deadline (by deadline class) to every call that does not set one explicitly.
+    """
+
+    def __init__(self, deadlines: dict):
+        self.deadlines = deadlines
+
+    def _with_deadline(self, details: grpc.ClientCallDetails):
+        if details.timeout is not None:
+            return details
+        timeout = self.deadlines.get(deadline_class(details.method))
+        return _ClientCallDetails(details.method, timeout, details.metadata, details.credentials,
+                                  getattr(details, 'wait_for_ready', None), getattr(details, 'compression', None))
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._with_deadline(client_call_details), request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return continuation(self._with_deadline(client_call_details), request)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return continuation(self._with_deadline(client_call_details), request_iterator)
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        return continuation(self._with_deadline(client_call_details), request_iterator)
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor,
+                         grpc.UnaryStreamClientInterceptor,
+                         grpc.StreamUnaryClientInterceptor,
+                         grpc.StreamStreamClientInterceptor):
+    """
+    Counts every gRPC call and the payload bytes it sends and receives (see `kaos_backend.util.metrics`).
+    """
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = metrics
+
+    def _count_requests(self, method: str, request_iterator):
+        for request in request_iterator:
+            self.metrics.record_bytes(method, sent_bytes=request.ByteSize())
+            yield request
+
+    def _count_response(self, method: str, outcome):
+        # recorded once the call completes, so `.future()` calls are not blocked until then
+        def done(call):
+            if not call.cancelled() and call.exception() is None:
+                self.metrics.record_bytes(method, received_bytes=call.result().ByteSize())
+
+        outcome.add_done_callback(done)
+        return outcome
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        method = client_call_details.method
+        self.metrics.record_rpc(method, request.ByteSize())
+        return self._count_response(method, continuation(client_call_details, request))
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        method = client_call_details.method
+        self.metrics.record_rpc(method, request.ByteSize())
+        return _CountingStream(continuation(client_call_details, request), method, self.metrics)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        method = client_call_details.method
+        self.metrics.record_rpc(method)
+        return self._count_response(method, continuation(client_call_details,
+                                                         self._count_requests(method, request_iterator)))
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        method = client_call_details.method
+        self.metrics.record_rpc(method)
+        responses = continuation(client_call_details, self._count_requests(method, request_iterator))
+        return _CountingStream(responses, method, self.metrics)
+
+
+class _CountingStream:
+    """
+    Response stream that counts the bytes it yields (every other attribute, e.g. `cancel`, is the call's).
+    """
+
+    def __init__(self, call, method: str, metrics):
+        self._call = call
+        self._method = method
+        self._metrics = metrics
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        response = next(self._call)
+        self._metrics.record_bytes(self._method, received_bytes=response.ByteSize())
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._call, name)
+
+
+class _ClientCallDetails(grpc.ClientCallDetails):
+
+    def __init__(self, method, timeout, metadata, credentials, wait_for_ready, compression):
+        self.method = method
+        self.timeout = timeout
+        self.metadata = metadata
+        self.credentials = credentials
+        self.wait_for_ready = wait_for_ready
+        self.compression = compression
+
+
+class ChannelPool:
+    """
+    Manages a single, keepalive-tuned gRPC channel per worker process, shared by the PFS and PPS stubs.
+
+    Channels are created lazily (and re-created after a fork), so the pool can be built at import time.
+    """
+
+    def __init__(self, host=None, port=None, options=None, deadlines=None):
+        """
+        ChannelPool constructor.
+
+        Args:
+            host (str): pachd host
+            port (int): pachd gRPC port
+            options (list): gRPC channel options (keepalive settings by default)
+            deadlines (dict): deadline (in seconds) by deadline class
+        """
+        self.address = get_address(host, port)
+        self.options = KEEPALIVE_OPTIONS if options is None else options
+        self.deadlines = deadlines or DEADLINES
+        self._lock = threading.Lock()
+        self._pid = None
+        self._channel = None
+        self._intercepted = None
+        self._stubs = {}
+        self._state = None
+
+    def _ensure_channel(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._pid != pid:
+                self._channel = grpc.insecure_channel(self.address, options=self.options)
+                self._channel.subscribe(self._on_state_change, try_to_connect=False)
+                self._intercepted = grpc.intercept_channel(self._channel, DeadlineInterceptor(self.deadlines),
+                                                           MetricsInterceptor())
+                self._stubs = {}
+                self._state = None
+                self._pid = pid
+        return self._intercepted
+
+    def _on_state_change(self, state: grpc.ChannelConnectivity):
+        self._state = state
+
+    @property
+    def channel(self):
+        return self._ensure_channel()
+
+    def stub(self, stub_cls):
+        channel = self._ensure_channel()
+        with self._lock:
+            if stub_cls not in self._stubs:
+                self._stubs[stub_cls] = stub_cls(channel)
+            return self._stubs[stub_cls]
+
+    def pfs_client(self, auth_token=None):
+        return PooledPfsClient(self, auth_token)
+
+    def pps_client(self, auth_token=None):
+        return PooledPpsClient(self, auth_token)
+
+    def health(self):
+        self._ensure_channel()
+        state = self._state.name if self._state else "IDLE"
+        return {
+            "address": self.address,
+            "pid": self._pid,
+            "state": state,
+            "healthy": state in ("IDLE", "CONNECTING", "READY")
+        }
+
+
+class PooledPfsClient(PfsClient):
+    """
+    PfsClient whose stub lives on the shared channel of a `ChannelPool`.
+    """
+
+    def __init__(self, pool: ChannelPool, auth_token=None):
+        self.pool = pool
+        self.metadata = get_metadata(auth_token)
+
+    @property
+    def channel(self):
+        return self.pool.channel
+
+    @property
+    def stub(self):
+        return self.pool.stub(pfs_grpc.APIStub)
+
+
+class PooledPpsClient(PpsClient):
+    """
+    PpsClient whose stub lives on the shared channel of a `ChannelPool`.
+    """
+
+    def __init__(self, pool: ChannelPool, auth_token=None):
+        self.pool = pool
+        self.metadata = get_metadata(auth_token)
+
+    @property
+    def channel(self):
+        return self.pool.channel
+
+    @property
+    def stub(self):
+        return self.pool.stub(pps_grpc.APIStub)
@@ -0,0 +1,53 @@
+import threading
+
+
+class CommitIndex:
+    """
+    Per-branch index of the latest non-empty commit.
+
+    Commits are listed newest first, so a lookup stops at the first non-empty commit or, if only empty commits landed
+    since, at the previously indexed head (whose answer still holds). Only finished heads are indexed: an open commit
+    may still receive files.
+    """
+
+    def __init__(self):
+        self._branches = {}
+        self._lock = threading.Lock()
+
+    def latest(self, repo: str, branch: str, commits):
+        """
+        Returns the id of the latest non-empty commit of a branch (None if every commit is empty).
+
+        Args:
+            repo (str): repo name
+            branch (str): branch name
+            commits (iterable): `CommitInfo` of the branch (newest first), consumed up to the answer
+
+        """
+        with self._lock:
+            known = self._branches.get((repo, branch))
+
+        head = None
+        latest = None
+        for commit in commits:
+            if head is None:
+                head = commit
+            if known is not None and commit.commit.id == known[0]:
+                latest = known[1]
+                break
+            if commit.size_bytes != 0:
+                latest = commit.commit.id
+                break
+
+        if head is not None and head.HasField("finished"):
+            with self._lock:
+                self._branches[(repo, branch)] = (head.commit.id, latest)
+        return latest
+
+    def forget(self, repo: str):
+        with self._lock:
+            self._branches = {key: value for key, value in self._branches.items() if key[0] != repo}
+
+    def clear(self):
+        with self._lock:
+            self._branches.clear()
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from kaos_backend.util.helpers import is_process_alive
+
+# suffix of entries being written (never served, removed on load)
+PARTIAL_SUFFIX = ".partial"
+
+
+class ContentCache:
+    """
+    Disk-backed LRU cache of PFS content, addressed by keys such as (repo, commit id, path).
+
+    Content under a finished commit never changes, so entries never go stale: they are only evicted (least recently
+    used first) to keep the cache under its size cap. Entries found on disk are re-indexed on start-up (oldest first).
+
+    The size of a directory is only accounted by the cache using it, so processes must not share a directory (see
+    `for_worker`).
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        ContentCache constructor.
+
+        Args:
+            directory (str): directory holding the entries (created if missing)
+            max_bytes (int): maximum total size of the entries
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def for_worker(cls, root: str, max_bytes: int):
+        """
+        Cache of the current process, in its own directory under `root`.
+
+        The directory of an exited process (e.g. a restarted gunicorn worker), if any, is taken over with its entries.
+
+        Args:
+            root (str): directory holding one cache directory per process
+            max_bytes (int): maximum total size of the entries of this process
+        """
+        os.makedirs(root, exist_ok=True)
+        directory = os.path.join(root, str(os.getpid()))
+        for name in os.listdir(root):
+            if os.path.exists(directory):
+                break
+            if name.isdigit() and not is_process_alive(int(name)):
+                try:
+                    os.rename(os.path.join(root, name), directory)
+                except OSError:
+                    # taken over by another process
+                    continue
+        return cls(directory, max_bytes)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(PARTIAL_SUFFIX):
+                self._remove(path)
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._register(name, size)
+
+    @staticmethod
+    def _name(key: tuple):
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _register(self, name: str, size: int):
+        with self._lock:
+            self.size += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+
+            evicted = []
+            while self.size > self.max_bytes and self._entries:
+                old, old_size = self._entries.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old)
+
+        for old in evicted:
+            self._remove(os.path.join(self.directory, old))
+
+    def _touch(self, name: str):
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        # recency survives restarts
+        try:
+            os.utime(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def _forget(self, name: str):
+        with self._lock:
+            self.size -= self._entries.pop(name, 0)
+
+    def open(self, key: tuple):
+        """
+        Opens an entry for reading.
+
+        Returns:
+            <binary file object> or None if the entry is not cached
+
+        """
+        name = self._name(key)
+        try:
+            f = open(os.path.join(self.directory, name), "rb")
+        except FileNotFoundError:
+            # removed from the directory behind the cache's back
+            self._forget(name)
+            return None
+        self._touch(name)
+        return f
+
+    def get(self, key: tuple):
+        """
+        Returns:
+            <bytes of the entry> or None if the entry is not cached
+
+        """
+        f = self.open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def put(self, key: tuple, data: bytes):
+        with self.writer(key) as f:
+            f.write(data)
+
+    @contextmanager
+    def writer(self, key: tuple):
+        """
+        Writes an entry. The entry becomes visible only once the block completes without error.
+        """
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        partial = f"{path}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+        try:
+            with open(partial, "wb") as f:
+                yield f
+                size = f.tell()
+        except BaseException:
+            # includes GeneratorExit, when a streaming reader stops early
+            self._remove(partial)
+            raise
+
+        if size > self.max_bytes:
+            self._remove(partial)
+            return
+
+        os.replace(partial, path)
+        self._register(name, size)
+
+    def clear(self):
+        with self._lock:
+            names = list(self._entries)
+            self._entries.clear()
+            self.size = 0
+
+        for name in names:
+            self._remove(os.path.join(self.directory, name))
@@ -0,0 +1,174 @@
+import threading
+import time
+
+from python_pachyderm.client.pps import pps_pb2 as proto
+
+# states a job never leaves
+TERMINAL_JOB_STATES = frozenset([proto.JOB_FAILURE, proto.JOB_SUCCESS, proto.JOB_KILLED])
+
+
+class _PipelineJobs:
+
+    def __init__(self, states: dict, head: str, listed_at: float = None):
+        self.states = states
+        self.head = head
+        self.refreshed_at = time.monotonic()
+        # last full listing (incremental refreshes never drop deleted jobs)
+        self.listed_at = self.refreshed_at if listed_at is None else listed_at
+
+
+class JobIndex:
+    """
+    Per-pipeline index of job id -> job state.
+
+    Built from a single `list_job` pass and refreshed incrementally: jobs are listed newest first, so a refresh stops
+    as soon as it reaches the previously newest job and has seen every job that was not finished yet. Once the last
+    full pass is older than `terminal_ttl`, the next refresh lists every job again, dropping jobs deleted elsewhere
+    (e.g. by another worker).
+    """
+
+    def __init__(self, ttl: float, terminal_ttl: float):
+        """
+        JobIndex constructor.
+
+        Args:
+            ttl (float): time (in seconds) during which states of unfinished jobs are served without refreshing
+            terminal_ttl (float): time (in seconds) during which states of finished jobs are served without a full
+                                  listing
+        """
+        self.ttl = ttl
+        self.terminal_ttl = terminal_ttl
+        self._pipelines = {}
+        self._lock = threading.Lock()
+
+    def state(self, pipeline: str, job_id: str, list_jobs: callable):
+        """
+        Returns the state of a job (None if the job does not exist in the pipeline).
+
+        Args:
+            pipeline (str): pipeline name
+            job_id (str): job id
+            list_jobs (callable): returns an iterator of the pipeline's `JobInfo` (newest first)
+
+        """
+        state = self.lookup(pipeline, job_id)
+        if state is not None:
+            return state
+
+        # unknown or possibly outdated job -> catch up with the newest jobs
+        return self.refresh(pipeline, list_jobs).states.get(job_id)
+
+    def lookup(self, pipeline: str, job_id: str):
+        """
+        Returns the state of a job if it can be served without refreshing the index (None otherwise).
+        """
+        with self._lock:
+            entry = self._pipelines.get(pipeline)
+
+        if entry and job_id in entry.states:
+            state = entry.states[job_id]
+            now = time.monotonic()
+            if now - entry.refreshed_at < self.ttl or \
+                    (state in TERMINAL_JOB_STATES and now - entry.listed_at < self.terminal_ttl):
+                return state
+        return None
+
+    def refresh(self, pipeline: str, list_jobs: callable):
+        refresh = self.begin_refresh(pipeline)
+        stream = list_jobs()
+        for job in stream:
+            if refresh.add(job):
+                # every older job is already known (and finished)
+                if hasattr(stream, 'cancel'):
+                    stream.cancel()
+                break
+        return refresh.finish()
+
+    def begin_refresh(self, pipeline: str):
+        """
+        Starts a refresh of a pipeline, fed with its jobs (newest first) until it is done (see `_Refresh`).
+        """
+        with self._lock:
+            entry = self._pipelines.get(pipeline)
+        if entry and time.monotonic() - entry.listed_at >= self.terminal_ttl:
+            # finished jobs may have been deleted since the last full listing
+            entry = None
+        return _Refresh(self, pipeline, entry)
+
+    def replace(self, pipeline: str, jobs: list):
+        """
+        Rebuilds the index of a pipeline from a complete listing of its jobs (newest first).
+        """
+        return self._store(pipeline, {job.job.id: job.state for job in jobs}, jobs[0].job.id if jobs else None)
+
+    def forget(self, pipeline: str, job_id: str = None):
+        """
+        Drops a job (or the whole pipeline if no job is given) from the index.
+        """
+        with self._lock:
+            if job_id is None:
+                self._pipelines.pop(pipeline, None)
+            elif pipeline in self._pipelines:
+                entry = self._pipelines[pipeline]
+                # copy-on-write: concurrent refreshes may be reading the current states
+                entry.states = {j: s for j, s in entry.states.items() if j != job_id}
+
+    def clear(self):
+        with self._lock:
+            self._pipelines.clear()
+
+    def _store(self, pipeline: str, states: dict, head: str, listed_at: float = None):
+        entry = _PipelineJobs(states, head, listed_at)
+        with self._lock:
+            self._pipelines[pipeline] = entry
+        return entry
+
+
+class _Refresh:
+    """
+    Refresh of the jobs of a pipeline, fed one listed job at a time (so listings can be consumed synchronously or
+    asynchronously).
+    """
+
+    def __init__(self, index: JobIndex, pipeline: str, entry: _PipelineJobs):
+        self.index = index
+        self.pipeline = pipeline
+        self.entry = entry
+        self.head = entry.head if entry else None
+        self.pending = {j for j, s in entry.states.items() if s not in TERMINAL_JOB_STATES} if entry else set()
+        self.seen = {}
+        self.new_head = None
+        self.passed_head = False
+        self.done = False
+
+    def add(self, job):
+        """
+        Adds the next listed job.
+
+        Returns:
+            <True once the rest of the listing is already known (and finished)>
+
+        """
+        job_id = job.job.id
+        self.new_head = self.new_head or job_id
+        self.seen[job_id] = job.state
+        self.pending.discard(job_id)
+        self.passed_head = self.passed_head or job_id == self.head
+        self.done = self.passed_head and not self.pending
+        return self.done
+
+    def finish(self):
+        """
+        Stores the refreshed jobs.
+
+        Returns:
+            <_PipelineJobs>
+
+        """
+        if self.done:
+            states = dict(self.entry.states)
+            states.update(self.seen)
+            return self.index._store(self.pipeline, states, self.new_head or self.head, self.entry.listed_at)
+
+        # full pass: the listing is the whole truth
+        return self.index._store(self.pipeline, self.seen, self.new_head or self.head)
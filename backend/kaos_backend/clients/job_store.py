@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import replace
+
+from kaos_backend.util.metric_table import MetricTable
+from kaos_model.common import JobInfo, PartitionInfo
+
+# bumped on incompatible changes (tables of older versions are dropped)
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    workspace TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    process_time INTEGER NOT NULL,
+    available_metrics TEXT NOT NULL,
+    metric_table TEXT NOT NULL,
+    PRIMARY KEY (workspace, job_id)
+);
+CREATE TABLE IF NOT EXISTS partitions (
+    workspace TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    partition TEXT NOT NULL,
+    PRIMARY KEY (workspace, job_id, position)
+);
+CREATE TABLE IF NOT EXISTS models (
+    workspace TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (workspace, model_id)
+);
+"""
+
+# tables of every version, dropped on upgrade
+TABLES = ("jobs", "partitions", "models", "scores")
+
+MAX_VARIABLES = 500
+
+
+class JobStore:
+    """
+    SQLite store of the `JobInfo` of finished training jobs (which never changes once computed).
+
+    Partitions are stored in their computed order, along with the `MetricTable` of the job, from which pages sorted by
+    any metric are selected before their partitions are loaded. The partition of each model is also indexed by model id
+    (<output branch>:<model prefix>), for provenance lookups.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        """
+        JobStore constructor.
+
+        Args:
+            path (str): database file (shared by the workers of a pod)
+            timeout (float): maximum wait (in seconds) for a lock held by another worker
+        """
+        self.path = path
+        self.timeout = timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            version, = connection.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                for table in TABLES:
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # connections are cheap and cannot be shared by threads
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def put(self, workspace: str, job_info: JobInfo, metric_table: MetricTable):
+        """
+        Stores a finished job.
+
+        Args:
+            workspace (str): name of the workspace
+            job_info (JobInfo): job, with its partitions (scores are not stored)
+            metric_table (MetricTable): metrics of the partitions
+        """
+        partitions = [(workspace, job_info.job_id, position, replace(partition, score=None).to_json())
+                      for position, partition in enumerate(job_info.partitions)]
+        models = [(workspace, partition.output.path, job_info.job_id, position)
+                  for position, partition in enumerate(job_info.partitions)]
+
+        with self._connect() as connection:
+            connection.execute("DELETE FROM partitions WHERE workspace = ? AND job_id = ?",
+                               (workspace, job_info.job_id))
+            connection.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                               (workspace, job_info.job_id, job_info.state, job_info.process_time,
+                                json.dumps(job_info.available_metrics), metric_table.to_json()))
+            connection.executemany("INSERT INTO partitions VALUES (?, ?, ?, ?)", partitions)
+            connection.executemany("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?)", models)
+
+    def get(self, workspace: str, job_id: str):
+        """
+        Loads a stored job, without its partitions.
+
+        Returns:
+            <JobInfo without partitions>, <MetricTable of its partitions> or None if the job is not stored
+
+        """
+        with self._connect() as connection:
+            job = connection.execute("SELECT state, process_time, available_metrics, metric_table FROM jobs "
+                                     "WHERE workspace = ? AND job_id = ?", (workspace, job_id)).fetchone()
+        if job is None:
+            return None
+
+        state, process_time, available_metrics, metric_table = job
+        return JobInfo(job_id=job_id,
+                       state=state,
+                       process_time=process_time,
+                       available_metrics=json.loads(available_metrics),
+                       partitions=[]), MetricTable.from_json(metric_table)
+
+    def get_partitions(self, workspace: str, job_id: str, positions: list):
+        """
+        Loads partitions of a stored job.
+
+        Args:
+            workspace (str): name of the workspace
+            job_id (str): id of the job
+            positions (list): positions of the partitions (as selected by its `MetricTable`)
+
+        Returns:
+            <list of the (unscored) PartitionInfo at each position>
+
+        """
+        partitions = {}
+        with self._connect() as connection:
+            # bounded by the number of variables of a statement
+            for start in range(0, len(positions), MAX_VARIABLES):
+                batch = positions[start:start + MAX_VARIABLES]
+                partitions.update(connection.execute(
+                    "SELECT position, partition FROM partitions WHERE workspace = ? AND job_id = ? "
+                    f"AND position IN ({', '.join('?' * len(batch))})", [workspace, job_id] + list(batch)).fetchall())
+
+        return [PartitionInfo.from_json(partitions[position]) for position in positions]
+
+    def get_model(self, workspace: str, model_id: str):
+        """
+        Loads the partition of a model of a stored job.
+
+        Returns:
+            <the (unscored) PartitionInfo of the model> or None if the job of the model is not stored
+
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT p.partition FROM models m JOIN partitions p ON p.workspace = m.workspace "
+                "AND p.job_id = m.job_id AND p.position = m.position WHERE m.workspace = ? AND m.model_id = ?",
+                (workspace, model_id)).fetchone()
+        return PartitionInfo.from_json(row[0]) if row is not None else None
+
+    def delete(self, workspace: str, job_id: str = None):
+        """
+        Deletes a stored job, or every stored job of a workspace.
+
+        Args:
+            workspace (str): name of the workspace
+            job_id (str): id of the job (every job of the workspace if None)
+        """
+        condition, parameters = ("workspace = ?", (workspace,)) if job_id is None else \
+            ("workspace = ? AND job_id = ?", (workspace, job_id))
+        with self._connect() as connection:
+            for table in ("jobs", "partitions", "models"):
+                connection.execute(f"DELETE FROM {table} WHERE {condition}", parameters)
+
+    def clear(self):
+        with self._connect() as connection:
+            for table in ("jobs", "partitions", "models"):
+                connection.execute(f"DELETE FROM {table}")
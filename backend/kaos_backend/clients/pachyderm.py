@@ -1,17 +1,31 @@
 import os
-from concurrent.futures import ThreadPoolExecutor
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
-import bitstring
+import grpc
 import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
 import urllib3
 from cgroupspy import trees
 from flask import current_app as app
+from kaos_backend.clients.channel import ChannelPool
+from kaos_backend.clients.content_cache import ContentCache
+from kaos_backend.clients.bundle_index import BundleIndex
+from kaos_backend.clients.commit_index import CommitIndex
+from kaos_backend.clients.job_index import JobIndex
+from kaos_backend.clients.snapshot import MetadataSnapshot
+from kaos_backend.constants import METADATA_TTL, PUT_BATCH_BYTES, TRANSFER_MEMORY_FRACTION, WORKERS, \
+    FINISHED_JOB_TTL
 from kaos_backend.exceptions.exceptions import JobNotFoundError, PipelineNotFoundError, PipelineInStandby
-from kaos_backend.util.error_handling import handle_pachyderm_error
+from kaos_backend.util.budget import MemoryBudget
+from kaos_backend.util.error_handling import handle_pachyderm_error, handle_pachyderm_stream_error
+from kaos_backend.util.helpers import copy_current_app_context, iter_file_chunks
 from kaos_backend.util.protobuf import proto_to_dict
 from psutil import virtual_memory
 from python_pachyderm import PpsClient, PfsClient
 from python_pachyderm.client.pps import pps_pb2 as proto
+from python_pachyderm.pfs_client import BUFFER_SIZE
 from urllib3 import PoolManager
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -26,16 +40,48 @@ class PachydermClient:
 
     GPU_TYPE = "nvidia.com/gpu"
 
-    def __init__(self, pps_client: PpsClient, pfs_client: PfsClient):
+    # memory reserved by a single streaming upload or download (a couple of gRPC messages in flight)
+    TRANSFER_BUFFER_BYTES = 2 * BUFFER_SIZE
+
+    PIPELINES = "pipelines"
+    REPOS = "repos"
+    BRANCHES = "branches"
+
+    # commit ids (anything else, e.g. a branch name, moves)
+    COMMIT_ID = re.compile("^[0-9a-f]{32}$")
+
+    # finished commits remembered (least recently used forgotten first)
+    FINISHED_COMMITS = 10000
+
+    # status codes of a glob listing rejected by Pachyderm (anything else, e.g. NOT_FOUND, is a genuine failure)
+    GLOB_REJECTED = (grpc.StatusCode.INVALID_ARGUMENT, grpc.StatusCode.UNIMPLEMENTED, grpc.StatusCode.UNKNOWN)
+
+    def __init__(self,
+                 pps_client: PpsClient,
+                 pfs_client: PfsClient,
+                 metadata_ttl: float = METADATA_TTL,
+                 channel_pool: ChannelPool = None,
+                 content_cache: ContentCache = None):
         """
         PachydermClient constructor.
 
         Args:
             pps_client (PpsClient): Pachyderm Pipeline System client
             pfs_client (PfsClient): Pachyderm File System client
+            metadata_ttl (float): lifetime (in seconds) of the pipeline/repo/branch snapshot used by existence checks
+            channel_pool (ChannelPool): shared channel of the clients (if any)
+            content_cache (ContentCache): cache of file contents and listings under finished commits (if any)
         """
         self.pps_client = pps_client
         self.pfs_client = pfs_client
+        self.channel_pool = channel_pool
+        self.content_cache = content_cache
+        self.finished_commits = OrderedDict()
+        self.finished_commits_lock = threading.Lock()
+        self.snapshot = MetadataSnapshot(metadata_ttl)
+        self.job_index = JobIndex(metadata_ttl, FINISHED_JOB_TTL)
+        self.bundle_index = BundleIndex()
+        self.commit_index = CommitIndex()
         self.pool = PoolManager()
         # TODO: expose
         self.max_workers = 20
@@ -45,6 +91,8 @@ class PachydermClient:
             # cgroups not found, probably running on local machine
             self.memory_limit = virtual_memory().available
         self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # bounds the bytes of concurrent PFS transfers running on the executor (each worker process has its own)
+        self.transfer_budget = MemoryBudget(self.memory_limit * TRANSFER_MEMORY_FRACTION / WORKERS)
 
     @handle_pachyderm_error
     def create_pipeline(self,
@@ -74,7 +122,7 @@ class PachydermClient:
 
         resource_limits, resource_requests = self.define_resources(cpu, gpu, memory)
 
-        return self.pps_client.create_pipeline(
+        response = self.pps_client.create_pipeline(
             name,
             description=description,
             transform=transform,
@@ -90,6 +138,11 @@ class PachydermClient:
             resource_requests=resource_requests,
             resource_limits=resource_limits)
 
+        # a pipeline also owns an output repo (and its branches)
+        self.snapshot.invalidate(self.PIPELINES, self.REPOS, (self.BRANCHES, name))
+
+        return response
+
     def define_resources(self, cpu, gpu, memory):
         cpu = float(cpu) if cpu else cpu
 
@@ -125,14 +178,29 @@ class PachydermClient:
         app.logger.debug("@%s: creating repo %s", PachydermClient.__name__, repo)
 
         # make new repo (if needed)
-        repos = [r.repo.name for r in self.pfs_client.list_repo()]
-        if repo not in repos:
+        if not self.check_repo_exists(repo):
             app.logger.debug("@%s: repo does not exists %s", PachydermClient.__name__, repo)
-            self.pfs_client.create_repo(repo, description=desc)
-            self.pfs_client.create_branch(repo, "master")
+            self.init_repo(repo, desc=desc)
         else:
             app.logger.debug("@%s: repo exists %s", PachydermClient.__name__, repo)
 
+    @handle_pachyderm_error
+    def init_repo(self, repo: str, desc=None):
+        """
+        Creates a repo known not to exist (e.g. from a listing of the repos), with its master branch.
+        """
+        app.logger.debug("@%s: init repo %s", PachydermClient.__name__, repo)
+        self.pfs_client.create_repo(repo, description=desc)
+        self.pfs_client.create_branch(repo, "master")
+        self.snapshot.invalidate(self.REPOS, (self.BRANCHES, repo))
+
+    @handle_pachyderm_error
+    def create_branch(self, repo: str, branch: str):
+        app.logger.debug("@%s: creating branch %s in repo %s", PachydermClient.__name__, branch, repo)
+        response = self.pfs_client.create_branch(repo_name=repo, branch_name=branch)
+        self.snapshot.invalidate((self.BRANCHES, repo))
+        return response
+
     @proto_to_dict
     def kill_build_train_pipeline(self):
         pass
@@ -158,16 +226,60 @@ class PachydermClient:
         pass
 
     @handle_pachyderm_error
-    def put_blobs(self, repo: str, blobs_list: list, desc=None):
+    def put_blobs(self, repo: str, blobs_list: list, desc=None, batch_bytes=PUT_BATCH_BYTES, progress=None):
+        """
+        Puts blobs in a single commit, streaming them through as few PutFile requests as possible.
+
+        Args:
+            repo (str): name of the repository
+            blobs_list (list): blobs as {'path': <path>, 'blob': <bytes>}
+            desc (str): description of the commit
+            batch_bytes (int): maximum payload of a single request (a larger blob gets a request of its own)
+            progress (callable): called with (blobs put, total blobs) after each request
+
+        Returns:
+            <id of the commit>
+
+        """
         app.logger.debug("@%s: put blobs in repository %s", PachydermClient.__name__, repo)
         # keep single commit for input data
         with self.pfs_client.commit(repo, 'master', description=desc) as c:
-            for blob in blobs_list:
-                self.pfs_client.put_file_bytes(c, blob['path'], blob['blob'], overwrite_index=0)
+            done = 0
+            for batch in self.__batch_blobs(blobs_list, batch_bytes):
+                self.pfs_client.stub.PutFile(self.__put_file_requests(c, batch), metadata=self.pfs_client.metadata)
+                done += len(batch)
+                app.logger.debug("@%s: put %d/%d blobs in repository %s", PachydermClient.__name__, done,
+                                 len(blobs_list), repo)
+                if progress:
+                    progress(done, len(blobs_list))
             commit_id = c.id
 
         return commit_id
 
+    @staticmethod
+    def __batch_blobs(blobs_list: list, batch_bytes: int):
+        batch, size = [], 0
+        for blob in blobs_list:
+            if batch and size + len(blob['blob']) > batch_bytes:
+                yield batch
+                batch, size = [], 0
+            batch.append(blob)
+            size += len(blob['blob'])
+        if batch:
+            yield batch
+
+    @staticmethod
+    def __put_file_requests(commit, blobs_list: list):
+        # a request naming a file starts it (and ends the previous one), the following ones carry the rest of it
+        overwrite_index = pfs_proto.OverwriteIndex(index=0)
+        for blob in blobs_list:
+            data = blob['blob']
+            yield pfs_proto.PutFileRequest(file=pfs_proto.File(commit=commit, path=blob['path']),
+                                           value=data[:BUFFER_SIZE],
+                                           overwrite_index=overwrite_index)
+            for offset in range(BUFFER_SIZE, len(data), BUFFER_SIZE):
+                yield pfs_proto.PutFileRequest(value=data[offset:offset + BUFFER_SIZE])
+
     @handle_pachyderm_error
     def put_blob(self, repo: str, path, blob, split_by_lines=None, desc=None):
         app.logger.debug("@%s: put blob in repository %s", PachydermClient.__name__, repo)
@@ -184,11 +296,27 @@ class PachydermClient:
                  for paths in map(lambda x: [os.path.join(x[0], f) for f in x[2]],
                                   os.walk(path, followlinks=True))
                  for pathname in paths]
-        # keep single commit for input data
+
+        @copy_current_app_context
+        def upload(commit, file: str, reserved: int):
+            try:
+                upload_f(path, commit, file)
+            finally:
+                self.transfer_budget.release(reserved)
+
+        # keep single commit for input data (files are uploaded concurrently within it)
         with self.pfs_client.commit(repo, 'master', description=desc) as c:
+            futures = []
             for file in files:
-                if os.stat(file).st_size != 0:
-                    upload_f(path, c, file)
+                size = os.stat(file).st_size
+                if size != 0:
+                    reserved = self.transfer_budget.acquire(min(size, self.TRANSFER_BUFFER_BYTES))
+                    futures.append(self.executor.submit(upload, c, file, reserved))
+
+            # the commit must not be finished while uploads are still running
+            wait(futures)
+            for future in futures:
+                future.result()
             commit_id = c.id
         return commit_id
 
@@ -199,8 +327,9 @@ class PachydermClient:
             repo_name = commit.repo.name
             app.logger.debug("@%s: upload files at path %s with commit id %s on repo %s",
                              PachydermClient.__name__, path, commit_id, repo_name)
+            # stream the file instead of loading it in memory
             self.pfs_client.put_file_bytes(commit, os.path.join(prefix, os.path.relpath(file, path)),
-                                           open(file, "rb").read(),
+                                           iter_file_chunks(file, BUFFER_SIZE),
                                            overwrite_index=0)
 
         return self.put_dir_base(repo, source_path, upload_files, desc)
@@ -209,42 +338,198 @@ class PachydermClient:
     def get_dir(self, repo: str, commit: str, path: str, out_dir=os.getcwd(), remove_prefix=False):
         app.logger.debug("@%s: get dir from repo %s with commit id %s", PachydermClient.__name__, repo, commit)
         objs = self.list_file(f"{repo}/{commit}", path=path, recursive=True)
+
+        @copy_current_app_context
+        def download(obj_path: str, out_file_path: str, reserved: int):
+            try:
+                with open(out_file_path, 'wb') as dst:
+                    for i in self.iter_blob(repo, commit, obj_path):
+                        dst.write(i)
+            finally:
+                self.transfer_budget.release(reserved)
+
+        # files are streamed to disk concurrently, as long as their buffers fit in the transfer budget
+        futures = []
         for obj in objs:
             obj_path = obj.file.path
-            x = self.pfs_client.get_file(f"{repo}/{commit}",
-                                         path=obj_path)
             if remove_prefix:
                 obj_path = os.path.relpath(obj_path, path)
             # TODO -> attach <output_branch> when saving model (for consistency)
             out_file_path = os.path.join(out_dir, obj_path.strip('/'))
             os.makedirs(os.path.dirname(out_file_path), exist_ok=True)
-            with open(out_file_path, 'wb') as dst:
-                for i in x:
-                    dst.write(i)
+
+            reserved = self.transfer_budget.acquire(min(obj.size_bytes, self.TRANSFER_BUFFER_BYTES))
+            futures.append(self.executor.submit(download, obj.file.path, out_file_path, reserved))
+
+        # wait for every download before surfacing the first error
+        wait(futures)
+        for future in futures:
+            future.result()
 
     @handle_pachyderm_error
-    def get_blob(self, repo: str, commit: str, path: str):
+    def get_blob(self, repo: str, commit: str, path: str, size_bytes: int = None):
+        """
+        Reads a whole file in memory.
+
+        Args:
+            repo (str): repository name
+            commit (str): commit id or branch
+            path (str): path of the file (or glob matching a single file)
+            size_bytes (int): size of the file, if known (allows assembling it in a pre-sized buffer)
+
+        Returns:
+            <bytes-like content of the file>
+
+        """
         app.logger.debug("@%s: get blob from repo %s at path %s with commit id %s", PachydermClient.__name__, repo,
                          path, commit)
 
-        file = self.pfs_client.get_file(f"{repo}/{commit}",
-                                        path=path)
-        stream = bitstring.BitStream()
+        key = ("blob", repo, commit, path)
+        blob = self.__cached(key, repo, commit)
+        if blob is not None:
+            return blob
+
+        blob = self.__get_blob(repo, commit, path, size_bytes)
+        if self.__is_immutable(repo, commit):
+            self.content_cache.put(key, blob)
+        return blob
+
+    def __get_blob(self, repo: str, commit: str, path: str, size_bytes: int = None):
+        chunks = self.pfs_client.get_file(f"{repo}/{commit}",
+                                          path=path)
+
+        if size_bytes is None:
+            # join sizes its output once -> single copy of the chunks
+            return b"".join(chunks)
+
+        blob = bytearray(size_bytes)
+        view = memoryview(blob)
+        offset = 0
+        for chunk in chunks:
+            end = offset + len(chunk)
+            if end > size_bytes:
+                # file grew past the hint: fall back to joining the remainder
+                return b"".join([view[:offset], chunk, *chunks])
+            view[offset:end] = chunk
+            offset = end
+
+        return blob if offset == size_bytes else blob[:offset]
+
+    @handle_pachyderm_stream_error
+    def iter_blob(self, repo: str, commit: str, path: str):
+        """
+        Streams a file chunk by chunk, without holding it in memory.
 
-        for chunk in file:
-            stream.append(chunk)
+        Args:
+            repo (str): repository name
+            commit (str): commit id or branch
+            path (str): path of the file
+
+        Returns:
+            <generator of bytes chunks>
 
-        return stream.bytes
+        """
+        app.logger.debug("@%s: iterate blob from repo %s at path %s with commit id %s", PachydermClient.__name__,
+                         repo, path, commit)
+
+        key = ("blob", repo, commit, path)
+        cached = self.content_cache.open(key) if self.__is_commit_id(commit) else None
+        if cached is not None:
+            with cached:
+                # chunks as served by pachd, without over-allocating for small files
+                chunk_size = max(min(BUFFER_SIZE, os.fstat(cached.fileno()).st_size), 1)
+                yield from iter(lambda: cached.read(chunk_size), b"")
+            return
+
+        chunks = self.pfs_client.get_file(f"{repo}/{commit}", path=path)
+        if not self.__is_immutable(repo, commit):
+            yield from chunks
+            return
+
+        # tee the stream into the cache (discarded if the stream is not consumed to the end)
+        with self.content_cache.writer(key) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
 
     @handle_pachyderm_error
     def list_pipelines(self):
         app.logger.debug("@%s: list pipelines", PachydermClient.__name__)
-        return [r.pipeline.name for r in self.pps_client.list_pipeline().pipeline_info]
+        return [info.pipeline.name for info in self.list_pipeline_infos()]
+
+    @handle_pachyderm_error
+    def list_pipeline_infos(self):
+        """
+        Lists the `PipelineInfo` of every pipeline (with their state, description and creation time) in a single call.
+        """
+        app.logger.debug("@%s: list pipeline infos", PachydermClient.__name__)
+        infos = list(self.pps_client.list_pipeline().pipeline_info)
+        # a full listing is always fresh -> refresh the snapshot for free
+        self.snapshot.put(self.PIPELINES, frozenset(info.pipeline.name for info in infos))
+        return infos
+
+    def list_pipeline_inputs(self):
+        """
+        Lists the input repos of every pipeline (by pipeline name) in a single call.
+        """
+        app.logger.debug("@%s: list pipeline inputs", PachydermClient.__name__)
+        return {info.pipeline.name: self.__input_repos(info.input) for info in self.list_pipeline_infos()}
+
+    @staticmethod
+    def __input_repos(pipeline_input):
+        if pipeline_input.HasField("pfs"):
+            return {pipeline_input.pfs.repo}
+        if pipeline_input.HasField("cron"):
+            return {pipeline_input.cron.repo}
+        return {repo for child in list(pipeline_input.cross) + list(pipeline_input.union)
+                for repo in PachydermClient.__input_repos(child)}
 
     @handle_pachyderm_error
     def list_repos(self):
         app.logger.debug("@%s: list repo", PachydermClient.__name__)
-        return [r.repo.name for r in self.pfs_client.list_repo()]
+        names = [r.repo.name for r in self.pfs_client.list_repo()]
+        self.snapshot.put(self.REPOS, frozenset(names))
+        return names
+
+    def __pipeline_names(self):
+        return self.snapshot.get(self.PIPELINES, lambda: frozenset(self.list_pipelines()))
+
+    def __repo_names(self):
+        return self.snapshot.get(self.REPOS, lambda: frozenset(self.list_repos()))
+
+    def __branch_names(self, repo: str):
+        return self.snapshot.get((self.BRANCHES, repo),
+                                 lambda: frozenset(r.name for r in self.pfs_client.list_branch(repo)))
+
+    def __is_commit_id(self, commit: str):
+        return self.content_cache is not None and self.COMMIT_ID.match(commit) is not None
+
+    def __cached(self, key: tuple, repo: str, commit: str):
+        return self.content_cache.get(key) if self.__is_commit_id(commit) else None
+
+    def __is_immutable(self, repo: str, commit: str):
+        """
+        Checks whether `commit` is the id of a finished commit (whose content can be cached).
+        """
+        if not self.__is_commit_id(commit):
+            return False
+        with self.finished_commits_lock:
+            if (repo, commit) in self.finished_commits:
+                self.finished_commits.move_to_end((repo, commit))
+                return True
+
+        info = self.pfs_client.inspect_commit(f"{repo}/{commit}")
+        if info.HasField("finished"):
+            with self.finished_commits_lock:
+                self.finished_commits[(repo, commit)] = True
+                if len(self.finished_commits) > self.FINISHED_COMMITS:
+                    self.finished_commits.popitem(last=False)
+            return True
+        return False
+
+    def invalidate_metadata(self):
+        app.logger.debug("@%s: invalidate metadata snapshot", PachydermClient.__name__)
+        self.snapshot.invalidate()
 
     @handle_pachyderm_error
     def check_repo_empty(self, repo: str):
@@ -259,44 +544,136 @@ class PachydermClient:
     @handle_pachyderm_error
     def check_pipeline_exists(self, pipeline: str):
         app.logger.debug("@%s: check pipeline %s exists", PachydermClient.__name__, pipeline)
-        return pipeline in self.list_pipelines()
+        return pipeline in self.__pipeline_names()
 
     @handle_pachyderm_error
     def check_repo_exists(self, repo: str):
         app.logger.debug("@%s: check repo %s exists", PachydermClient.__name__, repo)
-        repos = [r.repo.name for r in self.pfs_client.list_repo()]
-        return repo in repos
+        return repo in self.__repo_names()
 
     @handle_pachyderm_error
     def check_branch_exists(self, repo: str, branch: str):
         app.logger.debug("@%s: check branch %s exists in %s", PachydermClient.__name__, branch, repo)
-        branches = [r.name for r in self.pfs_client.list_branch(repo)]
-        return branch in branches
+        return branch in self.__branch_names(repo)
+
+    def __job_state(self, pipeline_name: str, job_id: str):
+        return self.job_index.state(pipeline_name, job_id,
+                                    lambda: self.pps_client.list_job(pipeline_name, history=-1))
 
     @handle_pachyderm_error
     def check_job_running(self, pipeline_name: str, job_id: str):
-        app.logger.debug("@%s: check job %s exists from %s", PachydermClient.__name__, job_id, pipeline_name)
-        jobs = [(r.job.id, r.state) for r in self.pps_client.list_job(pipeline_name, history=-1)]
-        app.logger.debug(jobs)
-        return (job_id, 0) in jobs or (job_id, 1) in jobs
+        app.logger.debug("@%s: check job %s running from %s", PachydermClient.__name__, job_id, pipeline_name)
+        return self.__job_state(pipeline_name, job_id) in (proto.JOB_STARTING, proto.JOB_RUNNING)
 
     @handle_pachyderm_error
     def check_job_exists(self, pipeline_name: str, job_id: str):
         app.logger.debug("@%s: check job %s exists from %s", PachydermClient.__name__, job_id, pipeline_name)
-        jobs = [r.job.id for r in self.pps_client.list_job(pipeline_name, history=-1)]
-        return job_id in jobs
+        return self.__job_state(pipeline_name, job_id) is not None
 
     @handle_pachyderm_error
     def list_file(self, commit: str, path: str, recursive=False, history=-1):
         app.logger.debug("@%s: list file from commit %s in path %s", PachydermClient.__name__, commit, path)
-        file_infos = list(self.pfs_client.list_file(commit, path, history=history))
 
         if recursive:
-            dirs = [f for f in file_infos if f.file_type == pfs_proto.DIR]
-            files = [f for f in file_infos if f.file_type == pfs_proto.FILE]
-            return sum([self.list_file(commit, d.file.path, recursive) for d in dirs], files)
+            return self.__listing(commit, ("list", path, recursive, history), lambda: list(self.walk_files(commit, path)))
+
+        return self.__listing(commit, ("list", path, recursive, history),
+                              lambda: list(self.pfs_client.list_file(commit, path, history=history)))
+
+    @handle_pachyderm_error
+    def glob_file(self, commit: str, pattern: str):
+        app.logger.debug("@%s: glob file from commit %s with pattern %s", PachydermClient.__name__, commit, pattern)
+
+        return self.__listing(commit, ("glob", pattern), lambda: list(self.pfs_client.glob_file(commit, pattern)))
+
+    def __listing(self, commit: str, key: tuple, list_f: callable):
+        """
+        Lists files with `list_f` (returning a list), through the content cache if `commit` (<repo>/<commit or branch>)
+        is finished.
+        """
+        repo, commit_id = commit.split("/", 1)
+        key = (key[0], repo, commit_id) + key[1:]
+        cached = self.__cached(key, repo, commit_id)
+        if cached is not None:
+            return list(pfs_proto.FileInfos.FromString(cached).file_info)
+
+        files = list_f()
+        if not self.__is_immutable(repo, commit_id):
+            return files
+
+        self.content_cache.put(key, pfs_proto.FileInfos(file_info=files).SerializeToString())
+        return files
+
+    @handle_pachyderm_stream_error
+    def walk_files(self, commit: str, path: str):
+        """
+        Lists every file below `path` (or `path` itself if it is a file) with a single server-side glob.
+
+        Falls back to a concurrent breadth-first traversal if the glob listing is rejected by Pachyderm.
+
+        Args:
+            commit (str): <repo>/<commit or branch>
+            path (str): root of the walk
+
+        Returns:
+            <generator of FileInfo objects (files only)>
+
+        """
+        app.logger.debug("@%s: walk files from commit %s in path %s", PachydermClient.__name__, commit, path)
+
+        found = False
+        try:
+            for f in self.pfs_client.glob_file(commit, os.path.join(path, "**")):
+                if f.file_type == pfs_proto.FILE:
+                    found = True
+                    yield f
+
+            if not found:
+                # nothing below `path` -> it might be a file itself
+                yield from (f for f in self.pfs_client.glob_file(commit, path) if f.file_type == pfs_proto.FILE)
+        except grpc.RpcError as e:
+            if found or e.code() not in self.GLOB_REJECTED:
+                raise
+            app.logger.warning("@%s: glob walk failed (%s), falling back to traversal", PachydermClient.__name__, e)
+            yield from self.__walk_files_concurrently(commit, path)
+
+    def __walk_files_concurrently(self, commit: str, path: str):
+        @copy_current_app_context
+        def list_dir(d: str):
+            return list(self.pfs_client.list_file(commit, d, history=-1))
+
+        # list each level of the tree concurrently
+        level = [path]
+        while level:
+            next_level = []
+            for file_infos in self.executor.map(list_dir, level):
+                for f in file_infos:
+                    if f.file_type == pfs_proto.DIR:
+                        next_level.append(f.file.path)
+                    elif f.file_type == pfs_proto.FILE:
+                        yield f
+            level = next_level
+
+    @handle_pachyderm_error
+    def check_bundle_exists(self, repo: str, name: str):
+        """
+        Checks whether the master branch of `repo` holds a non-empty top-level bundle `name`, through the bundle index
+        (a single call while no commit landed on master).
+        """
+        app.logger.debug("@%s: check bundle %s exists in repo %s", PachydermClient.__name__, name, repo)
 
-        return file_infos
+        branches = list(self.pfs_client.list_branch(repo))
+        # a complete listing of the branches -> refresh the snapshot for free
+        self.snapshot.put((self.BRANCHES, repo), frozenset(b.name for b in branches))
+        head = next((b.head.id for b in branches if b.name == "master" and b.HasField("head")), None)
+        if head is None:
+            return False
+
+        def list_bundles():
+            return [os.path.basename(f.file.path) for f in self.pfs_client.list_file(f"{repo}/{head}", "/")
+                    if f.size_bytes != 0]
+
+        return self.bundle_index.contains(repo, head, name.strip("/"), list_bundles)
 
     @handle_pachyderm_error
     def inspect_file(self, commit: str, path: str):
@@ -308,6 +685,20 @@ class PachydermClient:
         app.logger.debug("@%s: list commit %s in repo %s", PachydermClient.__name__, to_commit, repo)
         return self.pfs_client.list_commit(repo_name=repo, to_commit=to_commit)
 
+    @handle_pachyderm_error
+    def get_latest_commit(self, repo: str, branch: str):
+        """
+        Returns the id of the latest non-empty commit of a branch (None if there is none), through the commit index
+        (without listing the whole history of the branch).
+        """
+        app.logger.debug("@%s: get latest commit of branch %s in repo %s", PachydermClient.__name__, branch, repo)
+        stream = self.pfs_client.list_commit(repo_name=repo, to_commit=f"{repo}/{branch}")
+        try:
+            return self.commit_index.latest(repo, branch, stream)
+        finally:
+            if hasattr(stream, 'cancel'):
+                stream.cancel()
+
     @handle_pachyderm_error
     def inspect_commit(self, commit: str):
         app.logger.debug("@%s: inspect commit %s", PachydermClient.__name__, commit)
@@ -321,12 +712,19 @@ class PachydermClient:
     @handle_pachyderm_error
     def delete_repo(self, repo_name: str):
         app.logger.debug("@%s: delete repo %s", PachydermClient.__name__, repo_name)
-        return self.pfs_client.delete_repo(repo_name, force=True)
+        response = self.pfs_client.delete_repo(repo_name, force=True)
+        self.snapshot.invalidate(self.REPOS, (self.BRANCHES, repo_name))
+        self.bundle_index.forget(repo_name)
+        self.commit_index.forget(repo_name)
+        return response
 
     @handle_pachyderm_error
     def delete_pipeline(self, pipeline_name):
         app.logger.debug("@%s: delete pipeline %s", PachydermClient.__name__, pipeline_name)
-        return self.pps_client.delete_pipeline(pipeline_name)
+        response = self.pps_client.delete_pipeline(pipeline_name)
+        self.snapshot.invalidate(self.PIPELINES, self.REPOS, (self.BRANCHES, pipeline_name))
+        self.job_index.forget(pipeline_name)
+        return response
 
     @handle_pachyderm_error
     def delete_job(self, pipeline_name, job_id):
@@ -339,7 +737,9 @@ class PachydermClient:
         if not self.check_job_exists(pipeline_name, job_id):
             raise JobNotFoundError(job_id)
 
-        return self.pps_client.delete_job(job_id)
+        response = self.pps_client.delete_job(job_id)
+        self.job_index.forget(pipeline_name, job_id)
+        return response
 
     @handle_pachyderm_error
     def get_job_logs(self, pipeline_name, job_id):
@@ -374,11 +774,82 @@ class PachydermClient:
 
         return self.pps_client.get_pipeline_logs(pipeline_name=pipeline_name)
 
+    @handle_pachyderm_stream_error
+    def stream_logs(self, pipeline_name: str, job_id=None, datum_id=None, follow=False, tail=0):
+        """
+        Streams the log messages of a pipeline (of one of its jobs, or of one datum of the job) as they are read.
+
+        Closing the generator cancels the call (e.g. when following the logs of a running job).
+
+        Args:
+            pipeline_name (str): pipeline name
+            job_id (str): job id (all jobs if None)
+            datum_id (str): datum id (of the job, all datums if None)
+            follow (bool): keep streaming new messages
+            tail (int): number of most recent messages (per worker) to start from (all if 0)
+
+        Returns:
+            <generator of `LogMessage`>
+
+        """
+        app.logger.debug("@%s: stream logs from pipeline %s (job %s, datum %s)", PachydermClient.__name__,
+                         pipeline_name, job_id, datum_id)
+
+        request = proto.GetLogsRequest(pipeline=proto.Pipeline(name=pipeline_name),
+                                       job=proto.Job(id=job_id) if job_id else None,
+                                       datum=proto.Datum(id=datum_id, job=proto.Job(id=job_id)) if datum_id else None,
+                                       follow=follow,
+                                       tail=tail)
+        stream = self.pps_client.stub.GetLogs(request, metadata=self.pps_client.metadata)
+        try:
+            yield from stream
+        finally:
+            if hasattr(stream, 'cancel'):
+                stream.cancel()
+
     @handle_pachyderm_error
-    def get_jobs(self, pipeline_name: str, history=-1):
+    def get_jobs(self, pipeline_name: str, history=-1, limit=None, since=None, keep=None):
+        """
+        Lists the jobs of a pipeline (newest first).
+
+        `list_job` cannot filter jobs server-side: filters are applied while streaming, which stops as soon as `limit`
+        jobs were kept or a job started before `since` is reached.
+
+        Args:
+            pipeline_name (str): pipeline name
+            history (int): versions of the pipeline to list the jobs of (-1 for all)
+            limit (int): maximum number of jobs
+            since (float): timestamp of the oldest start of the jobs
+            keep (callable): filter of the jobs (applied before `limit`)
+
+        Returns:
+            <list of the JobInfo of the jobs>
+
+        """
         app.logger.debug("@%s: list jobs from pipeline %s", PachydermClient.__name__, pipeline_name)
+        if limit == 0:
+            return []
+
         job_iterator = self.pps_client.list_job(pipeline_name=pipeline_name, history=history)
-        return [job for job in job_iterator]
+        if limit is None and since is None and keep is None:
+            jobs = [job for job in job_iterator]
+            if history == -1:
+                # complete listing -> refresh the job index for free
+                self.job_index.replace(pipeline_name, jobs)
+            return jobs
+
+        jobs = []
+        for job in job_iterator:
+            # jobs that did not start yet are newer than any started one
+            if since is not None and job.started.seconds and job.started.seconds < since:
+                break
+            if keep is None or keep(job):
+                jobs.append(job)
+            if limit is not None and len(jobs) >= limit:
+                break
+        if hasattr(job_iterator, 'cancel'):
+            job_iterator.cancel()
+        return jobs
 
     @handle_pachyderm_error
     def get_job_info(self, job_id: str):
@@ -390,8 +861,17 @@ class PachydermClient:
         app.logger.debug("@%s: list datum by job %s", PachydermClient.__name__, job_id)
         return [datum for datum in self.pps_client.list_datum(job_id)]
 
+    def channel_health(self):
+        if self.channel_pool is None:
+            return {"state": "UNKNOWN", "healthy": True}
+        return self.channel_pool.health()
+
     @handle_pachyderm_error
     def delete_all(self):
         app.logger.debug("@%s: delete all", PachydermClient.__name__)
         self.pps_client.delete_all()
         self.pfs_client.delete_all()
+        self.snapshot.invalidate()
+        self.job_index.clear()
+        self.bundle_index.clear()
+        self.commit_index.clear()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+
+class MetadataSnapshot:
+    """
+    In-memory snapshot of Pachyderm metadata (pipelines, repos, branches) with a time-to-live.
+
+    Entries are loaded lazily and served from memory until they expire or are explicitly invalidated.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        MetadataSnapshot constructor.
+
+        Args:
+            ttl (float): lifetime of an entry in seconds (non-positive disables the snapshot)
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, load: callable):
+        """
+        Returns the entry for `key`, (re)loading it with `load` when missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        value = load()
+        with self._lock:
+            # skip stale loads that raced with an invalidation
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, *keys):
+        """
+        Drops the given entries (or all entries if no key is given).
+        """
+        with self._lock:
+            self._generation += 1
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+            else:
+                self._entries.clear()
@@ -0,0 +1,12 @@
+from kaos_backend.clients.pachyderm import PachydermClient
+
+
+def create_pachyderm_client(mocker, **kwargs):
+    """
+    Creates a PachydermClient backed by mocked PPS/PFS clients
+
+    Return:
+         client: `kaos_backend.clients.pachyderm.PachydermClient`
+
+    """
+    return PachydermClient(mocker.Mock(), mocker.Mock(), **kwargs)
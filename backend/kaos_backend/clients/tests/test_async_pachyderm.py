@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import flask
+import grpc
+import pytest
+from kaos_backend.clients.async_pachyderm import AsyncPachydermClient
+from kaos_backend.clients.job_index import JobIndex
+from kaos_backend.exceptions.exceptions import PachydermError
+from kaos_backend.util.async_bridge import AsyncBridge, gather_limited
+from python_pachyderm.client.pps import pps_pb2 as proto
+from python_pachyderm.client.pps import pps_pb2_grpc as pps_grpc
+
+LATENCY = 0.2
+
+
+class FakePps(pps_grpc.APIServicer):
+    job_listings = 0
+
+    async def InspectPipeline(self, request, context):
+        await asyncio.sleep(LATENCY)
+        if request.pipeline.name == "missing":
+            await context.abort(grpc.StatusCode.NOT_FOUND, "pipeline missing not found")
+        return proto.PipelineInfo(pipeline=request.pipeline, state=proto.PIPELINE_RUNNING)
+
+    async def ListJobStream(self, request, context):
+        FakePps.job_listings += 1
+        for job_id, state in [("b", proto.JOB_RUNNING), ("a", proto.JOB_SUCCESS)]:
+            yield proto.JobInfo(job=proto.Job(id=job_id), state=state)
+
+    async def ListDatumStream(self, request, context):
+        for i in range(3):
+            yield proto.ListDatumStreamResponse(datum_info=proto.DatumInfo(datum=proto.Datum(id=str(i))))
+
+
+async def serve():
+    server = grpc.aio.server()
+    pps_grpc.add_APIServicer_to_server(FakePps(), server)
+    port = server.add_insecure_port("localhost:0")
+    await server.start()
+    return server, port
+
+
+@pytest.fixture
+def pachd():
+    with flask.Flask("Test").app_context():
+        bridge = AsyncBridge()
+        server, port = bridge.run(serve())
+        yield bridge, AsyncPachydermClient("localhost", port)
+        bridge.run(server.stop(None))
+
+
+def test_fan_out_takes_one_round_trip(pachd):
+    bridge, client = pachd
+    names = [f"serve-{i}" for i in range(50)]
+
+    start = time.monotonic()
+    infos = bridge.run(gather_limited([client.inspect_pipeline(n) for n in names], 64))
+
+    assert time.monotonic() - start < 10 * LATENCY
+    assert [info.pipeline.name for info in infos] == names
+
+
+def test_list_datum_stream(pachd):
+    bridge, client = pachd
+    datums = bridge.run(client.list_datum("job"))
+    assert [d.datum_info.datum.id for d in datums] == ["0", "1", "2"]
+
+
+def test_errors_are_translated(pachd):
+    bridge, client = pachd
+    with pytest.raises(PachydermError):
+        bridge.run(client.inspect_pipeline("missing"))
+
+
+def test_job_checks_go_through_the_job_index(pachd):
+    bridge, client = pachd
+    client.job_index = JobIndex(ttl=60, terminal_ttl=600)
+    listings = FakePps.job_listings
+
+    assert bridge.run(client.check_job_exists("train-ws", "a"))
+    assert bridge.run(client.check_job_running("train-ws", "b"))
+    assert not bridge.run(client.check_job_running("train-ws", "a"))
+    assert FakePps.job_listings == listings + 1
+
+
+def test_concurrent_job_checks_share_one_refresh(pachd):
+    bridge, client = pachd
+    client.job_index = JobIndex(ttl=0, terminal_ttl=600)
+    listings = FakePps.job_listings
+
+    checks = bridge.run(gather_limited([client.check_job_exists("train-ws", job_id) for job_id in "ab" * 10], 64))
+    assert checks == [True] * 20
+    assert FakePps.job_listings == listings + 1
+
+    # the running job is outdated at once: refreshed incrementally, from the same index
+    assert bridge.run(client.check_job_running("train-ws", "b"))
+    assert not bridge.run(client.check_job_exists("train-ws", "c"))
+    assert FakePps.job_listings == listings + 3
+    assert client._job_refreshes == {}
+
+
+def test_stubs_close_the_channel_of_a_previous_loop(mocker):
+    channels, closed = [], []
+
+    def insecure_channel(address, options):
+        channel = mocker.Mock()
+
+        async def close():
+            closed.append(channel)
+
+        channel.close = close
+        channels.append(channel)
+        return channel
+
+    mocker.patch("grpc.aio.insecure_channel", side_effect=insecure_channel)
+    client = AsyncPachydermClient("localhost", 1)
+
+    async def stubs():
+        return client._stubs()
+
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        first.run_until_complete(stubs())
+        second.run_until_complete(stubs())
+        # closed on the loop of the old channel, once it runs
+        first.run_until_complete(asyncio.sleep(0.01))
+    finally:
+        first.close()
+        second.close()
+
+    assert len(channels) == 2 and closed == channels[:1]
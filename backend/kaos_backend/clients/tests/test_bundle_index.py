@@ -0,0 +1,24 @@
+from kaos_backend.clients.bundle_index import BundleIndex
+
+
+def test_bundle_index_is_rebuilt_when_head_moves(mocker):
+    index = BundleIndex()
+    list_bundles = mocker.Mock(return_value=["train:abc"])
+
+    assert index.contains("repo", "head-1", "train:abc", list_bundles)
+    assert not index.contains("repo", "head-1", "train:def", list_bundles)
+    assert list_bundles.call_count == 1
+
+    list_bundles.return_value = ["train:abc", "train:def"]
+    assert index.contains("repo", "head-2", "train:def", list_bundles)
+    assert list_bundles.call_count == 2
+
+
+def test_bundle_index_forget(mocker):
+    index = BundleIndex()
+    list_bundles = mocker.Mock(return_value=["train:abc"])
+
+    index.contains("repo", "head-1", "train:abc", list_bundles)
+    index.forget("repo")
+    index.contains("repo", "head-1", "train:abc", list_bundles)
+    assert list_bundles.call_count == 2
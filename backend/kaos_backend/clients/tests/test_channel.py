@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+import pytest
+
+import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
+from kaos_backend.clients.channel import ChannelPool, DeadlineInterceptor, MetricsInterceptor, deadline_class, \
+    FAST, STREAMING, MUTATION, UNBOUNDED, PooledPfsClient, PooledPpsClient
+from kaos_backend.util.metrics import PachydermMetrics
+
+CallDetails = namedtuple("CallDetails", ["method", "timeout", "metadata", "credentials"])
+
+
+@pytest.mark.parametrize("method,expected", [
+    ("/pfs.API/InspectRepo", FAST),
+    ("/pps.API/ListPipeline", FAST),
+    ("/pfs.API/GetFile", STREAMING),
+    ("/pps.API/ListJobStream", STREAMING),
+    ("/pps.API/CreatePipeline", MUTATION),
+    ("/pfs.API/DeleteRepo", MUTATION),
+    ("/pps.API/GetLogs", UNBOUNDED),
+])
+def test_deadline_class(method, expected):
+    assert deadline_class(method) == expected
+
+
+def test_deadline_interceptor_sets_timeout():
+    interceptor = DeadlineInterceptor({FAST: 1, STREAMING: 2, MUTATION: 3, UNBOUNDED: None})
+    continuation = lambda details, request: details.timeout  # noqa: E731
+
+    assert interceptor.intercept_unary_unary(continuation, CallDetails("/pfs.API/InspectRepo", None, [], None),
+                                             None) == 1
+    assert interceptor.intercept_unary_stream(continuation, CallDetails("/pfs.API/GetFile", None, [], None),
+                                              None) == 2
+    assert interceptor.intercept_unary_stream(continuation, CallDetails("/pps.API/GetLogs", None, [], None),
+                                              None) is None
+    # explicit deadlines are preserved
+    assert interceptor.intercept_unary_unary(continuation, CallDetails("/pps.API/CreatePipeline", 42, [], None),
+                                             None) == 42
+
+
+def test_metrics_interceptor_counts_calls_and_bytes(mocker):
+    metrics = PachydermMetrics()
+    interceptor = MetricsInterceptor(metrics)
+    request = pfs_proto.InspectRepoRequest(repo=pfs_proto.Repo(name="repo"))
+    response = pfs_proto.RepoInfo(repo=pfs_proto.Repo(name="repo"), description="desc")
+
+    outcome = mocker.Mock()
+    outcome.result.return_value = response
+    outcome.cancelled.return_value = False
+    outcome.exception.return_value = None
+    outcome.add_done_callback.side_effect = lambda done: done(outcome)
+    interceptor.intercept_unary_unary(lambda details, r: outcome, CallDetails("/pfs.API/InspectRepo", None, [], None),
+                                      request)
+
+    chunks = [pfs_proto.GetFileRequest(offset_bytes=i + 1) for i in range(3)]
+    call = mocker.MagicMock()
+    call.__next__.side_effect = iter(chunks).__next__
+    stream = interceptor.intercept_unary_stream(lambda details, r: call,
+                                                CallDetails("/pfs.API/GetFile", None, [], None), request)
+    assert list(stream) == chunks
+    # call attributes are still reachable
+    stream.cancel()
+    call.cancel.assert_called_once()
+
+    assert metrics.rpcs == {("/pfs.API/InspectRepo",): 1, ("/pfs.API/GetFile",): 1}
+    assert metrics.sent_bytes[("/pfs.API/InspectRepo",)] == request.ByteSize()
+    assert metrics.received_bytes[("/pfs.API/InspectRepo",)] == response.ByteSize()
+    assert metrics.received_bytes[("/pfs.API/GetFile",)] == sum(c.ByteSize() for c in chunks)
+
+
+def test_pool_shares_channel_and_stubs():
+    pool = ChannelPool("localhost", 1)
+    pfs_client, pps_client = pool.pfs_client(), pool.pps_client()
+
+    assert isinstance(pfs_client, PooledPfsClient)
+    assert isinstance(pps_client, PooledPpsClient)
+    assert pfs_client.channel is pps_client.channel
+    assert pfs_client.stub is pool.pfs_client().stub
+    assert pool.health()["healthy"]
+
+
+def test_pool_recreates_channel_after_fork(mocker):
+    pool = ChannelPool("localhost", 1)
+    channel = pool.channel
+
+    mocker.patch("os.getpid", return_value=-1)
+    assert pool.channel is not channel
+
+
+def test_metrics_interceptor_does_not_block_futures(mocker):
+    metrics = PachydermMetrics()
+    interceptor = MetricsInterceptor(metrics)
+    request = pfs_proto.InspectRepoRequest(repo=pfs_proto.Repo(name="repo"))
+    response = pfs_proto.RepoInfo(repo=pfs_proto.Repo(name="repo"), description="desc")
+
+    callbacks = []
+    future = mocker.Mock()
+    future.add_done_callback.side_effect = callbacks.append
+    future.result.side_effect = AssertionError("blocked on a pending call")
+    assert interceptor.intercept_unary_unary(lambda details, r: future,
+                                             CallDetails("/pfs.API/InspectRepo", None, [], None), request) is future
+    assert ("/pfs.API/InspectRepo",) not in metrics.received_bytes
+
+    # completion
+    future.result.side_effect = None
+    future.result.return_value = response
+    future.cancelled.return_value = False
+    future.exception.return_value = None
+    callbacks[0](future)
+    assert metrics.received_bytes[("/pfs.API/InspectRepo",)] == response.ByteSize()
@@ -0,0 +1,50 @@
+from kaos_backend.clients.commit_index import CommitIndex
+
+
+class Commits:
+    """
+    Minimal list_commit stream (newest first) recording how many commits were consumed
+    """
+
+    def __init__(self, mocker, commits):
+        self.commits = [self.commit(mocker, commit_id, size, finished) for commit_id, size, finished in commits]
+        self.consumed = 0
+
+    @staticmethod
+    def commit(mocker, commit_id, size, finished):
+        commit = mocker.Mock(size_bytes=size)
+        commit.commit.id = commit_id
+        commit.HasField.side_effect = lambda field: field == "finished" and finished
+        return commit
+
+    def __iter__(self):
+        for commit in self.commits:
+            self.consumed += 1
+            yield commit
+
+
+def test_commit_index_stops_at_first_non_empty_commit(mocker):
+    commits = Commits(mocker, [("c", 0, True), ("b", 10, True)] + [(f"old-{i}", 10, True) for i in range(1000)])
+
+    assert CommitIndex().latest("repo", "branch", commits) == "b"
+    assert commits.consumed == 2
+
+
+def test_commit_index_stops_at_indexed_head(mocker):
+    index = CommitIndex()
+    index.latest("repo", "branch", Commits(mocker, [("c", 0, True), ("b", 0, True), ("a", 10, True)]))
+
+    # only empty commits landed since "c"
+    commits = Commits(mocker, [("e", 0, True), ("d", 0, True), ("c", 0, True), ("b", 0, True), ("a", 10, True)])
+    assert index.latest("repo", "branch", commits) == "a"
+    assert commits.consumed == 3
+
+    assert index.latest("repo", "branch", Commits(mocker, [])) is None
+
+
+def test_commit_index_ignores_open_heads(mocker):
+    index = CommitIndex()
+    index.latest("repo", "branch", Commits(mocker, [("b", 0, False), ("a", 10, True)]))
+
+    # the open commit received files since
+    assert index.latest("repo", "branch", Commits(mocker, [("b", 10, True), ("a", 10, True)])) == "b"
@@ -0,0 +1,164 @@
+import os
+
+import flask
+import pytest
+import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
+
+from kaos_backend.clients.content_cache import ContentCache
+from kaos_backend.clients.tests import create_pachyderm_client
+
+COMMIT = "0123456789abcdef0123456789abcdef"
+
+
+def test_content_cache_round_trip(tmpdir):
+    cache = ContentCache(str(tmpdir), max_bytes=100)
+    assert cache.get(("blob", "train-ws", COMMIT, "/a")) is None
+
+    cache.put(("blob", "train-ws", COMMIT, "/a"), b"abc")
+
+    assert cache.get(("blob", "train-ws", COMMIT, "/a")) == b"abc"
+    assert len(cache) == 1
+    assert cache.size == 3
+
+
+def test_content_cache_evicts_least_recently_used(tmpdir):
+    cache = ContentCache(str(tmpdir), max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    assert cache.get("a") is not None
+
+    cache.put("c", b"x" * 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size == 8
+    assert len(tmpdir.listdir()) == 2
+
+
+def test_content_cache_skips_oversized_entries(tmpdir):
+    cache = ContentCache(str(tmpdir), max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("big", b"x" * 11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == b"x" * 4
+    assert len(tmpdir.listdir()) == 1
+
+
+def test_content_cache_discards_partial_writes(tmpdir):
+    cache = ContentCache(str(tmpdir), max_bytes=100)
+
+    with pytest.raises(IOError):
+        with cache.writer("a") as f:
+            f.write(b"abc")
+            raise IOError("broken stream")
+
+    assert cache.get("a") is None
+    assert tmpdir.listdir() == []
+
+
+def test_content_cache_reloads_entries(tmpdir):
+    cache = ContentCache(str(tmpdir), max_bytes=100)
+    cache.put("a", b"abc")
+    tmpdir.join("leftover.partial").write_binary(b"abc")
+
+    reloaded = ContentCache(str(tmpdir), max_bytes=100)
+
+    assert reloaded.get("a") == b"abc"
+    assert reloaded.size == 3
+    assert not tmpdir.join("leftover.partial").exists()
+
+
+def test_content_cache_per_worker(tmpdir):
+    # an exited worker (pids never exceed 2 ** 22) and a live one (this process' parent)
+    exited = ContentCache(str(tmpdir.join(str(2 ** 22 + 1))), max_bytes=100)
+    exited.put("a", b"abc")
+    tmpdir.join(str(os.getppid())).ensure(dir=True)
+
+    cache = ContentCache.for_worker(str(tmpdir), max_bytes=50)
+
+    assert cache.directory == str(tmpdir.join(str(os.getpid())))
+    assert cache.get("a") == b"abc" and cache.max_bytes == 50
+    assert sorted(d.basename for d in tmpdir.listdir()) == sorted([str(os.getpid()), str(os.getppid())])
+
+
+def finished_commit(client, finished=True):
+    info = pfs_proto.CommitInfo()
+    if finished:
+        info.finished.seconds = 1
+    client.pfs_client.inspect_commit.return_value = info
+
+
+def test_get_blob_caches_finished_commit(mocker, tmpdir):
+    client = create_pachyderm_client(mocker, content_cache=ContentCache(str(tmpdir), max_bytes=100))
+    finished_commit(client)
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([b"abc", b"def"])
+
+    with flask.Flask("Test").app_context():
+        assert bytes(client.get_blob("train-ws", COMMIT, "/metrics.json")) == b"abcdef"
+        assert bytes(client.get_blob("train-ws", COMMIT, "/metrics.json")) == b"abcdef"
+        assert list(client.iter_blob("train-ws", COMMIT, "/metrics.json")) == [b"abcdef"]
+
+    client.pfs_client.get_file.assert_called_once()
+    client.pfs_client.inspect_commit.assert_called_once_with(f"train-ws/{COMMIT}")
+
+
+def test_get_blob_bypasses_branches_and_open_commits(mocker, tmpdir):
+    client = create_pachyderm_client(mocker, content_cache=ContentCache(str(tmpdir), max_bytes=100))
+    finished_commit(client, finished=False)
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([b"abc"])
+
+    with flask.Flask("Test").app_context():
+        for commit in ("master", "master", COMMIT, COMMIT):
+            assert bytes(client.get_blob("train-ws", commit, "/metrics.json")) == b"abc"
+
+    assert client.pfs_client.get_file.call_count == 4
+    assert client.pfs_client.inspect_commit.call_count == 2
+    assert tmpdir.listdir() == []
+
+
+def test_iter_blob_caches_consumed_streams_only(mocker, tmpdir):
+    client = create_pachyderm_client(mocker, content_cache=ContentCache(str(tmpdir), max_bytes=100))
+    finished_commit(client)
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([b"abc", b"def"])
+
+    with flask.Flask("Test").app_context():
+        blob = client.iter_blob("train-ws", COMMIT, "/model.pkl")
+        assert next(blob) == b"abc"
+        blob.close()
+        assert tmpdir.listdir() == []
+
+        assert list(client.iter_blob("train-ws", COMMIT, "/model.pkl")) == [b"abc", b"def"]
+        assert list(client.iter_blob("train-ws", COMMIT, "/model.pkl")) == [b"abcdef"]
+
+    assert client.pfs_client.get_file.call_count == 2
+
+
+def test_list_file_caches_finished_commit(mocker, tmpdir):
+    client = create_pachyderm_client(mocker, content_cache=ContentCache(str(tmpdir), max_bytes=1000))
+    finished_commit(client)
+    info = pfs_proto.FileInfo(file_type=pfs_proto.FILE, size_bytes=3)
+    info.file.path = "/a"
+    client.pfs_client.list_file.side_effect = lambda commit, path, history: iter([info])
+
+    with flask.Flask("Test").app_context():
+        assert client.list_file(f"train-ws/{COMMIT}", "/") == [info]
+        assert client.list_file(f"train-ws/{COMMIT}", "/") == [info]
+        assert client.list_file("train-ws/master", "/") == [info]
+
+    assert client.pfs_client.list_file.call_count == 2
+
+
+def test_finished_commits_are_bounded(mocker, tmpdir):
+    client = create_pachyderm_client(mocker, content_cache=ContentCache(str(tmpdir), max_bytes=1000))
+    client.FINISHED_COMMITS = 2
+    finished_commit(client)
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([b"abc"])
+    commits = [f"{i:032x}" for i in range(3)]
+
+    with flask.Flask("Test").app_context():
+        for commit in commits:
+            client.get_blob("train-ws", commit, "/metrics.json")
+
+    assert list(client.finished_commits) == [("train-ws", commit) for commit in commits[1:]]
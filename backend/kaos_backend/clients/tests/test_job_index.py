@@ -0,0 +1,83 @@
+from kaos_backend.clients.job_index import JobIndex
+
+
+class Stream:
+    """
+    Minimal list_job stream (newest first) recording how many jobs were consumed
+    """
+
+    def __init__(self, mocker, jobs):
+        self.jobs = [self.job(mocker, job_id, state) for job_id, state in jobs]
+        self.consumed = 0
+        self.cancelled = False
+
+    @staticmethod
+    def job(mocker, job_id, state):
+        job = mocker.Mock(state=state)
+        job.job.id = job_id
+        return job
+
+    def __iter__(self):
+        for job in self.jobs:
+            self.consumed += 1
+            yield job
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def test_job_index_full_build(mocker):
+    stream = Stream(mocker, [("c", 1), ("b", 3), ("a", 2)])
+    index = JobIndex(ttl=60, terminal_ttl=600)
+
+    assert index.state("train-ws", "b", lambda: stream) == 3
+    assert index.state("train-ws", "a", lambda: stream) == 2
+    assert index.state("train-ws", "c", lambda: stream) == 1
+    assert stream.consumed == 3
+
+
+def test_job_index_unknown_job_refreshes_incrementally(mocker):
+    index = JobIndex(ttl=60, terminal_ttl=600)
+    index.state("train-ws", "b", lambda: Stream(mocker, [("b", 3), ("a", 3)]))
+
+    stream = Stream(mocker, [("d", 0), ("c", 1), ("b", 3), ("a", 3)])
+    assert index.state("train-ws", "d", lambda: stream) == 0
+    # stops at the previous head, all older jobs are finished
+    assert stream.consumed == 3
+    assert stream.cancelled
+    assert index.state("train-ws", "a", lambda: None) == 3
+
+
+def test_job_index_unknown_job(mocker):
+    index = JobIndex(ttl=60, terminal_ttl=600)
+
+    assert index.state("train-ws", "z", lambda: Stream(mocker, [("b", 3), ("a", 3)])) is None
+
+
+def test_job_index_refreshes_running_jobs_after_ttl(mocker):
+    index = JobIndex(ttl=0, terminal_ttl=600)
+    index.state("train-ws", "a", lambda: Stream(mocker, [("b", 1), ("a", 1)]))
+
+    stream = Stream(mocker, [("c", 3), ("b", 3), ("a", 1)])
+    assert index.state("train-ws", "b", lambda: stream) == 3
+    # "a" is still running -> the refresh reads past the previous head
+    assert stream.consumed == 3
+    assert index.state("train-ws", "a", lambda: Stream(mocker, [("c", 3), ("b", 3), ("a", 4)])) == 4
+
+
+def test_job_index_drops_deleted_jobs_after_terminal_ttl(mocker):
+    index = JobIndex(ttl=0, terminal_ttl=0)
+    index.state("train-ws", "b", lambda: Stream(mocker, [("b", 3), ("a", 3)]))
+
+    # "b" was deleted elsewhere -> a full listing (not stopping at the previous head) forgets it
+    stream = Stream(mocker, [("c", 3), ("a", 3)])
+    assert index.state("train-ws", "b", lambda: stream) is None
+    assert stream.consumed == 2 and not stream.cancelled
+
+
+def test_job_index_forget(mocker):
+    index = JobIndex(ttl=60, terminal_ttl=600)
+    index.replace("train-ws", [Stream.job(mocker, "b", 3), Stream.job(mocker, "a", 3)])
+
+    index.forget("train-ws", "a")
+    assert index.state("train-ws", "a", lambda: Stream(mocker, [("b", 3)])) is None
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from kaos_backend.clients.job_store import JobStore
+from kaos_backend.util.metric_table import MetricTable
+from kaos_model.common import DataDescriptor, JobInfo, PartitionInfo
+
+
+def job_info(n_partitions):
+    descriptor = DataDescriptor(repo="repo", commit="abc", path="/")
+    return JobInfo(job_id="job", state="JOB_SUCCESS", available_metrics=["accuracy", "loss"], process_time=60,
+                   partitions=[PartitionInfo(datum_id=f"datum-{i}", code=descriptor, data=descriptor,
+                                             image=descriptor, output=descriptor) for i in range(n_partitions)])
+
+
+@pytest.fixture()
+def store(tmpdir):
+    return JobStore(str(tmpdir.join("jobs.sqlite")))
+
+
+def test_job_store_round_trip(store):
+    assert store.get("ws", "job") is None
+
+    table = MetricTable.build([None, {"accuracy": 0.5}, {"accuracy": 0.75}])
+    store.put("ws", job_info(3), table)
+    info, stored_table = store.get("ws", "job")
+
+    assert info == JobInfo(job_id="job", state="JOB_SUCCESS", available_metrics=["accuracy", "loss"],
+                           process_time=60, partitions=[])
+    assert (stored_table.columns, stored_table.reported) == (table.columns, table.reported)
+    assert store.get_partitions("ws", "job", [2, 0]) == [job_info(3).partitions[2], job_info(3).partitions[0]]
+    assert store.get("other", "job") is None
+
+
+def test_job_store_indexes_models(store):
+    info = job_info(3)
+    for i, partition in enumerate(info.partitions):
+        partition.output = DataDescriptor(repo="train-ws", commit="abc", path=f"branch:model-{i}")
+    store.put("ws", info, MetricTable.build([None] * 3))
+
+    assert store.get_model("ws", "branch:model-1") == info.partitions[1]
+    assert store.get_model("ws", "branch:model-3") is None
+    assert store.get_model("other", "branch:model-1") is None
+
+
+def test_job_store_deletes_jobs(store):
+    for workspace, job_id in (("ws", "job-1"), ("ws", "job-2"), ("other", "job-1")):
+        info = job_info(1)
+        info.job_id = job_id
+        info.partitions[0].output = DataDescriptor(repo="train-ws", commit="abc", path=f"branch:{job_id}")
+        store.put(workspace, info, MetricTable.build([None]))
+
+    store.delete("ws", "job-1")
+    assert store.get("ws", "job-1") is None
+    assert store.get_model("ws", "branch:job-1") is None
+    assert store.get("ws", "job-2") is not None
+
+    store.delete("ws")
+    assert store.get("ws", "job-2") is None
+    assert store.get_model("ws", "branch:job-2") is None
+    assert store.get("other", "job-1") is not None
+
+
+def test_job_store_loads_many_partitions(store):
+    store.put("ws", job_info(1200), MetricTable.build([None] * 1200))
+
+    positions = list(reversed(range(1200)))
+    assert [p.datum_id for p in store.get_partitions("ws", "job", positions)] == [f"datum-{i}" for i in positions]
+
+
+def test_job_store_drops_older_schema(tmpdir):
+    path = str(tmpdir.join("jobs.sqlite"))
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE jobs (workspace TEXT, job_id TEXT)")
+    connection.execute("CREATE TABLE scores (workspace TEXT, job_id TEXT)")
+    connection.commit()
+    connection.close()
+
+    store = JobStore(path)
+    store.put("ws", job_info(1), MetricTable.build([None]))
+    assert store.get("ws", "job") is not None
+
+
+def test_job_store_is_shared(store, tmpdir):
+    store.put("ws", job_info(1), MetricTable.build([None]))
+
+    assert JobStore(str(tmpdir.join("jobs.sqlite"))).get("ws", "job") is not None
+
+    store.clear()
+    assert store.get("ws", "job") is None
@@ -0,0 +1,292 @@
+import flask
+import grpc
+import pytest
+import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
+
+from kaos_backend.clients.tests import create_pachyderm_client
+from kaos_backend.clients.tests.test_job_index import Stream
+from kaos_backend.exceptions.exceptions import PachydermError
+
+
+def pipeline_listing(mocker, *names):
+    infos = []
+    for name in names:
+        info = mocker.Mock()
+        info.pipeline.name = name
+        infos.append(info)
+    return mocker.Mock(pipeline_info=infos)
+
+
+def test_check_pipeline_exists_uses_snapshot(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    client.pps_client.list_pipeline.return_value = pipeline_listing(mocker, "train-ws", "build-train-ws")
+
+    with flask.Flask("Test").app_context():
+        assert client.check_pipeline_exists("train-ws")
+        assert client.check_pipeline_exists("build-train-ws")
+        assert not client.check_pipeline_exists("serve-ws")
+
+    client.pps_client.list_pipeline.assert_called_once()
+
+
+def test_create_pipeline_invalidates_snapshot(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    client.pps_client.list_pipeline.side_effect = [pipeline_listing(mocker),
+                                                   pipeline_listing(mocker, "train-ws")]
+
+    with flask.Flask("Test").app_context():
+        assert not client.check_pipeline_exists("train-ws")
+        client.create_pipeline("train-ws", "image", [], "description", pfs_input=None)
+        assert client.check_pipeline_exists("train-ws")
+
+    assert client.pps_client.list_pipeline.call_count == 2
+
+
+def test_create_repo_skips_existing(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    repo_info = mocker.Mock()
+    repo_info.repo.name = "train-ws"
+    client.pfs_client.list_repo.return_value = [repo_info]
+
+    with flask.Flask("Test").app_context():
+        client.create_repo("train-ws")
+        client.create_repo("hyper-ws")
+
+    client.pfs_client.create_repo.assert_called_once_with("hyper-ws", description=None)
+    client.pfs_client.list_repo.assert_called_once()
+
+
+def file_info(mocker, path, size_bytes):
+    info = mocker.Mock(size_bytes=size_bytes)
+    info.file.path = path
+    return info
+
+
+def test_get_dir_downloads_all_files(mocker, tmpdir):
+    client = create_pachyderm_client(mocker)
+    objs = [file_info(mocker, f"/model/part-{i}", 3) for i in range(30)]
+    client.list_file = mocker.Mock(return_value=objs)
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([path.encode(), b"!"])
+
+    with flask.Flask("Test").app_context():
+        client.get_dir("train-ws", "abc", "/model", out_dir=str(tmpdir), remove_prefix=True)
+
+    for i in range(30):
+        assert tmpdir.join(f"part-{i}").read_binary() == f"/model/part-{i}!".encode()
+    assert client.transfer_budget.in_use == 0
+
+
+def test_get_dir_reserves_a_buffer_per_download(mocker, tmpdir):
+    client = create_pachyderm_client(mocker)
+    large = client.transfer_budget.capacity * 10
+    client.list_file = mocker.Mock(return_value=[file_info(mocker, "/large", large), file_info(mocker, "/small", 3)])
+    client.pfs_client.get_file.side_effect = lambda commit, path: iter([b"abc"])
+    acquire = mocker.spy(client.transfer_budget, "acquire")
+
+    with flask.Flask("Test").app_context():
+        client.get_dir("train-ws", "abc", "/", out_dir=str(tmpdir))
+
+    # downloads are streamed to disk: a large file does not hold the whole budget
+    assert acquire.call_args_list == [mocker.call(client.TRANSFER_BUFFER_BYTES), mocker.call(3)]
+    assert client.transfer_budget.in_use == 0
+
+
+def test_get_dir_raises_download_error(mocker, tmpdir):
+    client = create_pachyderm_client(mocker)
+    client.list_file = mocker.Mock(return_value=[file_info(mocker, "/a", 1), file_info(mocker, "/b", 1)])
+
+    def get_file(commit, path):
+        if path == "/b":
+            raise IOError("broken stream")
+        return iter([b"a"])
+
+    client.pfs_client.get_file.side_effect = get_file
+
+    with flask.Flask("Test").app_context():
+        with pytest.raises(IOError, match="broken stream"):
+            client.get_dir("train-ws", "abc", "/", out_dir=str(tmpdir))
+
+    assert tmpdir.join("a").read_binary() == b"a"
+    assert client.transfer_budget.in_use == 0
+
+
+def test_put_dir_streams_files(mocker, tmpdir):
+    client = create_pachyderm_client(mocker)
+    tmpdir.join("bundle", "model", "train").write_binary(b"x" * 10, ensure=True)
+    tmpdir.join("bundle", "Dockerfile").write_binary(b"FROM python", ensure=True)
+    tmpdir.join("bundle", "empty").write_binary(b"", ensure=True)
+
+    uploaded = {}
+
+    def put_file_bytes(commit, path, value, overwrite_index=None):
+        uploaded[path] = b"".join(value)
+
+    client.pfs_client.put_file_bytes.side_effect = put_file_bytes
+    client.pfs_client.commit.return_value = mocker.MagicMock()
+
+    with flask.Flask("Test").app_context():
+        client.put_dir("source-train-ws", str(tmpdir))
+
+    assert uploaded == {"bundle/model/train": b"x" * 10, "bundle/Dockerfile": b"FROM python"}
+    assert client.transfer_budget.in_use == 0
+
+
+def test_transfer_budget_is_split_between_workers(mocker):
+    mocker.patch("kaos_backend.clients.pachyderm.WORKERS", 4)
+    mocker.patch("kaos_backend.clients.pachyderm.TRANSFER_MEMORY_FRACTION", 0.5)
+    client = create_pachyderm_client(mocker)
+
+    assert client.transfer_budget.capacity == int(client.memory_limit * 0.5 / 4)
+
+
+def test_put_blobs_batches_requests(mocker):
+    client = create_pachyderm_client(mocker)
+    commit = pfs_proto.Commit(id="abc")
+    client.pfs_client.commit.return_value = mocker.MagicMock()
+    client.pfs_client.commit.return_value.__enter__.return_value = commit
+
+    streams = []
+    client.pfs_client.stub.PutFile.side_effect = lambda requests, metadata: streams.append(list(requests))
+    progress = mocker.Mock()
+    blobs = [{'path': f"/params/{i}.json", 'blob': b"x" * 4} for i in range(5)]
+
+    with flask.Flask("Test").app_context():
+        assert client.put_blobs("hyper-ws", blobs, batch_bytes=8, progress=progress) == "abc"
+
+    assert [[r.file.path for r in requests] for requests in streams] == [
+        ["/params/0.json", "/params/1.json"], ["/params/2.json", "/params/3.json"], ["/params/4.json"]]
+    assert all(r.file.commit == commit and r.value == b"xxxx" for requests in streams for r in requests)
+    assert progress.call_args_list == [mocker.call(2, 5), mocker.call(4, 5), mocker.call(5, 5)]
+    client.pfs_client.put_file_bytes.assert_not_called()
+
+
+@pytest.mark.parametrize("size_bytes", [None, 9, 4, 20])
+def test_get_blob(mocker, size_bytes):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.get_file.return_value = iter([b"abc", b"def", b"ghi"])
+
+    with flask.Flask("Test").app_context():
+        assert bytes(client.get_blob("train-ws", "abc", "/metrics.json", size_bytes=size_bytes)) == b"abcdefghi"
+
+
+def test_iter_blob_is_lazy(mocker):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.get_file.return_value = iter([b"abc", b"def"])
+
+    with flask.Flask("Test").app_context():
+        blob = client.iter_blob("train-ws", "abc", "/model.pkl")
+        client.pfs_client.get_file.assert_not_called()
+        assert list(blob) == [b"abc", b"def"]
+
+
+def typed_file_info(mocker, path, file_type):
+    info = file_info(mocker, path, 1)
+    info.file_type = file_type
+    return info
+
+
+def test_walk_files_single_glob(mocker):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.glob_file.return_value = iter([typed_file_info(mocker, "/m", pfs_proto.DIR),
+                                                     typed_file_info(mocker, "/m/model.pkl", pfs_proto.FILE)])
+
+    with flask.Flask("Test").app_context():
+        files = client.list_file("train-ws/abc", "/m", recursive=True)
+
+    # listed within the call (whether the commit is finished or not)
+    assert isinstance(files, list)
+    assert [f.file.path for f in files] == ["/m/model.pkl"]
+    client.pfs_client.glob_file.assert_called_once_with("train-ws/abc", "/m/**")
+    client.pfs_client.list_file.assert_not_called()
+
+
+def test_walk_files_single_file(mocker):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.glob_file.side_effect = [iter([]),
+                                               iter([typed_file_info(mocker, "/h/a=1.json", pfs_proto.FILE)])]
+
+    with flask.Flask("Test").app_context():
+        files = [f.file.path for f in client.list_file("hyper-ws/abc", "/h/a=1.json", recursive=True)]
+
+    assert files == ["/h/a=1.json"]
+
+
+class GlobError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def test_walk_files_fallback_traversal(mocker):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.glob_file.side_effect = GlobError(grpc.StatusCode.UNIMPLEMENTED)
+    tree = {
+        "/": [typed_file_info(mocker, "/a", pfs_proto.DIR), typed_file_info(mocker, "/x", pfs_proto.FILE)],
+        "/a": [typed_file_info(mocker, "/a/b", pfs_proto.DIR), typed_file_info(mocker, "/a/y", pfs_proto.FILE)],
+        "/a/b": [typed_file_info(mocker, "/a/b/z", pfs_proto.FILE)],
+    }
+    client.pfs_client.list_file.side_effect = lambda commit, path, history: iter(tree[path])
+
+    with flask.Flask("Test").app_context():
+        files = [f.file.path for f in client.list_file("train-ws/abc", "/", recursive=True)]
+
+    assert files == ["/x", "/a/y", "/a/b/z"]
+
+
+def test_walk_files_raises_genuine_failures(mocker):
+    client = create_pachyderm_client(mocker)
+    client.pfs_client.glob_file.side_effect = GlobError(grpc.StatusCode.DEADLINE_EXCEEDED)
+
+    with flask.Flask("Test").app_context(), pytest.raises(PachydermError):
+        client.list_file("train-ws/abc", "/", recursive=True)
+
+    client.pfs_client.list_file.assert_not_called()
+
+
+def test_get_jobs_stops_streaming_at_filters(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    stream = Stream(mocker, [("e", 1), ("d", 3), ("c", 2), ("b", 3), ("a", 3)])
+    for started, job in zip([0, 500, 400, 300, 200], stream.jobs):
+        job.started.seconds = started
+    client.pps_client.list_job.return_value = stream
+
+    with flask.Flask("Test").app_context():
+        jobs = client.get_jobs("train-ws", limit=2, keep=lambda job: job.state == 3)
+        assert [job.job.id for job in jobs] == ["d", "b"]
+        assert (stream.consumed, stream.cancelled) == (4, True)
+
+        assert client.get_jobs("train-ws", limit=0) == []
+        client.pps_client.list_job.assert_called_once()
+
+        stream.consumed = 0
+        # the job that did not start yet is the newest
+        assert [job.job.id for job in client.get_jobs("train-ws", since=350)] == ["e", "d", "c"]
+        assert stream.consumed == 4
+
+
+def test_check_bundle_exists_uses_index(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    master = mocker.Mock(head=mocker.Mock(id="head-1"))
+    master.name = "master"
+    client.pfs_client.list_branch.return_value = [master]
+    client.pfs_client.list_file.return_value = [mocker.Mock(file=mocker.Mock(path="/train:abc"), size_bytes=10),
+                                                mocker.Mock(file=mocker.Mock(path="/train:def"), size_bytes=0)]
+
+    with flask.Flask("Test").app_context():
+        assert client.check_bundle_exists("train-ws", "train:abc")
+        assert not client.check_bundle_exists("train-ws", "train:def")
+        assert client.check_branch_exists("train-ws", "master")
+
+    client.pfs_client.list_file.assert_called_once_with("train-ws/head-1", "/")
+    assert client.pfs_client.list_branch.call_count == 2
+
+
+def test_check_bundle_exists_without_commits(mocker):
+    client = create_pachyderm_client(mocker, metadata_ttl=60)
+    client.pfs_client.list_branch.return_value = []
+
+    with flask.Flask("Test").app_context():
+        assert not client.check_bundle_exists("train-ws", "train:abc")
+    client.pfs_client.list_file.assert_not_called()
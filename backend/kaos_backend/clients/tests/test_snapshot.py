@@ -0,0 +1,41 @@
+from kaos_backend.clients.snapshot import MetadataSnapshot
+
+
+def test_snapshot_caches_within_ttl(mocker):
+    load = mocker.Mock(return_value={"a"})
+    snapshot = MetadataSnapshot(ttl=60)
+
+    assert snapshot.get("key", load) == {"a"}
+    assert snapshot.get("key", load) == {"a"}
+    load.assert_called_once()
+
+
+def test_snapshot_disabled(mocker):
+    load = mocker.Mock(return_value={"a"})
+    snapshot = MetadataSnapshot(ttl=0)
+
+    snapshot.get("key", load)
+    snapshot.get("key", load)
+    assert load.call_count == 2
+
+
+def test_snapshot_invalidate(mocker):
+    load = mocker.Mock(side_effect=[{"a"}, {"a", "b"}, {"c"}])
+    snapshot = MetadataSnapshot(ttl=60)
+
+    snapshot.get("key", load)
+    snapshot.invalidate("key")
+    assert snapshot.get("key", load) == {"a", "b"}
+    snapshot.invalidate()
+    assert snapshot.get("key", load) == {"c"}
+
+
+def test_snapshot_drops_load_racing_invalidation():
+    snapshot = MetadataSnapshot(ttl=60)
+
+    def racing_load():
+        snapshot.invalidate("key")
+        return {"stale"}
+
+    assert snapshot.get("key", racing_load) == {"stale"}
+    assert snapshot.get("key", lambda: {"fresh"}) == {"fresh"}
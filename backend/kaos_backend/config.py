@@ -1,4 +1,7 @@
 import multiprocessing
+import os
+import shutil
+import tempfile
 from os import environ as env
 
 PORT = int(env.get("PORT", 8080))
@@ -6,5 +9,12 @@ DEBUG_MODE = int(env.get("DEBUG_MODE", 1))
 
 # Gunicorn config
 bind = ":" + str(PORT)
-workers = min([2, multiprocessing.cpu_count()]) * 2 + 1
+workers = int(env.get("WEB_CONCURRENCY", min([2, multiprocessing.cpu_count()]) * 2 + 1))
 threads = 2
+
+
+def on_starting(server):
+    # metrics published by the workers of a previous run (see METRICS_DIR in kaos_backend/constants.py)
+    metrics_dir = env.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "kaos-metrics"))
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
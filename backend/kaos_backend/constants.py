@@ -1,4 +1,6 @@
+import multiprocessing
 import os
+import tempfile
 
 # HANDLE CLOUD PROVIDER
 CLOUD_PROVIDER = os.getenv("CLOUD_PROVIDER")
@@ -9,6 +11,56 @@ MAX_GPU = int(os.getenv("MAX_GPU", 0))
 MAX_CPU = float(os.getenv("MAX_CPU", 0))
 MAX_MEMORY = float(os.getenv("MAX_MEMORY", 0))
 
+# PACHYDERM METADATA SNAPSHOT (seconds)
+METADATA_TTL = float(os.getenv("METADATA_TTL", 5))
+
+# LIFETIME OF FINISHED JOB STATES IN THE JOB INDEX, BEFORE JOBS ARE LISTED AGAIN IN FULL (seconds)
+FINISHED_JOB_TTL = float(os.getenv("FINISHED_JOB_TTL", 300))
+
+# PACHYDERM GRPC CHANNEL (deadlines in seconds)
+GRPC_KEEPALIVE_MS = int(os.getenv("GRPC_KEEPALIVE_MS", 60000))
+FAST_DEADLINE = float(os.getenv("FAST_DEADLINE", 30))
+STREAMING_DEADLINE = float(os.getenv("STREAMING_DEADLINE", 1800))
+MUTATION_DEADLINE = float(os.getenv("MUTATION_DEADLINE", 300))
+
+# MAXIMUM NUMBER OF CONCURRENT PACHYDERM CALLS IN A FAN-OUT
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", 32))
+
+# MAXIMUM NUMBER OF CONCURRENT CREATIONS (DELETIONS) WHEN PROVISIONING (TEARING DOWN) WORKSPACES
+PLAN_CONCURRENCY = int(os.getenv("PLAN_CONCURRENCY", 8))
+
+# NUMBER OF GUNICORN WORKERS (PROCESSES) SHARING THE BACKEND MEMORY LIMIT (SEE config.py)
+WORKERS = int(os.getenv("WEB_CONCURRENCY", min(2, multiprocessing.cpu_count()) * 2 + 1))
+
+# SHARE OF THE BACKEND MEMORY LIMIT USABLE BY CONCURRENT PFS TRANSFERS (SPLIT BETWEEN THE WORKERS)
+TRANSFER_MEMORY_FRACTION = float(os.getenv("TRANSFER_MEMORY_FRACTION", 0.25))
+
+# ADMISSION OF UPLOADS: SHARE OF THE BACKEND MEMORY LIMIT (SPLIT BETWEEN THE WORKERS), MAXIMUM WAIT AND RETRY HINT
+# (seconds)
+ADMISSION_MEMORY_FRACTION = float(os.getenv("ADMISSION_MEMORY_FRACTION", 0.5))
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", 30))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 10))
+
+# FOLLOWED LOG STREAMS: MAXIMUM NUMBER PER WORKER (EACH HOLDS ONE OF ITS THREADS, SEE config.py) AND RETRY HINT
+# (seconds)
+FOLLOW_STREAMS = int(os.getenv("FOLLOW_STREAMS", 1))
+FOLLOW_RETRY_AFTER = int(os.getenv("FOLLOW_RETRY_AFTER", 30))
+
+# MAXIMUM PAYLOAD STREAMED BY A SINGLE BATCHED PUT_FILE REQUEST (bytes)
+PUT_BATCH_BYTES = int(os.getenv("PUT_BATCH_BYTES", 64 * 1024 ** 2))
+
+# ON-DISK CACHE OF PFS CONTENT UNDER FINISHED COMMITS (0 bytes disables it)
+CONTENT_CACHE_DIR = os.getenv("CONTENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "kaos-content-cache"))
+CONTENT_CACHE_BYTES = int(os.getenv("CONTENT_CACHE_BYTES", 1024 ** 3))
+
+# SQLITE STORE OF FINISHED TRAINING JOBS (empty disables it)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "kaos-jobs.sqlite"))
+
+# METRICS OF EVERY WORKER, PUBLISHED AT MOST EVERY FLUSH INTERVAL (seconds) AND AGGREGATED ON SCRAPE (empty keeps
+# them per worker; wiped when gunicorn starts, see config.py)
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "kaos-metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1))
+
 # INGESTION DIRS PREFICES
 MANUAL_DATA_DIR_PREFIX = "manual_data"
 MANIFEST_DIR_PREFIX = "manifest"
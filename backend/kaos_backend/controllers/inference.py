@@ -4,10 +4,11 @@ from tempfile import TemporaryDirectory
 
 from flask import current_app as app
 
+from kaos_backend.exceptions.exceptions import BadRequestMethodError
 from kaos_backend.services.job_service import JobService
 from kaos_backend.util.dag import build_full_provenance_dag
 from kaos_backend.util.helpers import BundleDirectory, BundleHash, remove_files_from_directory
-from kaos_backend.util.validators import BundleValidator
+from kaos_backend.util.validators import BundleValidator, parse_since
 
 
 class InferenceController:
@@ -70,6 +71,13 @@ class InferenceController:
         app.logger.debug("@%s: get inference logs %s", InferenceController.__name__, endpoint_name)
         return self.job_service.get_serve_logs(endpoint_name)
 
+    def stream_logs(self, endpoint_name, follow=False, since=None, tail=None):
+        app.logger.debug("@%s: stream inference logs %s", InferenceController.__name__, endpoint_name)
+
+        if tail is not None and tail < 0:
+            raise BadRequestMethodError("tail must be non-negative")
+        return self.job_service.stream_serve_logs(endpoint_name, follow=follow, since=parse_since(since), tail=tail)
+
     def get_build_logs(self, workspace, job_id):
         app.logger.debug("@%s: get build inference logs for job %s in workspace %s",
                          InferenceController.__name__, job_id, workspace)
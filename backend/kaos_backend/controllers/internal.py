@@ -1,6 +1,8 @@
 from flask import current_app as app
 
+from ..exceptions.exceptions import TeardownError
 from ..services.job_service import JobService
+from ..util.metrics import METRICS
 
 
 class InternalController(object):
@@ -10,10 +12,20 @@ class InternalController(object):
 
     def destroy_resources(self):
         app.logger.debug("@%s: destroying all resources", InternalController.__name__)
-        for workspace in self.job_service.list_workspaces()["names"]:
-            app.logger.debug("@%s: killing workspace -> %s", InternalController.__name__, workspace)
-            self.job_service.kill_workspace(workspace)
+        workspaces = self.job_service.list_workspaces()["names"]
+        app.logger.debug("@%s: killing workspaces -> %s", InternalController.__name__, workspaces)
+        report = self.job_service.kill_workspaces(workspaces)
         self.job_service.destroy_pachyderm_resources()
+        if report.failed:
+            raise TeardownError(report)
+        return report.to_dict()
+
+    def get_health(self):
+        return self.job_service.get_channel_health()
+
+    @staticmethod
+    def get_metrics():
+        return METRICS.render()
 
     def create_training_pipeline(self, workspace, user, registry, image_name, **kwargs):
         return self.job_service.define_train_pipeline(workspace, user, registry, image_name, **kwargs)
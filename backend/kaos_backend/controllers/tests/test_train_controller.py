@@ -1,3 +1,4 @@
+import datetime as dt
 import os
 
 import flask
@@ -6,7 +7,7 @@ import uuid
 
 from kaos_backend.controllers.tests import create_job_service, t_any, create_train_zip
 from kaos_backend.controllers.train import TrainController
-from kaos_backend.exceptions.exceptions import InvalidBundleError
+from kaos_backend.exceptions.exceptions import BadRequestMethodError, InvalidBundleError, PageError
 from kaos_backend.util.tests import create_zip
 
 from kaos_model.common import TrainJobListing, SubmissionInfo
@@ -44,6 +45,41 @@ def test_list_train(mocker):
         assert train_controller.list_training_jobs("pippo") == reference_listing
 
 
+def test_list_train_filters(mocker):
+    job_service = create_job_service(mocker, workspaces=["pippo"])
+    for name in ("list_training_jobs", "list_build_train_jobs", "list_ingestion_jobs"):
+        setattr(job_service, name, mocker.Mock(return_value=[]))
+
+    with flask.Flask("Test").app_context():
+        train_controller = TrainController(job_service)
+        train_controller.list_training_jobs("pippo", limit=5, since="2019-10-01", state="JOB_SUCCESS")
+
+        since = dt.datetime(2019, 10, 1).timestamp()
+        for name in ("list_training_jobs", "list_build_train_jobs", "list_ingestion_jobs"):
+            getattr(job_service, name).assert_called_once_with("pippo", limit=5, since=since, state="JOB_SUCCESS")
+
+        with pytest.raises(BadRequestMethodError):
+            train_controller.list_training_jobs("pippo", state="DONE")
+        with pytest.raises(BadRequestMethodError):
+            train_controller.list_training_jobs("pippo", since="yesterday")
+
+
+def test_training_info_order(mocker):
+    job_service = create_job_service(mocker, workspaces=["pippo"])
+    job_service.get_training_page = mocker.Mock(return_value=(None, 0))
+
+    with flask.Flask("Test").app_context():
+        train_controller = TrainController(job_service)
+        train_controller.get_training_info("pippo", "job", order="asc")
+        assert job_service.get_training_page.call_args[1]["ascending"]
+
+        for order in ("ascending", "ASC", ""):
+            with pytest.raises(BadRequestMethodError, match="order must be one of asc, desc"):
+                train_controller.get_training_info("pippo", "job", order=order)
+        with pytest.raises(PageError):
+            train_controller.get_training_info("pippo", "job", page_id=-1)
+
+
 def test_invalid_submit_training(mocker):
 
     service = create_job_service(mocker)
@@ -4,12 +4,13 @@ from tempfile import TemporaryDirectory
 
 from flask import current_app as app
 
-from kaos_backend.constants import TRAIN_PIPELINE_PREFIX
-from kaos_backend.exceptions.exceptions import PageError, ModelNotFoundError, JobNotFoundError, JobNotRunningError
+from kaos_backend.constants import JOB_STATE, TRAIN_PIPELINE_PREFIX
+from kaos_backend.exceptions.exceptions import BadRequestMethodError, PageError, ModelNotFoundError, JobNotFoundError, \
+    JobNotRunningError
 from kaos_backend.services.job_service import JobService
 from kaos_backend.util.dag import build_model_provenance_dag
 from kaos_backend.util.helpers import BundleDirectory, BundleHash, remove_files_from_directory
-from kaos_backend.util.validators import BundleValidator
+from kaos_backend.util.validators import BundleValidator, parse_since
 
 from kaos_model.common import DataDescriptor, TrainJobListing
 
@@ -26,34 +27,40 @@ class TrainController:
     def __init__(self, job_service: JobService):
         self.job_service = job_service
 
-    def list_training_jobs(self, workspace):
+    def list_training_jobs(self, workspace, limit=None, since=None, state=None):
         app.logger.debug("@%s: list training in %s", TrainController.__name__, workspace)
 
+        if limit is not None and limit < 0:
+            raise BadRequestMethodError("limit must be non-negative")
+        if state is not None and state not in JOB_STATE.values():
+            raise BadRequestMethodError(f"state must be one of {', '.join(JOB_STATE.values())}")
+        since = parse_since(since)
+
         return TrainJobListing(
-            training=self.job_service.list_training_jobs(workspace),
-            building=self.job_service.list_build_train_jobs(workspace),
-            ingesting=self.job_service.list_ingestion_jobs(workspace)
+            training=self.job_service.list_training_jobs(workspace, limit=limit, since=since, state=state),
+            building=self.job_service.list_build_train_jobs(workspace, limit=limit, since=since, state=state),
+            ingesting=self.job_service.list_ingestion_jobs(workspace, limit=limit, since=since, state=state)
         )
 
     def inspect_training_pipeline(self, workspace):
         app.logger.debug("@%s: inspect %s training pipeline", TrainController.__name__, workspace)
         return self.job_service.inspect_training_pipeline(f"{TRAIN_PIPELINE_PREFIX}-{workspace}")
 
-    def get_training_info(self, workspace, job_id, sort_by=None, page_id=0):
+    def get_training_info(self, workspace, job_id, sort_by=None, page_id=0, order="desc", top_k=None, minimum=None,
+                          maximum=None):
         app.logger.debug("@%s: get training job %s in %s", TrainController.__name__, job_id, workspace)
 
         if page_id < 0:
-            return PageError("page id must be non-negative")
-        job_info = self.job_service.get_training_info(workspace, job_id, extract_metric=sort_by)
-        partitions = job_info.partitions
-        page_count = len(partitions) // self.PAGE_SIZE + 1
-
-        if sort_by:
-            partitions.sort(key=lambda p: (p.score is None, p.score), reverse=True)
-
-        page_start = page_id * self.PAGE_SIZE
-        page_finish = page_start + self.PAGE_SIZE
-        job_info.partitions = partitions[page_start:page_finish]
+            raise PageError("page id must be non-negative")
+        if order not in ("asc", "desc"):
+            raise BadRequestMethodError("order must be one of asc, desc")
+        ascending = order == "asc"
+        # sorting and paging happen in the job service (from the metric table of the job)
+        job_info, count = self.job_service.get_training_page(workspace, job_id, sort_by=sort_by,
+                                                            offset=page_id * self.PAGE_SIZE, limit=self.PAGE_SIZE,
+                                                            ascending=ascending, top_k=top_k, minimum=minimum,
+                                                            maximum=maximum)
+        page_count = count // self.PAGE_SIZE + 1
 
         return job_info, page_count
 
@@ -85,6 +92,20 @@ class TrainController:
                              TrainController.__name__, job_id, workspace)
             raise JobNotFoundError(job_id)
 
+    def stream_logs(self, workspace, job_id, follow=False, since=None, tail=None, datum_id=None):
+        app.logger.debug("@%s: stream logs of job %s in %s", TrainController.__name__, job_id, workspace)
+
+        if tail is not None and tail < 0:
+            raise BadRequestMethodError("tail must be non-negative")
+        filters = dict(follow=follow, since=parse_since(since), tail=tail, datum_id=datum_id)
+
+        if self.job_service.check_train_job_exists(workspace, job_id):
+            return self.job_service.stream_train_logs(workspace, job_id, **filters)
+        elif self.job_service.check_build_train_job_exists(workspace, job_id):
+            return self.job_service.stream_build_train_logs(workspace, job_id, **filters)
+        else:
+            raise JobNotFoundError(job_id)
+
     def get_bundle(self, workspace, job_id, include_code, include_data, include_model, model_id=None):
         app.logger.debug("@%s: get bundle of training job %s on %s", TrainController.__name__, job_id, workspace)
 
@@ -92,11 +113,17 @@ class TrainController:
             bundle_dir = os.path.join(temp_dir, "bundle")
             os.mkdir(bundle_dir)
 
-            partitions = self.job_service.get_datum_by_job_id(workspace, job_id)
+            # only the partitions of the bundle are resolved (the first one carries the code and data)
+            if include_model:
+                partitions = self.job_service.get_datum_by_job_id(workspace, job_id, model_id=model_id)
+                if model_id and not partitions:
+                    raise ModelNotFoundError(model_id)
+            else:
+                partitions = self.job_service.get_datum_by_job_id(workspace, job_id, limit=1)
             is_hyper_opt = bool(partitions[0].hyperparams)
 
             if include_model:
-                self.download_model(bundle_dir, model_id, partitions, is_hyper_opt)
+                self.download_model(bundle_dir, partitions, is_hyper_opt)
 
             if include_code:
                 self.download_code(bundle_dir, partitions[0].code)
@@ -117,12 +144,7 @@ class TrainController:
         self.job_service.download_by_info(code_descriptor, code_dir)
         remove_files_from_directory(code_dir, self.exclude_filename)
 
-    def download_model(self, bundle_dir, model_id, datums, hyper_opt):
-        if model_id:
-            datums = list(filter(lambda x: model_id in x.output.path, datums))
-            if len(datums) == 0:
-                raise ModelNotFoundError(model_id)
-
+    def download_model(self, bundle_dir, datums, hyper_opt):
         for datum in datums:
             output_branch, model_prefix = datum.output.path.split(":")
             head_commit = self.job_service.get_head_commit(model_prefix, output_branch, datum.output.repo)
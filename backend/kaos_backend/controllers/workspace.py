@@ -1,5 +1,6 @@
 from flask import current_app as app
 
+from kaos_backend.exceptions.exceptions import BadRequestMethodError
 from kaos_backend.services.job_service import JobService
 
 
@@ -15,26 +16,16 @@ class WorkspaceController:
     def create_workspace(self, workspace, user):
         app.logger.debug("@%s: create workspace %s on %s", WorkspaceController.__name__, workspace, user)
 
-        app.logger.debug("@%s: initializing repositories on %s", WorkspaceController.__name__, workspace)
-        self.job_service.init_workspace_repos(workspace, user)
+        return self.job_service.provision_workspaces({workspace: user})
 
-        app.logger.debug("@%s: adding DUMMY notebook-data on %s", WorkspaceController.__name__, workspace)
-        self.job_service.init_notebook_data(workspace, user)
+    def create_workspaces(self, workspaces, user):
+        app.logger.debug("@%s: create workspaces %s on %s", WorkspaceController.__name__, workspaces, user)
 
-        app.logger.debug("@%s: creating build pipeline on %s", WorkspaceController.__name__, workspace)
-        build_train_resp = self.job_service.define_build_train_pipeline(workspace, user)
+        if not isinstance(workspaces, list) or not workspaces \
+                or not all(isinstance(workspace, str) and workspace for workspace in workspaces):
+            raise BadRequestMethodError("workspaces must be a non-empty list of names")
 
-        app.logger.debug("@%s: creating build serve pipeline on %s", WorkspaceController.__name__, workspace)
-        build_serve_resp = self.job_service.define_build_serve_pipeline(workspace, user)
-
-        app.logger.debug("@%s: creating build notebook pipeline on %s", WorkspaceController.__name__, workspace)
-        build_notebook_resp = self.job_service.define_build_notebook_pipeline(workspace, user)
-
-        return {
-            "build_train": build_train_resp,
-            "build_serve": build_serve_resp,
-            "build_notebook": build_notebook_resp
-        }
+        return self.job_service.provision_workspaces({workspace.lower(): user for workspace in workspaces})
 
     def describe_workspace(self, workspace):
         app.logger.debug("@%s: describe workspace on %s", WorkspaceController.__name__, workspace)
@@ -49,4 +40,4 @@ class WorkspaceController:
     def kill_workspace(self, workspace):
         app.logger.debug("@%s: kill workspace %s", WorkspaceController.__name__, workspace)
 
-        self.job_service.kill_workspace(workspace)
+        return self.job_service.kill_workspace(workspace)
@@ -68,14 +68,34 @@ class CommitNotFoundError(PachydermError):
         self.commit_id = commit_id
 
 
+class PlanError(JobServiceError):
+    def __init__(self, action, report):
+        failures = ", ".join(f"{resource} ({error})" for resource, error in report.failed.items())
+        skipped = f", skipped: {', '.join(report.skipped)}" if report.skipped else ""
+        super().__init__(f"Failed to {action} {failures}{skipped}")
+        self.report = report
+
+
+class ProvisioningError(PlanError):
+    def __init__(self, report):
+        super().__init__("create", report)
+
+
+class TeardownError(PlanError):
+    def __init__(self, report):
+        super().__init__("delete", report)
+
+
 class BadRequestMethodError(Exception):
     def __init__(self, message):
         super().__init__(message)
+        self.message = message
 
 
 class PageError(Exception):
     def __init__(self, message):
         super().__init__(message)
+        self.message = message
 
 
 class InvalidBundleError(ApplicationError):
@@ -96,3 +116,15 @@ class MemoryRequestError(ApplicationError):
 
 class AuthorizationError(ApplicationError):
     pass
+
+
+class AdmissionTimeoutError(ApplicationError):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Not enough memory to accept the request, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class StreamLimitError(ApplicationError):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many followed streams, retry in {retry_after} seconds")
+        self.retry_after = retry_after
@@ -2,7 +2,8 @@ from kaos_backend.exceptions.exceptions import BadRequestMethodError, NotebookAl
     ModelNotFoundError, PipelineInStandby, PipelineNotFoundError, MetricNotFound, \
     CommitNotFoundError, IncompleteDatumError, UnfinishedCommitError, PachydermError, JobNotRunningError, \
     PageError, InvalidBundleError, AlienProvenanceError, GPURequestError, MemoryRequestError, CPURequestError, \
-    AuthorizationError
+    AuthorizationError, AdmissionTimeoutError, ProvisioningError, TeardownError, \
+    StreamLimitError
 
 from kaos_model.api import Error
 
@@ -84,6 +85,24 @@ def register_application_exception(app):
     def handle_unfinished_commit_error(error):
         return make_error_response(500, error_code="UNFINISHED_COMMIT", message=error.message)
 
+    @app.errorhandler(ProvisioningError)
+    def handle_provisioning_error(error):
+        return make_error_response(500, error_code="PROVISIONING_FAILURE", message=error.message)
+
+    @app.errorhandler(TeardownError)
+    def handle_teardown_error(error):
+        return make_error_response(500, error_code="TEARDOWN_FAILURE", message=error.message)
+
     @app.errorhandler(AuthorizationError)
     def handle_authorization_error(error):
         return make_error_response(401, error_code="AUTHORIZATION_FAILURE", message=error.message)
+
+    @app.errorhandler(AdmissionTimeoutError)
+    def handle_admission_timeout_error(error):
+        body, status_code = make_error_response(503, error_code="SERVICE_OVERLOADED", message=error.message)
+        return body, status_code, {"Retry-After": str(error.retry_after)}
+
+    @app.errorhandler(StreamLimitError)
+    def handle_stream_limit_error(error):
+        body, status_code = make_error_response(503, error_code="SERVICE_OVERLOADED", message=error.message)
+        return body, status_code, {"Retry-After": str(error.retry_after)}
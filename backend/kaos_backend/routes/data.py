@@ -1,6 +1,7 @@
 from flask import Blueprint, request
 
 from kaos_backend.controllers.data import DataController
+from kaos_backend.util.admission import admission_required
 from kaos_backend.util.flask import jsonify
 from kaos_backend.util.validators import auth_required
 
@@ -11,6 +12,7 @@ def build_data_blueprint(controller: DataController):
     @blueprint.route("/data/<workspace>/features", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def feature_submit(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         cpu = request.args.get('cpu', None)
@@ -21,6 +23,7 @@ def build_data_blueprint(controller: DataController):
     @blueprint.route("/data/<workspace>/manifest", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def manifest_submit(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         cpu = request.args.get('cpu', None)
@@ -31,6 +34,7 @@ def build_data_blueprint(controller: DataController):
     @blueprint.route("/data/<workspace>/params", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def param_submit(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         parallelism = int(request.args.get('parallelism', 1))
@@ -43,6 +47,7 @@ def build_data_blueprint(controller: DataController):
     @blueprint.route("/data/<workspace>/notebook", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def notebook_submit(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         return controller.put_notebook_data(workspace, user, request.data)
@@ -1,8 +1,11 @@
+import functools
+
 import flask
 from flask import Blueprint, request, make_response
 
 from kaos_backend.controllers.inference import InferenceController
-from kaos_backend.util.flask import jsonify
+from kaos_backend.util.admission import admission_required
+from kaos_backend.util.flask import FOLLOWED_STREAMS, boolean, jsonify, ndjson
 
 from kaos_model.api import Response
 
@@ -23,6 +26,7 @@ def build_inference_blueprint(controller: InferenceController):
     @blueprint.route("/inference/<workspace>/<model_id>", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def inference_deploy(workspace, model_id):
         user = request.args.get('user', 'default').replace('.', '')
         model_id = None if model_id == "None" else model_id
@@ -53,6 +57,15 @@ def build_inference_blueprint(controller: InferenceController):
     def inference_logs(endpoint_name):
         return flask.jsonify(controller.get_logs(endpoint_name))
 
+    @blueprint.route("/inference/<endpoint_name>/logs/stream", methods=["GET"])
+    @auth_required
+    def inference_logs_stream(endpoint_name):
+        follow = request.args.get('follow', default=False, type=boolean)
+        since = request.args.get('since', default=None, type=str)
+        tail = request.args.get('tail', default=None, type=int)
+        records_f = functools.partial(controller.stream_logs, endpoint_name, follow=follow, since=since, tail=tail)
+        return FOLLOWED_STREAMS.ndjson(records_f) if follow else ndjson(records_f())
+
     @blueprint.route("/inference/<endpoint_name>", methods=["DELETE"])
     @jsonify
     @auth_required
@@ -1,3 +1,4 @@
+import flask
 from flask import Blueprint, request
 from kaos_backend.controllers.internal import InternalController
 
@@ -12,6 +13,15 @@ def build_internal_blueprint(controller: InternalController):
     def destroy_resources():
         return controller.destroy_resources()
 
+    @blueprint.route("/internal/health", methods=["GET"])
+    def health():
+        health_info = controller.get_health()
+        return flask.jsonify(health_info), 200 if health_info["healthy"] else 503
+
+    @blueprint.route("/internal/metrics", methods=["GET"])
+    def metrics():
+        return flask.Response(controller.get_metrics(), mimetype="text/plain; version=0.0.4")
+
     @blueprint.route("/internal/train_pipeline/<workspace>/<user>", methods=["POST"])
     @jsonify
     def upsert_training_pipeline(workspace, user):
@@ -1,6 +1,7 @@
 from flask import Blueprint, request
 
 from kaos_backend.controllers.notebook import NotebookController
+from kaos_backend.util.admission import admission_required
 from kaos_backend.util.flask import jsonify
 
 from kaos_model.api import Response
@@ -22,6 +23,7 @@ def build_notebook_blueprint(controller: NotebookController):
     @blueprint.route("/notebook/<workspace>", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def notebook_create(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         cpu = request.args.get('cpu', None)
@@ -0,0 +1,26 @@
+import pytest
+from flask import Flask
+
+from kaos_backend.controllers.internal import InternalController
+from kaos_backend.routes.internal import build_internal_blueprint
+from kaos_backend.util.metrics import METRICS
+
+
+@pytest.fixture()
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(build_internal_blueprint(InternalController(None)))
+    with app.test_client() as client:
+        yield client
+
+
+def test_metrics_route_exposes_prometheus_text(client):
+    METRICS.reset()
+    METRICS.record_rpc("/pps.API/InspectPipeline", 10)
+
+    response = client.get("/internal/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b'kaos_pachyderm_rpcs_total{method="/pps.API/InspectPipeline"} 1' in response.data
+    assert b'kaos_pachyderm_sent_bytes_total{method="/pps.API/InspectPipeline"} 10' in response.data
@@ -12,11 +12,10 @@ os.environ["TOKEN"] = "TEST"
 
 
 @pytest.fixture()
-def client(mocker):
+def train_controller(mocker):
     train_controller = TrainController(None)
-    train_blueprint = build_train_blueprint(train_controller)
 
-    def side_effect(workspace, job_id, sort_by, page_id):
+    def side_effect(workspace, job_id, sort_by, page_id, **selection):
         if job_id == 'existing_job':
             return {"asdf": 111}, 1
         elif job_id == 'nonexistent_job':
@@ -27,6 +26,12 @@ def client(mocker):
             raise IncompleteDatumError("asdf")
 
     train_controller.get_training_info = mocker.Mock(side_effect=side_effect)
+    return train_controller
+
+
+@pytest.fixture()
+def client(train_controller):
+    train_blueprint = build_train_blueprint(train_controller)
 
     app = Flask(__name__)
     app.register_blueprint(train_blueprint)
@@ -43,6 +48,15 @@ def test_train_info_existing_job(client):
     assert r.status_code == 200
 
 
+def test_train_info_selection(client, train_controller):
+    token = os.getenv("TOKEN")
+    r = client.get("/train/asdf/existing_job?sort_by=loss&order=asc&top_k=10&min=0.1", headers={"X-Token": token})
+    assert r.status_code == 200
+
+    train_controller.get_training_info.assert_called_once_with("asdf", "existing_job", sort_by="loss", page_id=0,
+                                                               order="asc", top_k=10, minimum=0.1, maximum=None)
+
+
 def test_train_info_no_job(client):
     token = os.getenv("TOKEN")
     r = client.get("/train/asdf/nonexistent_job", headers={"X-Token": token})
@@ -59,3 +73,13 @@ def test_train_info_incomplete_datum(client):
     token = os.getenv("TOKEN")
     r = client.get("/train/asdf/incomplete_datum", headers={"X-Token": token})
     assert r.status_code == 500
+
+
+def test_train_list_bad_request(client):
+    token = os.getenv("TOKEN")
+    r = client.get("/train/asdf?limit=-1", headers={"X-Token": token})
+    assert r.status_code == 400
+    assert b"limit must be non-negative" in r.data
+
+    r = client.get("/train/asdf?since=yesterday", headers={"X-Token": token})
+    assert r.status_code == 400
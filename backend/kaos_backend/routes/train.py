@@ -1,7 +1,10 @@
+import functools
+
 from flask import Blueprint, request, make_response
 
 from kaos_backend.controllers.train import TrainController
-from kaos_backend.util.flask import jsonify
+from kaos_backend.util.admission import admission_required
+from kaos_backend.util.flask import FOLLOWED_STREAMS, boolean, jsonify, ndjson
 
 from kaos_model.api import PagedResponse, Response
 
@@ -15,11 +18,15 @@ def build_train_blueprint(controller: TrainController):
     @jsonify
     @auth_required
     def train_list(workspace):
-        return Response(response=controller.list_training_jobs(workspace))
+        limit = request.args.get('limit', default=None, type=int)
+        since = request.args.get('since', default=None, type=str)
+        state = request.args.get('state', default=None, type=str)
+        return Response(response=controller.list_training_jobs(workspace, limit=limit, since=since, state=state))
 
     @blueprint.route("/train/<workspace>", methods=["POST"])
     @jsonify
     @auth_required
+    @admission_required
     def train_submit(workspace):
         user = request.args.get('user', 'default').replace('.', '')
         cpu = request.args.get('cpu', None)
@@ -33,7 +40,13 @@ def build_train_blueprint(controller: TrainController):
     def train_info(workspace, job_id):
         sort_by = request.args.get('sort_by', None)
         page_id = int(request.args.get('page_id', 0))
-        job_info, page_count = controller.get_training_info(workspace, job_id, sort_by=sort_by, page_id=page_id)
+        order = request.args.get('order', default='desc', type=str)
+        top_k = request.args.get('top_k', default=None, type=int)
+        minimum = request.args.get('min', default=None, type=float)
+        maximum = request.args.get('max', default=None, type=float)
+        job_info, page_count = controller.get_training_info(workspace, job_id, sort_by=sort_by, page_id=page_id,
+                                                            order=order, top_k=top_k, minimum=minimum,
+                                                            maximum=maximum)
         return PagedResponse(
             page_id=page_id,
             page_count=page_count,
@@ -68,6 +81,17 @@ def build_train_blueprint(controller: TrainController):
     def train_logs(workspace, job_id):
         return controller.get_logs(workspace, job_id)
 
+    @blueprint.route("/train/<workspace>/<job_id>/logs/stream", methods=["GET"])
+    @auth_required
+    def train_logs_stream(workspace, job_id):
+        follow = request.args.get('follow', default=False, type=boolean)
+        since = request.args.get('since', default=None, type=str)
+        tail = request.args.get('tail', default=None, type=int)
+        datum_id = request.args.get('datum_id', default=None, type=str)
+        records_f = functools.partial(controller.stream_logs, workspace, job_id, follow=follow, since=since,
+                                      tail=tail, datum_id=datum_id)
+        return FOLLOWED_STREAMS.ndjson(records_f) if follow else ndjson(records_f())
+
     @blueprint.route("/train/<workspace>/<model_id>/provenance", methods=["GET"])
     @jsonify
     @auth_required
@@ -15,6 +15,15 @@ def build_workspace_blueprint(controller: WorkspaceController):
     def list_workspace():
         return controller.list_workspaces()
 
+    @blueprint.route("/workspace", methods=["POST"])
+    @jsonify
+    @auth_required
+    def create_workspaces():
+        user = request.args.get('user', 'default').replace('.', '')
+        body = request.get_json(silent=True)
+        workspaces = body.get('workspaces') if isinstance(body, dict) else None
+        return controller.create_workspaces(workspaces, user)
+
     @blueprint.route("/workspace/<workspace>", methods=["POST"])
     @jsonify
     @auth_required
@@ -1,14 +1,19 @@
 import binascii
 import datetime as dt
+import functools
 import glob
+import itertools
 import json
 import os
 from typing import List
 from io import StringIO
 
 import docker
+import python_pachyderm.client.pfs.pfs_pb2 as pfs_proto
 import python_pachyderm.client.pps.pps_pb2 as proto
-from flask import current_app as app
+from flask import current_app as app, g
+from kaos_backend.clients.async_pachyderm import AsyncPachydermClient
+from kaos_backend.clients.job_store import JobStore
 from kaos_backend.clients.pachyderm import PachydermClient
 from kaos_backend.constants import BUILD_IMAGE, BUILD_NOTEBOOK_PIPELINE_PREFIX, BUILD_SERVE_PIPELINE_PREFIX, \
     BUILD_TRAIN_PIPELINE_PREFIX, CLOUD_PROVIDER, TRAIN_DATA_REPO_PREFIX, \
@@ -18,12 +23,15 @@ from kaos_backend.constants import BUILD_IMAGE, BUILD_NOTEBOOK_PIPELINE_PREFIX,
     PIPELINE_STATE, PRED_ROUTE, SERVE_IMAGE_REPO_PREFIX, SERVE_PIPELINE_PREFIX, \
     SERVE_SOURCE_REPO_PREFIX, SERVICE_HOST, TRAIN_IMAGE_REPO_PREFIX, \
     TRAIN_PIPELINE_PREFIX, TRAIN_SOURCE_REPO_PREFIX, NOTEBOOK_DATA_REPO_PREFIX, TRAIN_DATA_MOUNT_PATH, \
-    INGESTION_PIPELINE_PREFIX, MANIFEST_REPO_PREFIX
-from kaos_backend.exceptions.exceptions import JobNotFoundError, NotebookAlreadyExistsError, PipelineNotFoundError, \
-    ModelNotFoundError, UnfinishedCommitError, MetricNotFound, AlienProvenanceError
-from kaos_backend.util.docker import get_login_command, create_docker_repo, delete_docker_repo
+    INGESTION_PIPELINE_PREFIX, MANIFEST_REPO_PREFIX, FANOUT_CONCURRENCY, PLAN_CONCURRENCY
+from kaos_backend.exceptions.exceptions import ApplicationError, JobNotFoundError, NotebookAlreadyExistsError, \
+    PipelineNotFoundError, ModelNotFoundError, AlienProvenanceError, ProvisioningError, TeardownError
+from kaos_backend.util.async_bridge import AsyncBridge, gather_limited
+from kaos_backend.util.docker import get_login_command, create_docker_repo, delete_docker_repo, get_ecr_client
 from kaos_backend.util.error_handling import recover
 from kaos_backend.util.metadata import build_resource_meta, build_serve_regex
+from kaos_backend.util.metric_table import MetricTable
+from kaos_backend.util.resource_plan import ResourcePlan
 from kaos_backend.util.utility import repeated_call
 from kaos_backend.util.validators import validate_resources
 from kaos_model.common import WorkspaceInfo, DataDescriptor, PartitionInfo, \
@@ -41,10 +49,123 @@ class JobService:
 
     SERVICE_TYPE = "ClusterIP"
 
-    def __init__(self, client: PachydermClient):
+    # states after which the info of a job cannot change
+    FINISHED_JOB_STATES = (JOB_STATE[proto.JOB_SUCCESS], JOB_STATE[proto.JOB_FAILURE], JOB_STATE[proto.JOB_KILLED])
+
+    def __init__(self,
+                 client: PachydermClient,
+                 async_client: AsyncPachydermClient = None,
+                 bridge: AsyncBridge = None,
+                 job_store: JobStore = None):
         self.client = client
+        self.job_store = job_store
+        self.async_client = async_client
+        self.bridge = bridge or AsyncBridge()
         self.docker_client = docker.from_env()
 
+    def fan_out(self, method: str, calls: list, recover_errors=(), recover_f=None):
+        """
+        Calls a client method once per argument tuple, concurrently if an async client is available.
+
+        Args:
+            method (str): name of the method (same on `PachydermClient` and `AsyncPachydermClient`)
+            calls (list): argument tuples, one per call
+            recover_errors (tuple): error types replaced by `recover_f()` instead of failing the fan-out
+            recover_f (callable): produces the result of a recovered call
+
+        Returns:
+            <list of results, in the order of `calls`>
+
+        """
+        app.logger.debug("@%s: fan out %d %s calls", JobService.__name__, len(calls), method)
+
+        if self.async_client is None:
+            f = getattr(self.client, method)
+            return [recover(lambda: f(*args), recover_errors, recover_f) for args in calls]
+
+        async def call(args):
+            try:
+                return await getattr(self.async_client, method)(*args)
+            except Exception as e:
+                if type(e) in recover_errors:
+                    app.logger.warning(str(e))
+                    return recover_f()
+                raise
+
+        return self.bridge.run(gather_limited([call(args) for args in calls], FANOUT_CONCURRENCY))
+
+    def memoized_fan_out(self, method: str, calls: list):
+        """
+        `fan_out` sharing results within the current request: each distinct call is issued once per request.
+
+        Args:
+            method (str): name of the method (same on `PachydermClient` and `AsyncPachydermClient`)
+            calls (list): argument tuples, one per call (possibly repeated)
+
+        Returns:
+            <list of results, in the order of `calls`>
+
+        """
+        memo = g.setdefault("pachyderm_memo", {})
+        missing = list(dict.fromkeys(args for args in calls if (method, args) not in memo))
+        if missing:
+            for args, result in zip(missing, self.fan_out(method, missing)):
+                memo[(method, args)] = result
+        return [memo[(method, args)] for args in calls]
+
+    def __describe_commits(self, commits: list):
+        infos = self.memoized_fan_out("inspect_commit", [(commit,) for commit in commits])
+        return {commit: json.loads(info.description) for commit, info in zip(commits, infos)}
+
+    def __list_model_ids(self, model_repo: str, model_commit: str, stats_commit: str, datums: list, hyper_opt: bool):
+        """
+        Returns:
+            <dict of the ids of the models output by each datum>
+
+        """
+        # separate logic for hyperopt since multiple files are on a single commit (only stats has "truth")
+        if hyper_opt:
+            # single listing of the outputs of every datum (/<datum id>/pfs/out/<model id>)
+            model_ids = {datum.datum_info.datum.id: [] for datum in datums}
+            for obj in self.client.glob_file(f"{model_repo}/{stats_commit}", "/*/pfs/out/*"):
+                datum_id, *_, model_id = obj.file.path.split("/")[1:]
+                if datum_id in model_ids:
+                    model_ids[datum_id].append(model_id)
+            return model_ids
+
+        objs = self.memoized_fan_out("list_file", [(f"{model_repo}/{model_commit}", "/")])[0]
+        model_ids = [os.path.split(obj.file.path)[-1] for obj in objs]
+        return {datum.datum_info.datum.id: model_ids for datum in datums}
+
+    def __get_model_metrics(self, model_repo: str, model_commit: str):
+        """
+        Returns:
+            <dict of the metrics (json bytes) of each model of the commit that has some>
+
+        """
+        glob_path = "/*/metrics/**metrics**.json"
+        objs = self.client.glob_file(f"{model_repo}/{model_commit}", glob_path)
+        objs = sorted((obj for obj in objs if obj.file_type == pfs_proto.FILE), key=lambda obj: obj.file.path)
+        if not objs:
+            return {}
+
+        # a single read of every metrics file (concatenated in path order)
+        sizes = [obj.size_bytes for obj in objs]
+        blob = bytes(self.client.get_blob(repo=model_repo, commit=model_commit, path=glob_path,
+                                          size_bytes=sum(sizes)))
+        if len(blob) == sum(sizes):
+            offsets = itertools.accumulate([0] + sizes)
+            chunks = [blob[start:start + size] for start, size in zip(offsets, sizes)]
+        else:
+            # unexpected payload (the glob read is not the concatenation of the files): read them one by one
+            chunks = self.memoized_fan_out("get_blob", [(model_repo, model_commit, obj.file.path) for obj in objs])
+
+        metrics = {}
+        for obj, chunk in zip(objs, chunks):
+            model_id = obj.file.path.split("/")[1]
+            metrics[model_id] = metrics.get(model_id, b"") + bytes(chunk)
+        return metrics
+
     @staticmethod
     def put_pipeline_arguments(source_dir, **kwargs):
         root_dir = os.listdir(source_dir)[0]
@@ -55,10 +176,11 @@ class JobService:
     def get_service_pipeline_info(self,
                                   workspace: str,
                                   pipeline_name: str,
-                                  provenance: bool = False):
+                                  provenance: bool = False,
+                                  info: proto.PipelineInfo = None):
         app.logger.debug("@%s: get service pipeline info %s", JobService.__name__, pipeline_name)
 
-        info = self.client.inspect_pipeline(pipeline_name)
+        info = info or self.client.inspect_pipeline(pipeline_name)
 
         if info.description:
             desc = json.loads(info.description)
@@ -130,10 +252,10 @@ class JobService:
             model=model_info
         )
 
-    def get_notebook_info(self, pipeline_name: str):
+    def get_notebook_info(self, pipeline_name: str, info: proto.PipelineInfo = None):
         app.logger.debug("@%s: get notebook info %s", JobService.__name__, pipeline_name)
 
-        info = self.client.inspect_pipeline(pipeline_name)
+        info = info or self.client.inspect_pipeline(pipeline_name)
 
         if info.description:
             desc = json.loads(info.description)
@@ -150,159 +272,257 @@ class JobService:
 
     def get_training_info(self, workspace: str, job_id: str, extract_metric=None):
         app.logger.debug("@%s: get training info %s in workspace %s", JobService.__name__, job_id, workspace)
+        return self.get_training_page(workspace, job_id, sort_by=extract_metric)[0]
+
+    def get_training_page(self, workspace: str, job_id: str, sort_by=None, offset=0, limit=None, ascending=False,
+                          top_k=None, minimum=None, maximum=None):
+        """
+        Selects partitions of a training job from its `MetricTable`: scored by `sort_by` (if any) and ordered by score
+        (unscored partitions first), then optionally restricted to the `top_k` scores and/or a range of scores.
+
+        Finished jobs are materialized in the job store (if any) on first computation, and served from there.
+
+        Args:
+            workspace (str): name of the workspace
+            job_id (str): id of the training job
+            sort_by (str): metric to score (and sort) the partitions by
+            offset (int): number of partitions to skip
+            limit (int): maximum number of partitions (all if None)
+            ascending (bool): sort by increasing score (decreasing otherwise)
+            top_k (int): maximum number of (best) scored partitions
+            minimum (float): minimum score
+            maximum (float): maximum score
+
+        Returns:
+            <JobInfo with the selected partitions>, <total number of partitions matching the selection>
+
+        """
+        app.logger.debug("@%s: get training page of %s in workspace %s", JobService.__name__, job_id, workspace)
+
+        self.__check_training_job(workspace, job_id)
+
+        def select(table):
+            return table.select(sort_by=sort_by, ascending=ascending, top_k=top_k, minimum=minimum, maximum=maximum,
+                                offset=offset, limit=limit)
+
+        stored = self.job_store.get(workspace, job_id) if self.job_store is not None else None
+        if stored is not None:
+            job_info, table = stored
+            positions, scores, count = select(table)
+            partitions = self.job_store.get_partitions(workspace, job_id, positions)
+        else:
+            info = self.client.get_job_info(job_id)
+            entries, metrics = self.__list_partitions(info)
+            table = MetricTable.build(metrics)
+            job_info = self.__job_info(info, table)
+
+            if self.job_store is not None and job_info.state in self.FINISHED_JOB_STATES:
+                job_info.partitions = self.__resolve_partitions(workspace, info, entries)
+                self.job_store.put(workspace, job_info, table)
+                positions, scores, count = select(table)
+                partitions = [job_info.partitions[i] for i in positions]
+            else:
+                # pick the page first: only its partitions are resolved (provenance lookups are per page, not per trial)
+                positions, scores, count = select(table)
+                partitions = self.__resolve_partitions(workspace, info, [entries[i] for i in positions])
 
+        for partition, score in zip(partitions, scores):
+            partition.score = score
+        job_info.partitions = partitions
+        return job_info, count
+
+    def __check_training_job(self, workspace: str, job_id: str):
         # check if train pipeline exists
         pipeline = f"{TRAIN_PIPELINE_PREFIX}-{workspace}"
         if not self.client.check_pipeline_exists(pipeline):
             raise PipelineNotFoundError(pipeline)
 
         # handle incomplete jobs
-        if not self.client.check_job_exists(f"{TRAIN_PIPELINE_PREFIX}-{workspace}", job_id):
+        if not self.client.check_job_exists(pipeline, job_id):
             raise JobNotFoundError(job_id)
 
-        # get job info
-        info = self.client.get_job_info(job_id)
+    def __list_partitions(self, info: proto.JobInfo):
+        """
+        Enumerates the partitions (models) of a job, without resolving their provenance.
+
+        Returns:
+            <list of the (datum, model id) of each partition>, <list of the metrics (dict or None) of each partition>
 
-        # determine output based on commit
+        """
         model_repo = info.output_commit.repo.name
         model_commit = info.output_commit.id
 
         # only use "processed" datums
-        datums = self.client.list_datum(job_id)
+        datums = self.client.list_datum(info.job.id)
         hyper_opt = True if len(datums) > 1 else False
         datums = list(filter(lambda x: x.datum_info.state == 1, datums))
 
-        available_metrics = set()
+        # stats of the job itself (the head of the stats branch belongs to the latest job)
+        stats_commit = info.stats_commit.id or "stats"
+        model_ids = self.__list_model_ids(model_repo, model_commit, stats_commit, datums, hyper_opt)
+        metrics = self.__get_model_metrics(model_repo, model_commit)
 
-        # format output
+        entries = [(datum, model_id) for datum in datums for model_id in model_ids[datum.datum_info.datum.id]]
+        return entries, [json.loads(metrics[model_id]) if model_id in metrics else None for _, model_id in entries]
 
-        partitions = []
-        for datum in datums:
+    @staticmethod
+    def __job_info(info: proto.JobInfo, table: MetricTable):
+        return JobInfo(
+            job_id=info.job.id,
+            state=JOB_STATE[info.state],
+            process_time=info.stats.process_time.ToTimedelta().seconds,
+            available_metrics=table.metrics,
+            partitions=[]
+        )
+
+    def __resolve_partitions(self, workspace: str, info: proto.JobInfo, entries: list):
+        """
+        Resolves the provenance of partitions.
 
-            # get all parts of the datum
+        Args:
+            workspace (str): name of the workspace
+            info (proto.JobInfo): job of the partitions
+            entries (list): (datum, model id) of each partition
+
+        Returns:
+            <list of the (unscored) PartitionInfo of each partition>
+
+        """
+        model_repo = info.output_commit.repo.name
+        model_commit = info.output_commit.id
+
+        # get all parts of the datums (of the partitions only)
+        inputs = {}
+        for datum, _ in entries:
+            datum_id = datum.datum_info.datum.id
+            if datum_id in inputs:
+                continue
             data = list(datum.datum_info.data)
             image_input = next(
                 filter(lambda d: d.file.commit.repo.name.startswith(BUILD_TRAIN_PIPELINE_PREFIX), data))
             data_input = next(filter(lambda d: d.file.commit.repo.name.startswith(TRAIN_DATA_REPO_PREFIX), data))
-
+            hyper_input = next(filter(lambda d: d.file.commit.repo.name.startswith(HYPER_REPO_PREFIX), data))
             app.logger.info("@%s: image input %s", JobService.__name__, image_input)
+            output_branch = self.build_output_branch(image_input.file.path, data_input.file.path, hyper_input.file.path)
+            inputs[datum_id] = (image_input, data_input, hyper_input, output_branch)
 
-            hyper_input = next(filter(lambda d: d.file.commit.repo.name.startswith(HYPER_REPO_PREFIX), data))
+        # datums share a handful of code, data and hyper commits: each distinct one is resolved once (concurrently)
+        code_repo = f"{TRAIN_SOURCE_REPO_PREFIX}-{workspace}"
+        data_repo = f"{MANIFEST_REPO_PREFIX}-{workspace}"
+        hyper_repo = f"{HYPER_REPO_PREFIX}-{workspace}"
 
-            # convert the "image" datum to "code"
-            image_repo = image_input.file.commit.repo.name
-            image_commit = image_input.file.commit.id
-            image_path = image_input.file.path
-            output_branch = self.build_output_branch(image_input.file.path, data_input.file.path, hyper_input.file.path)
+        # convert the "image" datums to "code"
+        code_objs = [objs[0] for objs in self.memoized_fan_out(
+            "list_file", [(f"{code_repo}/master", f"/*{output_branch.split('_')[0]}")
+                          for *_, output_branch in inputs.values()])]
 
-            app.logger.info("@%s: inspecting commit %s/%s", JobService.__name__, image_repo, image_commit)
-
-            code_repo = f"{TRAIN_SOURCE_REPO_PREFIX}-{workspace}"
-            image_hash = output_branch.split('_')[0]
-            obj = self.client.list_file(f"{code_repo}/master", path=f"/*{image_hash}", history=-1)[0]
-            code_commit = obj.file.commit.id
-            code_path = os.path.split(obj.file.path)[0]
-
-            data_repo = f"{MANIFEST_REPO_PREFIX}-{workspace}"
-            data_info = self.client.inspect_commit(f"{TRAIN_DATA_REPO_PREFIX}-{workspace}/{data_input.file.commit.id}")
-            app.logger.debug(data_info.provenance)
-            data_commit = \
-                ["/".join([s.commit.repo.name, s.commit.id])
-                 for s in data_info.provenance if s.commit.repo.name == data_repo][0]
-            app.logger.debug(data_repo)
-            app.logger.debug(data_commit)
-            data_desc = json.loads(self.client.inspect_commit(data_commit).description)
-            code_desc = json.loads(self.client.inspect_commit(
-                f"{code_repo}/{code_commit}").description)
-            hyper_desc = json.loads(self.client.inspect_commit(
-                f"{HYPER_REPO_PREFIX}-{workspace}/{hyper_input.file.commit.id}").description)
-
-            # separate logic for hyperopt since multiple files are on a single commit (only stats has "truth")
-            if hyper_opt:
-                objs = self.client.list_file(f"{model_repo}/stats", path=f"/{datum.datum_info.datum.id}/pfs/out")
-            else:
-                objs = self.client.list_file(f"{model_repo}/{model_commit}", path="/")
-
-            model_ids = [os.path.split(obj.file.path)[-1] for obj in objs]
-
-            for model_id in model_ids:
-                # extract metrics (if present)
-                score = None
-                glob_path = f"/{model_id}/metrics/**metrics**.json"
-                if self.client.list_file(f"{model_repo}/{model_commit}", path=glob_path):
-                    metrics_bytes = self.client.get_blob(repo=model_repo, commit=model_commit, path=glob_path)
-
-                    metrics = json.loads(metrics_bytes)
-                    available_metrics.update(list(metrics.keys()))
-                    if extract_metric:
-                        if extract_metric not in metrics:
-                            raise MetricNotFound(extract_metric)
-                        score = f"{metrics.get(extract_metric):0.4f}"
-
-                code_descriptor = DataDescriptor(
-                    repo=code_repo,
-                    commit=code_commit,
-                    path=code_path,
-                    author=code_desc["user"]
-                )
+        data_infos = self.memoized_fan_out(
+            "inspect_commit", [(f"{TRAIN_DATA_REPO_PREFIX}-{workspace}/{d.file.commit.id}",)
+                               for _, d, _, _ in inputs.values()])
+        data_commits = [["/".join([s.commit.repo.name, s.commit.id])
+                         for s in data_info.provenance if s.commit.repo.name == data_repo][0]
+                        for data_info in data_infos]
 
-                data_descriptor = DataDescriptor(
-                    repo=data_input.file.commit.repo.name,
-                    commit=data_input.file.commit.id,
-                    path=data_input.file.path,
-                    author=data_desc["user"]
-                )
+        descs = self.__describe_commits(data_commits +
+                                        [f"{code_repo}/{obj.file.commit.id}" for obj in code_objs] +
+                                        [f"{hyper_repo}/{h.file.commit.id}" for _, _, h, _ in inputs.values()])
 
-                image_descriptor = DataDescriptor(
-                    repo=image_repo,
-                    commit=image_commit,
-                    path=image_path
-                )
+        resolved = {datum_id: (datum_inputs, code_obj, data_commit)
+                    for (datum_id, datum_inputs), code_obj, data_commit in zip(inputs.items(), code_objs, data_commits)}
 
-                output_descriptor = DataDescriptor(
-                    repo=model_repo,
-                    commit=model_commit,
-                    path=":".join([output_branch, model_id])
-                )
+        # format output
+
+        partitions = []
+        for datum, model_id in entries:
+            (image_input, data_input, hyper_input, output_branch), code_obj, data_commit = \
+                resolved[datum.datum_info.datum.id]
+
+            code_commit = code_obj.file.commit.id
+            code_path = os.path.split(code_obj.file.path)[0]
+
+            data_desc = descs[data_commit]
+            code_desc = descs[f"{code_repo}/{code_commit}"]
+            hyper_desc = descs[f"{hyper_repo}/{hyper_input.file.commit.id}"]
+
+            code_descriptor = DataDescriptor(
+                repo=code_repo,
+                commit=code_commit,
+                path=code_path,
+                author=code_desc["user"]
+            )
+
+            data_descriptor = DataDescriptor(
+                repo=data_input.file.commit.repo.name,
+                commit=data_input.file.commit.id,
+                path=data_input.file.path,
+                author=data_desc["user"]
+            )
 
-                hyperparams = None
-                # check if an "actual" hyperopt job (i.e. not empty)
-                if self.check_hyperopt(hyper_input.file.path):
-                    hyperparams = DataDescriptor(
-                        repo=hyper_input.file.commit.repo.name,
-                        commit=hyper_input.file.commit.id,
-                        path=hyper_input.file.path,
-                        author=hyper_desc["user"]
-                    )
-
-                partition_info = PartitionInfo(
-                    code=code_descriptor,
-                    data=data_descriptor,
-                    image=image_descriptor,
-                    datum_id=datum.datum_info.datum.id,
-                    score=score,
-                    hyperparams=hyperparams,
-                    output=output_descriptor
+            image_descriptor = DataDescriptor(
+                repo=image_input.file.commit.repo.name,
+                commit=image_input.file.commit.id,
+                path=image_input.file.path
+            )
+
+            output_descriptor = DataDescriptor(
+                repo=model_repo,
+                commit=model_commit,
+                path=":".join([output_branch, model_id])
+            )
+
+            hyperparams = None
+            # check if an "actual" hyperopt job (i.e. not empty)
+            if self.check_hyperopt(hyper_input.file.path):
+                hyperparams = DataDescriptor(
+                    repo=hyper_input.file.commit.repo.name,
+                    commit=hyper_input.file.commit.id,
+                    path=hyper_input.file.path,
+                    author=hyper_desc["user"]
                 )
 
-                partitions.append(partition_info)
+            partition_info = PartitionInfo(
+                code=code_descriptor,
+                data=data_descriptor,
+                image=image_descriptor,
+                datum_id=datum.datum_info.datum.id,
+                hyperparams=hyperparams,
+                output=output_descriptor
+            )
+
+            partitions.append(partition_info)
 
-        return JobInfo(
-            job_id=info.job.id,
-            state=JOB_STATE[info.state],
-            process_time=info.stats.process_time.ToTimedelta().seconds,
-            available_metrics=list(available_metrics),
-            partitions=partitions
-        )
+        return partitions
 
     def get_model_provenance(self, workspace: str, commit_id: str, model_id: str) -> PartitionInfo:
         app.logger.debug("@%s: get model %s provenance in workspace %s", JobService.__name__, commit_id, workspace)
 
-        jobs = self.client.get_jobs(f"{MODEL_REPO_PREFIX}-{workspace}")
-        job_id = list(filter(lambda x: x.output_commit.id == commit_id, jobs))[0].job.id
-        job_info = self.get_training_info(workspace, job_id)
-        partition = next(filter(lambda p: os.path.split(p.output.path)[-1] == model_id, job_info.partitions))
-        return partition
+        # models of finished jobs are indexed in the job store (a single lookup)
+        if self.job_store is not None:
+            partition = self.job_store.get_model(workspace, model_id)
+            # the model id (branch and prefix) is reused by the next job on the branch
+            if partition is not None and partition.output.commit == commit_id:
+                return partition
+
+        jobs = self.client.get_jobs(f"{MODEL_REPO_PREFIX}-{workspace}", limit=1,
+                                    keep=lambda job: job.output_commit.id == commit_id)
+        if not jobs:
+            raise ModelNotFoundError(model_id)
+        job = jobs[0]
+
+        if self.job_store is not None and JOB_STATE[job.state] in self.FINISHED_JOB_STATES:
+            # materializes the job, which indexes its models
+            self.get_training_page(workspace, job.job.id, limit=0)
+            partition = self.job_store.get_model(workspace, model_id)
+            if partition is not None and partition.output.commit == commit_id:
+                return partition
+
+        # only the partition of the model is resolved
+        info = self.client.get_job_info(job.job.id)
+        entries, _ = self.__list_partitions(info)
+        model_prefix = model_id.split(":")[-1]
+        partitions = self.__resolve_partitions(workspace, info,
+                                               [entry for entry in entries if entry[1] == model_prefix])
+        return next(filter(lambda p: os.path.split(p.output.path)[-1] == model_id, partitions))
 
     def get_model_info(self, workspace: str, model_id: str):
         app.logger.debug("@%s: get model %s description in workspace %s", JobService.__name__, model_id, workspace)
@@ -346,48 +566,60 @@ class JobService:
             created_at=str(dt.datetime.fromtimestamp(info.finished.seconds))
         )
 
-    def recover_list_datum(self, job_id: str):
-        app.logger.debug("@%s: recover list datum %s", JobService.__name__, job_id)
-
-        return recover(lambda: self.client.list_datum(job_id), [UnfinishedCommitError], lambda: [])
-
-    def list_training_jobs(self, workspace: str):
+    def list_training_jobs(self, workspace: str, limit=None, since=None, state=None):
         app.logger.debug("@%s: list training jobs in workspace %s", JobService.__name__, workspace)
-        return self.__list_jobs(f"{TRAIN_PIPELINE_PREFIX}-{workspace}", training=True)
+        return self.__list_jobs(f"{TRAIN_PIPELINE_PREFIX}-{workspace}", training=True, limit=limit, since=since,
+                                state=state)
 
     def list_build_serve_jobs(self, workspace: str):
         app.logger.debug("@%s: list build serve jobs in workspace %s", JobService.__name__, workspace)
         return self.__list_jobs(f"{BUILD_SERVE_PIPELINE_PREFIX}-{workspace}")
 
-    def list_build_train_jobs(self, workspace: str):
+    def list_build_train_jobs(self, workspace: str, limit=None, since=None, state=None):
         app.logger.debug("@%s: list build train jobs in workspace %s", JobService.__name__, workspace)
-        return self.__list_jobs(f"{BUILD_TRAIN_PIPELINE_PREFIX}-{workspace}")
+        return self.__list_jobs(f"{BUILD_TRAIN_PIPELINE_PREFIX}-{workspace}", limit=limit, since=since,
+                                state=state)
 
-    def list_ingestion_jobs(self, workspace: str):
+    def list_ingestion_jobs(self, workspace: str, limit=None, since=None, state=None):
         app.logger.debug("@%s: list ingestion jobs in workspace %s", JobService.__name__, workspace)
-        return self.__list_jobs(f"{INGESTION_PIPELINE_PREFIX}-{workspace}")
+        return self.__list_jobs(f"{INGESTION_PIPELINE_PREFIX}-{workspace}", limit=limit, since=since,
+                                state=state)
+
+    def __list_jobs(self, pipeline_name: str, training=False, limit=None, since=None, state=None) \
+            -> List[SubmissionInfo]:
+        """
+        Lists the jobs of a pipeline that were not completely skipped, the most recently finished first.
+
+        Args:
+            pipeline_name (str): pipeline name
+            training (bool): whether to report hyperparameter searches
+            limit (int): maximum number of (most recent) jobs
+            since (float): timestamp of the oldest start of the jobs
+            state (str): state of the jobs (as in `JOB_STATE`)
 
-    def __list_jobs(self, pipeline_name: str, training=False) -> List[SubmissionInfo]:
+        Returns:
+            <list of the SubmissionInfo of the jobs>
+
+        """
         result = []
         if not self.client.check_pipeline_exists(pipeline_name):
             raise PipelineNotFoundError(pipeline_name)
         else:
-            # get all jobs from client (by workspace)
-            jobs = self.client.get_jobs(pipeline_name=pipeline_name)
-
             # filter jobs that were not COMPLETELY skipped
-            jobs = list(filter(lambda x: x.data_skipped != x.data_total, jobs))
+            def keep(job):
+                return job.data_skipped != job.data_total and (state is None or JOB_STATE[job.state] == state)
+
+            # get all jobs from client (by workspace)
+            if limit is None and since is None and state is None:
+                jobs = list(filter(keep, self.client.get_jobs(pipeline_name=pipeline_name)))
+            else:
+                jobs = self.client.get_jobs(pipeline_name=pipeline_name, limit=limit, since=since, keep=keep)
 
             # sort based on creation
             jobs.sort(key=lambda x: x.finished.seconds, reverse=True)
 
             # iterate through jobs
             for job in jobs:
-                # FIXME -> error if datums do NOT have a valid output commit!!!
-                # only use "processed" datums
-                datums = self.recover_list_datum(job.job.id)
-                datums = list(filter(lambda x: x.datum_info.state == 1, datums))
-                n_datums = len(datums)
                 total_seen = job.data_failed + job.data_processed + job.data_skipped
                 duration = job.finished.seconds - job.started.seconds
                 job_desc = SubmissionInfo(
@@ -400,7 +632,8 @@ class JobService:
                 )
 
                 if training:
-                    job_desc.hyperopt = str(n_datums > 1) if duration >= 0 else "?"
+                    # "processed" datums are counted in the stats of the job (no need to list them)
+                    job_desc.hyperopt = str(job.data_processed > 1) if duration >= 0 else "?"
 
                 # save job overview
                 result.append(job_desc)
@@ -410,8 +643,10 @@ class JobService:
     def list_notebooks(self, workspace: str):
         app.logger.debug("@%s: list notebooks in %s", JobService.__name__, workspace)
 
-        pipelines = [p for p in self.client.list_pipelines() if p.startswith(f"{NOTEBOOK_PIPELINE_PREFIX}-{workspace}")]
-        return [self.get_notebook_info(pipeline) for pipeline in pipelines]
+        # the listing holds the whole info of each pipeline (no need to inspect them)
+        infos = [info for info in self.client.list_pipeline_infos()
+                 if info.pipeline.name.startswith(f"{NOTEBOOK_PIPELINE_PREFIX}-{workspace}")]
+        return [self.get_notebook_info(info.pipeline.name, info=info) for info in infos]
 
     def list_building_notebooks(self, workspace: str):
         app.logger.debug("@%s: list building notebooks in workspace %s",
@@ -619,14 +854,19 @@ class JobService:
                 param_bytes = bytes(json.dumps(params), encoding='utf-8')
                 blobs.append({'path': name, 'blob': param_bytes})
 
-            self.client.put_blobs(repo, blobs, desc=desc)
+            def progress(done: int, total: int):
+                app.logger.info("@%s: submitted %d/%d hyperparameter files in workspace %s", JobService.__name__,
+                                done, total, workspace)
+
+            self.client.put_blobs(repo, blobs, desc=desc, progress=progress)
 
     def list_endpoints(self, workspace: str):
         app.logger.debug("@%s: list endpoint in workspace %s", JobService.__name__, workspace)
 
-        names = self.client.list_pipelines()
-        pipelines = filter(build_serve_regex(workspace).match, names)
-        return [self.get_service_pipeline_info(workspace, pipeline) for pipeline in pipelines]
+        # the listing holds the whole info of each pipeline (provenance is only resolved per endpoint, on demand)
+        regex = build_serve_regex(workspace)
+        infos = [info for info in self.client.list_pipeline_infos() if regex.match(info.pipeline.name)]
+        return [self.get_service_pipeline_info(workspace, info.pipeline.name, info=info) for info in infos]
 
     def list_building_endpoints(self, workspace: str):
         app.logger.debug("@%s: list building endpoints in workspace %s",
@@ -635,18 +875,10 @@ class JobService:
 
     def check_duplicate_bundle(self, repo: str, path: str):
         app.logger.debug("@%s: checking duplicate bundle [%s] in %s", JobService.__name__, path, repo)
-        try:
-            if self.list_objects(repo=repo, path=path):
-                app.logger.debug("@%s: duplicate bundle found [%s]", JobService.__name__, path)
-                return True
-        except json.decoder.JSONDecodeError:
-            pass
-
-    def list_objects(self, repo: str, commit: str = "master", path: str = "/"):
-        app.logger.debug("@%s: list objects in repository %s by commit %s", JobService.__name__, repo, commit)
-        obj_list = self.client.list_file(f"{repo}/{commit}", path=path, history=-1)
-        return list(filter(lambda x: self.client.inspect_file(f"{repo}/{commit}", x.file.path).size_bytes != 0,
-                           obj_list))
+        if self.client.check_bundle_exists(repo, path):
+            app.logger.debug("@%s: duplicate bundle found [%s]", JobService.__name__, path)
+            return True
+        return False
 
     def delete_endpoint(self, endpoint_name):
         app.logger.debug("@%s: delete endpoint %s", JobService.__name__, endpoint_name)
@@ -663,6 +895,8 @@ class JobService:
 
         train_pipeline = f"{TRAIN_PIPELINE_PREFIX}-{workspace}"
 
+        if self.job_store is not None:
+            self.job_store.delete(workspace, job_id)
         return self.client.delete_job(train_pipeline, job_id)
 
     def delete_build_train_job(self, workspace, job_id):
@@ -875,7 +1109,7 @@ class JobService:
 
         # build dynamic output_branch
         output_branch = self.build_output_branch(image_name, data_name, hyper_name)
-        self.client.pfs_client.create_branch(repo_name=pipeline_name, branch_name=output_branch)
+        self.client.create_branch(pipeline_name, output_branch)
 
         data_input = proto.Input(pfs=proto.PFSInput(glob=f"/{data_name}",
                                                     repo=data_repo,
@@ -931,7 +1165,7 @@ class JobService:
             app.logger.debug(pipeline_def["output_branch"])
 
             if not self.client.check_branch_exists(repo=pipeline_name, branch=pipeline_def["output_branch"]):
-                self.client.pfs_client.create_branch(repo_name=pipeline_name, branch_name=pipeline_def["output_branch"])
+                self.client.create_branch(pipeline_name, pipeline_def["output_branch"])
 
             # format according to create_pipeline
             data_input = proto.Input(pfs=proto.PFSInput(glob=pipeline_def["data_glob"],
@@ -1079,16 +1313,79 @@ timeout_ms: {ambassador_timeout}
             f"{INGESTION_PIPELINE_PREFIX}-{workspace}"
         ]
 
-    def init_workspace_repos(self, workspace: str, user: str):
-        app.logger.debug("@%s: init workspace repos in %s", JobService.__name__, workspace)
+    def plan_provisioning(self, workspaces: dict):
+        """
+        Plans the creation of every missing resource of the workspaces, from a single listing of the repos and
+        pipelines: repos (with their master branch, and the dummy notebook data of a new notebook data repo) are
+        created before the build pipelines consuming (or writing to) them. The master branch of an existing repo is
+        created if missing.
+
+        Args:
+            workspaces (dict): user of each workspace (by name)
 
-        repo_names = JobService.__build_repo_names(workspace)
+        Returns:
+            <ResourcePlan>
 
-        repos = zip(repo_names,
-                    [build_resource_meta(workspace, user)] * len(repo_names))
+        """
+        app.logger.debug("@%s: plan provisioning of %d workspaces", JobService.__name__, len(workspaces))
 
-        for (repo, desc) in repos:
-            self.client.create_repo(repo, desc=desc)
+        repos = set(self.client.list_repos())
+        pipelines = set(self.client.list_pipelines())
+
+        # existing repos may lack their master branch (e.g. an earlier provisioning failed in between)
+        existing = [repo for workspace in workspaces for repo in JobService.__build_repo_names(workspace)
+                    if repo in repos]
+        masterless = {repo for repo, exists in zip(existing, self.fan_out(
+            "check_branch_exists", [(repo, "master") for repo in existing])) if not exists}
+
+        plan = ResourcePlan("created")
+        for workspace, user in workspaces.items():
+            desc = build_resource_meta(workspace, user)
+            for repo in JobService.__build_repo_names(workspace):
+                if repo not in repos:
+                    plan.add("repo", repo, functools.partial(self.client.init_repo, repo, desc=desc))
+                elif repo in masterless:
+                    plan.add("branch", repo, functools.partial(self.client.create_branch, repo, "master"))
+
+            notebook_data_repo = f"{NOTEBOOK_DATA_REPO_PREFIX}-{workspace}"
+            if notebook_data_repo not in repos:
+                plan.add("data", notebook_data_repo, functools.partial(self.init_notebook_data, workspace, user),
+                         after=[("repo", notebook_data_repo)])
+
+            for define, pipeline, source_repo in (
+                    (self.define_build_train_pipeline, f"{BUILD_TRAIN_PIPELINE_PREFIX}-{workspace}",
+                     f"{TRAIN_SOURCE_REPO_PREFIX}-{workspace}"),
+                    (self.define_build_serve_pipeline, f"{BUILD_SERVE_PIPELINE_PREFIX}-{workspace}",
+                     f"{SERVE_SOURCE_REPO_PREFIX}-{workspace}"),
+                    (self.define_build_notebook_pipeline, f"{BUILD_NOTEBOOK_PIPELINE_PREFIX}-{workspace}",
+                     f"{NOTEBOOK_SOURCE_REPO_PREFIX}-{workspace}")):
+                if pipeline not in pipelines:
+                    # the output repo of a build pipeline is one of the workspace repos (docker images)
+                    plan.add("pipeline", pipeline, functools.partial(define, workspace, user),
+                             after=[("repo", source_repo), ("repo", pipeline), ("branch", source_repo),
+                                    ("branch", pipeline)])
+        return plan
+
+    def provision_workspaces(self, workspaces: dict):
+        """
+        Creates every missing resource of the workspaces (see `plan_provisioning`), concurrently.
+
+        Args:
+            workspaces (dict): user of each workspace (by name)
+
+        Returns:
+            <PlanReport as dict>
+
+        Raises:
+            ProvisioningError: if any resource could not be created
+
+        """
+        app.logger.debug("@%s: provision workspaces %s", JobService.__name__, list(workspaces))
+
+        report = self.plan_provisioning(workspaces).run(PLAN_CONCURRENCY)
+        if report.failed:
+            raise ProvisioningError(report)
+        return report.to_dict()
 
     def init_notebook_data(self, workspace: str, user: str):
         app.logger.debug("@%s: adding DUMMY notebook-data on %s", JobService.__name__, workspace)
@@ -1146,18 +1443,70 @@ timeout_ms: {ambassador_timeout}
             repos=repos
         )
 
+    def plan_teardown(self, workspaces: list):
+        """
+        Plans the deletion of every resource of the workspaces: pipelines are deleted before the pipelines whose
+        output they consume, and repos once no pipeline consumes them (docker repos do not depend on anything).
+
+        Args:
+            workspaces (list): names of the workspaces
+
+        Returns:
+            <ResourcePlan>
+
+        """
+        app.logger.debug("@%s: plan teardown of %d workspaces", JobService.__name__, len(workspaces))
+
+        repos = self.client.list_repos()
+        inputs = self.client.list_pipeline_inputs()
+        consumers = {}
+        for pipeline, input_repos in inputs.items():
+            for repo in input_repos:
+                consumers.setdefault(repo, []).append(("pipeline", pipeline))
+
+        # a single client for every docker repo (deleted concurrently)
+        ecr = get_ecr_client()
+
+        plan = ResourcePlan("deleted")
+        for workspace in workspaces:
+            for prefix in (NOTEBOOK_IMAGE_REPO_PREFIX, TRAIN_IMAGE_REPO_PREFIX, SERVE_IMAGE_REPO_PREFIX):
+                docker_repo = f"{prefix}-{workspace}"
+                plan.add("docker", docker_repo, functools.partial(delete_docker_repo, docker_repo, ecr=ecr))
+            for pipeline in [pipeline for pipeline in inputs if workspace in pipeline]:
+                plan.add("pipeline", pipeline, functools.partial(self.client.delete_pipeline, pipeline_name=pipeline),
+                         after=consumers.get(pipeline, ()))
+            for repo in [repo for repo in repos if workspace in repo]:
+                # the output repo of a pipeline goes with it
+                after = consumers.get(repo, []) + ([("pipeline", repo)] if repo in inputs else [])
+                plan.add("repo", repo, functools.partial(self.client.delete_repo, repo), after=after)
+        return plan
+
+    def kill_workspaces(self, workspaces: list):
+        """
+        Deletes every resource of the workspaces (see `plan_teardown`), concurrently.
+
+        Args:
+            workspaces (list): names of the workspaces
+
+        Returns:
+            <PlanReport>
+
+        """
+        app.logger.debug("@%s: kill workspaces %s", JobService.__name__, workspaces)
+        report = self.plan_teardown(workspaces).run(PLAN_CONCURRENCY)
+        # stored jobs would outlive the workspace (and show in a workspace created with the same name)
+        if self.job_store is not None:
+            for workspace in workspaces:
+                self.job_store.delete(workspace)
+        return report
+
     def kill_workspace(self, workspace):
         app.logger.debug("@%s: kill workspace %s", JobService.__name__, workspace)
 
-        delete_docker_repo(f"{NOTEBOOK_IMAGE_REPO_PREFIX}-{workspace}")
-        delete_docker_repo(f"{TRAIN_IMAGE_REPO_PREFIX}-{workspace}")
-        delete_docker_repo(f"{SERVE_IMAGE_REPO_PREFIX}-{workspace}")
-
-        workspace_info = self.get_workspace(workspace)
-        for repo in workspace_info.repos:
-            self.client.delete_repo(repo)
-        for pipeline in workspace_info.pipelines:
-            self.client.delete_pipeline(pipeline_name=pipeline)
+        report = self.kill_workspaces([workspace])
+        if report.failed:
+            raise TeardownError(report)
+        return report.to_dict()
 
     def __get_logs(self, pipeline_name: str, job_id=None):
         app.logger.debug("@%s: get logs by pipeline %s or job %s", JobService.__name__, pipeline_name, job_id)
@@ -1200,6 +1549,70 @@ timeout_ms: {ambassador_timeout}
         app.logger.debug("@%s: get inference logs by endpoint %s", JobService.__name__, endpoint_name)
         return self.__get_logs(endpoint_name)
 
+    def __stream_logs(self, pipeline_name: str, job_id=None, datum_id=None, follow=False, since=None, tail=None):
+        """
+        Streams the logs of a pipeline (or of one of its jobs) as they are read, instead of joining them: the logs of
+        a running job are its own (not those of the whole pipeline), and `follow` keeps streaming new messages.
+
+        Args:
+            pipeline_name (str): pipeline name
+            job_id (str): job id (all jobs if None)
+            datum_id (str): datum id (of the job, all datums if None)
+            follow (bool): keep streaming new messages
+            since (float): timestamp of the oldest message
+            tail (int): number of most recent messages (per worker) to start from (all if None)
+
+        Returns:
+            <generator of {"ts", "job_id", "datum_id", "worker_id", "message"}> (ending with {"error"} if the stream
+            fails once started)
+
+        Raises:
+            PipelineNotFoundError: if the pipeline does not exist (checked before streaming)
+            JobNotFoundError: if the job does not exist (checked before streaming)
+
+        """
+        app.logger.debug("@%s: stream logs by pipeline %s or job %s", JobService.__name__, pipeline_name, job_id)
+
+        if not self.client.check_pipeline_exists(pipeline_name):
+            raise PipelineNotFoundError(pipeline_name)
+        if job_id and not self.client.check_job_exists(pipeline_name, job_id):
+            raise JobNotFoundError(job_id)
+
+        messages = self.client.stream_logs(pipeline_name, job_id=job_id, datum_id=datum_id, follow=follow,
+                                           tail=tail or 0)
+
+        def records():
+            try:
+                for message in messages:
+                    # GetLogs cannot filter by time: filtered while streaming
+                    if since is not None and message.ts.seconds < since:
+                        continue
+                    yield {"ts": dt.datetime.fromtimestamp(message.ts.seconds).isoformat(sep=" "),
+                           "job_id": message.job_id,
+                           "datum_id": message.datum_id,
+                           "worker_id": message.worker_id,
+                           "message": message.message}
+            except ApplicationError as e:
+                # the response is already streaming -> the error is its last record
+                yield {"error": e.message}
+            finally:
+                messages.close()
+
+        return records()
+
+    def stream_train_logs(self, workspace: str, job_id: str, **filters):
+        app.logger.debug("@%s: stream train logs by job %s in workspace %s", JobService.__name__, job_id, workspace)
+        return self.__stream_logs(f"{TRAIN_PIPELINE_PREFIX}-{workspace}", job_id, **filters)
+
+    def stream_build_train_logs(self, workspace: str, job_id: str, **filters):
+        app.logger.debug("@%s: stream build train logs by job %s in workspace %s", JobService.__name__, job_id,
+                         workspace)
+        return self.__stream_logs(f"{BUILD_TRAIN_PIPELINE_PREFIX}-{workspace}", job_id, **filters)
+
+    def stream_serve_logs(self, endpoint_name, **filters):
+        app.logger.debug("@%s: stream inference logs by endpoint %s", JobService.__name__, endpoint_name)
+        return self.__stream_logs(endpoint_name, **filters)
+
     @staticmethod
     def check_hyperopt(name):
         return name != f"/{EMPTY_HYPER_FILE}"
@@ -1229,9 +1642,10 @@ timeout_ms: {ambassador_timeout}
                             remove_prefix=False)
 
     def get_head_commit(self, path, branch, repo):
-        commits = list(self.client.list_commit(repo,
-                                               to_commit=f"{repo}/{branch}"))
-        return list(filter(lambda x: x.size_bytes != 0, commits))[0].commit.id
+        commit_id = self.client.get_latest_commit(repo, branch)
+        if commit_id is None:
+            raise ModelNotFoundError(f"{branch}:{path}")
+        return commit_id
 
     def download_by_info(self, data_descriptor: DataDescriptor, out_dir: str):
         app.logger.debug("@%s: download by info %s", JobService.__name__, data_descriptor)
@@ -1241,12 +1655,36 @@ timeout_ms: {ambassador_timeout}
                             out_dir=out_dir,
                             remove_prefix=False)
 
+    def get_channel_health(self):
+        return self.client.channel_health()
+
     def destroy_pachyderm_resources(self):
         app.logger.debug("@%s: destroy pachyderm resources", JobService.__name__)
         self.client.delete_all()
-
-    def get_datum_by_job_id(self, workspace, job_id):
-        return self.get_training_info(workspace, job_id).partitions
+        # stored jobs of deleted pipelines would still be served
+        if self.job_store is not None:
+            self.job_store.clear()
+
+    def get_datum_by_job_id(self, workspace, job_id, model_id=None, limit=None):
+        """
+        Resolves the partitions of a training job: only those of `model_id` if given, else at most `limit` of them.
+        """
+        if model_id is None:
+            return self.get_training_page(workspace, job_id, limit=limit)[0].partitions
+
+        self.__check_training_job(workspace, job_id)
+        model_prefix = model_id.split(":")[-1]
+
+        stored = self.job_store.get(workspace, job_id) if self.job_store is not None else None
+        if stored is not None:
+            _, table = stored
+            partitions = self.job_store.get_partitions(workspace, job_id, list(range(len(table))))
+            return [p for p in partitions if p.output.path.split(":")[-1] == model_prefix]
+
+        # only the partitions of the model are resolved
+        info = self.client.get_job_info(job_id)
+        entries, _ = self.__list_partitions(info)
+        return self.__resolve_partitions(workspace, info, [entry for entry in entries if entry[1] == model_prefix])
 
     def check_train_job_exists(self, workspace, job_id):
         train_pipeline = f"{TRAIN_PIPELINE_PREFIX}-{workspace}"
@@ -1,6 +1,9 @@
+import flask
+import grpc
 import pytest
 
-from kaos_backend.util.error_handling import recover
+from kaos_backend.exceptions.exceptions import CommitNotFoundError
+from kaos_backend.util.error_handling import recover, handle_pachyderm_error
 
 
 class MyFancyException(Exception):
@@ -51,3 +54,17 @@ def test_recover_exception_in_recover_f():
 
     with pytest.raises(MyFancierException):
         recover(f, [MyFancyException], recover_f)
+
+
+def test_raise_pachyderm_error_without_debug_string():
+    class OpaqueError(grpc.RpcError):
+        def details(self):
+            return "commit 1234 not found in repo train-ws"
+
+    @handle_pachyderm_error
+    def f():
+        raise OpaqueError()
+
+    with flask.Flask("Test").app_context():
+        with pytest.raises(CommitNotFoundError):
+            f()
@@ -0,0 +1,50 @@
+import flask
+import pytest
+from kaos_backend.exceptions.exceptions import UnfinishedCommitError, PachydermError
+from kaos_backend.services.job_service import JobService
+
+
+class FakeAsyncClient:
+
+    async def list_datum(self, job_id):
+        if job_id == "unfinished":
+            raise UnfinishedCommitError(job_id)
+        if job_id == "broken":
+            raise PachydermError(job_id)
+        return [job_id]
+
+
+def test_fan_out_sync(mocker):
+    client = mocker.Mock()
+    client.list_datum.side_effect = lambda job_id: [job_id]
+    service = JobService(client)
+
+    with flask.Flask("Test").app_context():
+        assert service.fan_out("list_datum", [("a",), ("b",)]) == [["a"], ["b"]]
+
+
+def test_fan_out_async_recovers_errors(mocker):
+    service = JobService(mocker.Mock(), async_client=FakeAsyncClient())
+
+    with flask.Flask("Test").app_context():
+        result = service.fan_out("list_datum", [("a",), ("unfinished",), ("b",)],
+                                 recover_errors=(UnfinishedCommitError,), recover_f=lambda: [])
+        assert result == [["a"], [], ["b"]]
+
+        with pytest.raises(PachydermError):
+            service.fan_out("list_datum", [("a",), ("broken",)], recover_errors=(UnfinishedCommitError,))
+
+
+def test_memoized_fan_out_issues_distinct_calls_once_per_request(mocker):
+    client = mocker.Mock()
+    client.inspect_commit.side_effect = lambda commit: commit.upper()
+    service = JobService(client)
+
+    with flask.Flask("Test").app_context():
+        assert service.memoized_fan_out("inspect_commit", [("a",), ("b",), ("a",)]) == ["A", "B", "A"]
+        assert service.memoized_fan_out("inspect_commit", [("b",), ("c",)]) == ["B", "C"]
+    assert client.inspect_commit.call_args_list == [mocker.call("a"), mocker.call("b"), mocker.call("c")]
+
+    with flask.Flask("Test").app_context():
+        service.memoized_fan_out("inspect_commit", [("a",)])
+    assert client.inspect_commit.call_count == 4
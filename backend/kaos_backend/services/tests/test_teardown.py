@@ -0,0 +1,59 @@
+import flask
+import pytest
+
+from kaos_backend.clients.job_store import JobStore
+from kaos_backend.services.job_service import JobService
+from kaos_backend.util.metric_table import MetricTable
+from kaos_model.common import JobInfo
+
+
+@pytest.fixture()
+def service(mocker, tmpdir):
+    client = mocker.Mock()
+    client.list_repos.return_value = []
+    client.list_pipeline_inputs.return_value = {}
+    return JobService(client, job_store=JobStore(str(tmpdir.join("jobs.sqlite"))))
+
+
+def store_job(service, workspace, job_id):
+    info = JobInfo(job_id=job_id, state="JOB_SUCCESS", available_metrics=[], process_time=1, partitions=[])
+    service.job_store.put(workspace, info, MetricTable.build([]))
+
+
+def test_destroying_resources_clears_the_job_store(service):
+    store_job(service, "ws", "job")
+
+    with flask.Flask("Test").app_context():
+        service.destroy_pachyderm_resources()
+
+    service.client.delete_all.assert_called_once()
+    assert service.job_store.get("ws", "job") is None
+
+
+def test_deleted_jobs_leave_the_job_store(mocker, service):
+    mocker.patch("kaos_backend.services.job_service.delete_docker_repo")
+    for workspace, job_id in (("ws", "job-1"), ("ws", "job-2"), ("other", "job-1")):
+        store_job(service, workspace, job_id)
+
+    with flask.Flask("Test").app_context():
+        service.delete_train_job("ws", "job-1")
+        assert service.job_store.get("ws", "job-1") is None
+        assert service.job_store.get("ws", "job-2") is not None
+
+        service.kill_workspace("ws")
+
+    assert service.job_store.get("ws", "job-2") is None
+    assert service.job_store.get("other", "job-1") is not None
+
+
+def test_teardown_shares_one_ecr_client(mocker, service):
+    mocker.patch("kaos_backend.util.docker.CLOUD_PROVIDER", "AWS")
+    session = mocker.patch("kaos_backend.util.docker.boto3.session.Session")
+    ecr = session.return_value.client.return_value
+
+    with flask.Flask("Test").app_context():
+        report = service.kill_workspaces(["ws-1", "ws-2"])
+
+    assert len(report.done) == 6
+    session.assert_called_once()
+    assert ecr.delete_repository.call_count == 6
@@ -0,0 +1,61 @@
+import flask
+import pytest
+from python_pachyderm.client.pps import pps_pb2 as proto
+
+from kaos_backend.exceptions.exceptions import ModelNotFoundError
+from kaos_backend.services.job_service import JobService
+
+LOSSES = [0.5, 0.1, 0.9, 0.3, 0.7, 0.2]
+
+
+def create_service(mocker, state):
+    client = mocker.Mock()
+    client.check_pipeline_exists.return_value = True
+    client.check_job_exists.return_value = True
+    client.get_job_info.return_value = mocker.Mock(state=state)
+    service = JobService(client)
+
+    entries = [(f"datum-{i}", f"model-{i}") for i in range(len(LOSSES))]
+    mocker.patch.object(service, "_JobService__list_partitions",
+                        return_value=(entries, [{"loss": loss} for loss in LOSSES]))
+    resolve = mocker.patch.object(service, "_JobService__resolve_partitions",
+                                  side_effect=lambda workspace, info, page: [mocker.Mock(entry=e) for e in page])
+    return service, resolve
+
+
+def test_training_page_resolves_only_the_page(mocker):
+    service, resolve = create_service(mocker, proto.JOB_RUNNING)
+
+    with flask.Flask("Test").app_context():
+        job_info, count = service.get_training_page("ws", "job", sort_by="loss", offset=1, limit=2, ascending=True)
+
+    resolve.assert_called_once()
+    assert resolve.call_args[0][2] == [("datum-5", "model-5"), ("datum-3", "model-3")]
+    assert [p.entry for p in job_info.partitions] == resolve.call_args[0][2]
+    assert [p.score for p in job_info.partitions] == ["0.2000", "0.3000"]
+    assert count == len(LOSSES)
+
+
+def test_bundle_datums_resolve_only_the_model(mocker):
+    service, resolve = create_service(mocker, proto.JOB_RUNNING)
+
+    with flask.Flask("Test").app_context():
+        partitions = service.get_datum_by_job_id("ws", "job", model_id="branch:model-4")
+        first = service.get_datum_by_job_id("ws", "job", limit=1)
+
+    assert [p.entry for p in partitions] == [("datum-4", "model-4")]
+    assert len(first) == 1
+    assert [len(call[0][2]) for call in resolve.call_args_list] == [1, 1]
+
+
+def test_model_provenance_skips_models_of_other_commits(mocker):
+    service, _ = create_service(mocker, proto.JOB_SUCCESS)
+    service.job_store = mocker.Mock()
+    # the model id was last materialized by a later job on the same branch
+    service.job_store.get_model.return_value = mocker.Mock(output=mocker.Mock(commit="later"))
+    service.client.get_jobs.return_value = []
+
+    with flask.Flask("Test").app_context(), pytest.raises(ModelNotFoundError):
+        service.get_model_provenance("ws", "earlier", "branch:model-1")
+
+    service.client.get_jobs.assert_called_once()
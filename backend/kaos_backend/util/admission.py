@@ -0,0 +1,105 @@
+import functools
+import time
+
+from flask import current_app, request
+from kaos_backend.constants import ADMISSION_MEMORY_FRACTION, ADMISSION_RETRY_AFTER, ADMISSION_TIMEOUT, WORKERS
+from kaos_backend.exceptions.exceptions import AdmissionTimeoutError
+from kaos_backend.util.budget import MemoryBudget
+from kaos_backend.util.metrics import METRICS
+
+EXTENSION = "kaos_admission"
+
+
+class AdmissionController:
+    """
+    Admits requests holding their body in memory only while the memory they need (their `Content-Length`) can be
+    reserved from a shared budget.
+
+    Requests wait (in no particular order) for the budget to free up, and are rejected once they waited longer than
+    `timeout` seconds. A request without `Content-Length` reserves the whole budget.
+    """
+
+    def __init__(self,
+                 budget: MemoryBudget,
+                 timeout: float = ADMISSION_TIMEOUT,
+                 retry_after: int = ADMISSION_RETRY_AFTER):
+        """
+        AdmissionController constructor.
+
+        Args:
+            budget (MemoryBudget): memory shared by the admitted requests
+            timeout (float): maximum wait (in seconds) for admission
+            retry_after (int): delay (in seconds) suggested to rejected clients
+        """
+        self.budget = budget
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+    @classmethod
+    def for_worker(cls, memory_limit: int, fraction: float = ADMISSION_MEMORY_FRACTION, workers: int = WORKERS):
+        """
+        Admission controller of a single worker process, admitting requests against its share of the memory limit.
+
+        Args:
+            memory_limit (int): memory limit (in bytes) of the backend, shared by its workers
+            fraction (float): share of the memory limit usable by admitted requests
+            workers (int): number of worker processes
+        """
+        return cls(MemoryBudget(memory_limit * fraction / workers))
+
+    def acquire(self, content_length: int, endpoint: str):
+        """
+        Reserves the memory of a request, waiting for it at most `timeout` seconds.
+
+        Returns:
+            <number of bytes reserved, to be passed to `release`>
+
+        Raises:
+            AdmissionTimeoutError: if the memory could not be reserved in time
+
+        """
+        n_bytes = self.budget.capacity if content_length is None else content_length
+
+        METRICS.admission_queued()
+        start = time.perf_counter()
+        reserved = None
+        try:
+            reserved = self.budget.acquire(n_bytes, timeout=self.timeout)
+        finally:
+            METRICS.admission_done(endpoint, time.perf_counter() - start, reserved)
+
+        if reserved is None:
+            raise AdmissionTimeoutError(self.retry_after)
+        return reserved
+
+    def release(self, reserved: int):
+        self.budget.release(reserved)
+        METRICS.admission_released(reserved)
+
+
+def register_admission_control(app, controller: AdmissionController):
+    """
+    Enables the admission of the routes of `app` decorated with `admission_required`
+    """
+    app.extensions[EXTENSION] = controller
+
+
+def admission_required(function):
+    """
+    Reserves the memory of the request body for the duration of the request
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        controller = current_app.extensions.get(EXTENSION)
+        if controller is None:
+            return function(*args, **kwargs)
+
+        rule = request.url_rule
+        reserved = controller.acquire(request.content_length, rule.rule if rule is not None else "<unmatched>")
+        try:
+            return function(*args, **kwargs)
+        finally:
+            controller.release(reserved)
+
+    return wrapper
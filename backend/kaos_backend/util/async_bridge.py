@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import os
+import threading
+
+from flask import current_app
+
+
+async def gather_limited(coros, limit: int):
+    """
+    Awaits coroutines concurrently (at most `limit` at a time) and returns their results in order.
+
+    Args:
+        coros (iterable): coroutines to await
+        limit (int): maximum number of coroutines in flight
+
+    Returns:
+        <list of results, in the order of `coros`>
+
+    """
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*[run(coro) for coro in coros])
+
+
+class AsyncBridge:
+    """
+    Runs coroutines from synchronous code (e.g. Flask handlers) on a background event loop.
+
+    A single loop thread is started lazily per worker process (and re-started after a fork). The loop thread holds the
+    application context of the first caller, so coroutines can log through `current_app`, and each coroutine runs with
+    the context variables of its caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+
+    def _ensure_loop(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._pid != pid:
+                app = current_app._get_current_object()
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+                thread = threading.Thread(target=self._run_loop, args=(loop, app, started),
+                                          name="async-bridge", daemon=True)
+                thread.start()
+                started.wait()
+                self._loop = loop
+                self._pid = pid
+        return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, app, started: threading.Event):
+        # never popped: the context lives as long as the loop thread
+        app.app_context().push()
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+
+    def run(self, coro, timeout: float = None):
+        """
+        Runs a coroutine on the background loop and blocks until it completes.
+
+        Args:
+            coro (coroutine): coroutine to run
+            timeout (float): maximum wait in seconds (blocks indefinitely if None)
+
+        Returns:
+            <result of the coroutine> (its exception is re-raised in the caller)
+
+        """
+        context = contextvars.copy_context()
+        return asyncio.run_coroutine_threadsafe(self._in_context(coro, context), self._ensure_loop()).result(timeout)
+
+    @staticmethod
+    async def _in_context(coro, context: contextvars.Context):
+        # the task owns a copy of the loop's context -> setting variables here only affects this task (and children)
+        for var, value in context.items():
+            var.set(value)
+        return await coro
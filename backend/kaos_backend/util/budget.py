@@ -0,0 +1,48 @@
+import threading
+
+
+class MemoryBudget:
+    """
+    Counting semaphore over bytes, used to bound the amount of data held in memory by concurrent transfers.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        MemoryBudget constructor.
+
+        Args:
+            capacity (int): number of bytes that can be reserved at the same time
+        """
+        self.capacity = max(int(capacity), 1)
+        self.available = self.capacity
+        self._condition = threading.Condition()
+
+    @property
+    def in_use(self):
+        return self.capacity - self.available
+
+    def acquire(self, n_bytes: int, timeout: float = None):
+        """
+        Reserves `n_bytes`, blocking until enough of the budget is free.
+
+        Requests larger than the capacity are clamped to it, so a single oversized item can always proceed alone.
+
+        Args:
+            n_bytes (int): number of bytes to reserve
+            timeout (float): maximum wait in seconds (blocks indefinitely if None)
+
+        Returns:
+            <number of bytes actually reserved, to be passed to `release`> or None on timeout
+
+        """
+        n_bytes = min(max(int(n_bytes), 0), self.capacity)
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.available >= n_bytes, timeout):
+                return None
+            self.available -= n_bytes
+        return n_bytes
+
+    def release(self, n_bytes: int):
+        with self._condition:
+            self.available = min(self.available + n_bytes, self.capacity)
+            self._condition.notify_all()
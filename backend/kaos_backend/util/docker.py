@@ -16,13 +16,25 @@ def get_login_command():
         return ""
 
 
-def create_docker_repo(repo_name):
+def get_ecr_client():
+    """
+    Creates an ECR client (None if the cloud provider is not AWS).
+
+    The client is created from its own session, since creating clients from the default session is not thread-safe.
+    The client itself can be shared by threads.
+    """
+    if CLOUD_PROVIDER == 'AWS':
+        return boto3.session.Session().client('ecr', region_name=REGION)
+    return None
+
+
+def create_docker_repo(repo_name, ecr=None):
     if CLOUD_PROVIDER == 'AWS':
-        ecr = boto3.client('ecr', region_name=REGION)
+        ecr = ecr or get_ecr_client()
         ecr.create_repository(repositoryName=repo_name)
 
 
-def delete_docker_repo(repo_name):
+def delete_docker_repo(repo_name, ecr=None):
     if CLOUD_PROVIDER == 'AWS':
-        ecr = boto3.client('ecr', region_name=REGION)
+        ecr = ecr or get_ecr_client()
         ecr.delete_repository(repositoryName=repo_name, force=True)
@@ -2,10 +2,11 @@ import json
 import logging
 import re
 
-from grpc._channel import _Rendezvous
+import grpc
 from flask import current_app
 
 from kaos_backend.exceptions.exceptions import UnfinishedCommitError, CommitNotFoundError, PachydermError
+from kaos_backend.util.metrics import METRICS
 
 DESCRIPTION = 'description'
 GRPC_MESSAGE = 'grpc_message'
@@ -26,35 +27,82 @@ def recover(f, err_types, recover_f):
             raise e
 
 
+def parse_grpc_error(e: grpc.RpcError):
+    try:
+        return json.loads(e.debug_error_string())
+    except (AttributeError, ValueError):
+        # e.g. errors surfaced through interceptors or non-JSON debug strings
+        details = e.details() if hasattr(e, 'details') else str(e)
+        return {GRPC_MESSAGE: details, DESCRIPTION: details}
+
+
+def raise_pachyderm_error(e: grpc.RpcError):
+    """
+    Translates a gRPC error raised by Pachyderm into the matching application error
+    """
+    err_desc = parse_grpc_error(e)
+    current_app.logger.error("@handle_pachyderm_error: %s", str(err_desc))
+
+    grpc_message = err_desc.get(GRPC_MESSAGE, None)
+    current_app.logger.error("@handle_pachyderm_error: %s", grpc_message)
+
+    if grpc_message:
+        match = UNFINISHED_COMMIT_RE.match(grpc_message)
+        if match:
+            raise UnfinishedCommitError(match[0]) from e
+
+        match = COMMIT_NOT_FOUND_RE.findall(grpc_message)
+        if match:
+            raise CommitNotFoundError(match[0]) from e
+
+    description_message = err_desc.get(DESCRIPTION, None)
+    current_app.logger.error("@handle_pachyderm_error: %s", description_message)
+
+    if description_message:
+        if COULD_NOT_CONNECT_RE.match(description_message):
+            raise PachydermError(description_message) from e
+
+    raise PachydermError(str(e)) from e
+
+
 def handle_pachyderm_error(f):
+    """
+    Translates gRPC errors into application errors and records the latency (and errors) of each call
+    """
+    def wrapper(*args, **kwargs):
+        with METRICS.operation(f.__qualname__):
+            try:
+                a = f(*args, **kwargs)
+                return a
+            except grpc.RpcError as e:
+                raise_pachyderm_error(e)
+
+    return wrapper
+
+
+def handle_pachyderm_stream_error(f):
+    """
+    Same as `handle_pachyderm_error` for generator functions (errors are raised while iterating)
+    """
     def wrapper(*args, **kwargs):
-        try:
-            a = f(*args, **kwargs)
-            return a
-        except _Rendezvous as e:
-            print(e.debug_error_string())
-            err_desc = json.loads(e.debug_error_string())
-            current_app.logger.error("@handle_pachyderm_error: %s", str(err_desc))
-
-            grpc_message = err_desc.get(GRPC_MESSAGE, None)
-            current_app.logger.error("@handle_pachyderm_error: %s", grpc_message)
-
-            if grpc_message:
-                match = UNFINISHED_COMMIT_RE.match(grpc_message)
-                if match:
-                    raise UnfinishedCommitError(match[0]) from e
-
-                match = COMMIT_NOT_FOUND_RE.findall(grpc_message)
-                if match:
-                    raise CommitNotFoundError(match[0]) from e
-
-            description_message = err_desc.get(DESCRIPTION, None)
-            current_app.logger.error("@handle_pachyderm_error: %s", description_message)
-
-            if description_message:
-                if COULD_NOT_CONNECT_RE.match(description_message):
-                    raise PachydermError(description_message) from e
-
-            raise PachydermError(str(e)) from e
+        with METRICS.operation(f.__qualname__):
+            try:
+                yield from f(*args, **kwargs)
+            except grpc.RpcError as e:
+                raise_pachyderm_error(e)
+
+    return wrapper
+
+
+def handle_pachyderm_async_error(f):
+    """
+    Same as `handle_pachyderm_error` for coroutine functions
+    """
+    async def wrapper(*args, **kwargs):
+        with METRICS.operation(f.__qualname__):
+            try:
+                return await f(*args, **kwargs)
+            except grpc.RpcError as e:
+                raise_pachyderm_error(e)
 
     return wrapper
@@ -1,6 +1,11 @@
 import functools
-from flask import jsonify as flask_jsonify
+import json
+import threading
 
+from flask import Response as FlaskResponse, jsonify as flask_jsonify, stream_with_context
+
+from kaos_backend.constants import FOLLOW_RETRY_AFTER, FOLLOW_STREAMS
+from kaos_backend.exceptions.exceptions import StreamLimitError
 from kaos_model.api import Response, PagedResponse, Error
 
 
@@ -13,3 +18,54 @@ def jsonify(f):
             obj = obj.to_dict()
         return flask_jsonify(obj)
     return wrapped
+
+
+# streams records (one JSON document per line) as they are produced
+def ndjson(records):
+    return FlaskResponse(stream_with_context(json.dumps(record) + "\n" for record in records),
+                         mimetype="application/x-ndjson")
+
+
+# case-insensitive boolean query argument (e.g. ?follow=true)
+def boolean(value):
+    return value.lower() == "true"
+
+
+class StreamSlots:
+    """
+    Bounds the number of concurrent streams that last until the client disconnects (e.g. followed logs), since each
+    holds a worker thread for its whole duration. Streams beyond the bound are rejected rather than queued.
+    """
+
+    def __init__(self, size: int = FOLLOW_STREAMS, retry_after: int = FOLLOW_RETRY_AFTER):
+        """
+        StreamSlots constructor.
+
+        Args:
+            size (int): maximum number of concurrent streams
+            retry_after (int): delay (in seconds) suggested to rejected clients
+        """
+        self._semaphore = threading.BoundedSemaphore(size)
+        self.retry_after = retry_after
+
+    def ndjson(self, records_f):
+        """
+        Streams the records produced by `records_f()` (see `ndjson`) in a slot, released once the response is closed.
+
+        Raises:
+            StreamLimitError: if every slot is taken
+
+        """
+        if not self._semaphore.acquire(blocking=False):
+            raise StreamLimitError(self.retry_after)
+        try:
+            response = ndjson(records_f())
+        except BaseException:
+            self._semaphore.release()
+            raise
+        response.call_on_close(self._semaphore.release)
+        return response
+
+
+# followed log streams of the worker
+FOLLOWED_STREAMS = StreamSlots()
@@ -1,5 +1,7 @@
+import contextvars
 import hashlib
 import math
+import mmap
 import os
 import uuid
 import zipfile
@@ -47,6 +49,32 @@ def build_hash(data_bytes: str):
     return fix_string_length(hash_sha512.hexdigest())
 
 
+def iter_file_chunks(path: str, chunk_size: int):
+    """
+    Lazily reads a file as a sequence of fixed-size chunks (memory-mapped where possible)
+
+    Args:
+        path: file to read
+        chunk_size: maximum size of each chunk in bytes
+
+    Returns:
+        <generator of bytes chunks>
+
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # empty or non-mappable file -> plain buffered reads
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+            return
+
+        with mapped:
+            for offset in range(0, len(mapped), chunk_size):
+                yield mapped[offset:offset + chunk_size]
+
+
 def product_dict(**kwargs):
     """
     Helper for determining hyperparams with product of dictionary keys/values
@@ -171,12 +199,25 @@ def zip_dir(path, zip_h):
             zip_h.write(abs_name, arc_name)
 
 
+def is_process_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, owned by another user
+        pass
+    return True
+
+
 def copy_current_app_context(f):
     from flask.globals import _app_ctx_stack
     appctx = _app_ctx_stack.top
+    # context variables (e.g. request metrics) follow the work into the executor thread
+    context = contextvars.copy_context()
 
     def _(*args, **kwargs):
         with appctx:
-            return f(*args, **kwargs)
+            return context.copy().run(f, *args, **kwargs)
 
     return _
@@ -0,0 +1,104 @@
+import heapq
+import json
+
+from kaos_backend.exceptions.exceptions import MetricNotFound
+
+
+class MetricTable:
+    """
+    Metrics of the partitions (models) of a training job, stored by column: one list of values per metric, indexed by
+    partition position (None where a partition does not report the metric).
+
+    Built once per job and shared by every `sort_by`, partitions are selected by heap (only the selected partitions
+    are ordered) instead of sorting all of them.
+    """
+
+    def __init__(self, columns: dict, reported: list):
+        """
+        MetricTable constructor.
+
+        Args:
+            columns (dict): values of each metric (by partition position)
+            reported (list): whether each partition reports metrics at all
+        """
+        self.columns = columns
+        self.reported = reported
+
+    @classmethod
+    def build(cls, metrics: list):
+        """
+        Builds the table of the metrics (dict, or None if not reported) of each partition
+        """
+        columns = {}
+        for position, partition_metrics in enumerate(metrics):
+            for name, value in (partition_metrics or {}).items():
+                columns.setdefault(name, [None] * len(metrics))[position] = value
+        return cls(columns, [partition_metrics is not None for partition_metrics in metrics])
+
+    def __len__(self):
+        return len(self.reported)
+
+    @property
+    def metrics(self):
+        return list(self.columns)
+
+    def to_json(self):
+        return json.dumps({"columns": self.columns, "reported": self.reported})
+
+    @classmethod
+    def from_json(cls, data: str):
+        return cls(**json.loads(data))
+
+    def select(self, sort_by=None, ascending=False, top_k=None, minimum=None, maximum=None, offset=0, limit=None):
+        """
+        Selects partitions, scored by `sort_by` (if any) and ordered by score, partitions that do not report metrics
+        first. With `top_k` or a range (`minimum` and/or `maximum`, inclusive), only the scored partitions selected
+        by them are kept.
+
+        Args:
+            sort_by (str): metric to score (and order) the partitions by
+            ascending (bool): order by increasing score (decreasing otherwise)
+            top_k (int): maximum number of scored partitions
+            minimum (float): minimum score
+            maximum (float): maximum score
+            offset (int): number of partitions to skip
+            limit (int): maximum number of partitions (all if None)
+
+        Returns:
+            <list of the positions of the selected partitions>, <list of their (formatted) scores>,
+            <total number of partitions matching the selection>
+
+        Raises:
+            MetricNotFound: if a partition reporting metrics does not report `sort_by`
+
+        """
+        if not sort_by:
+            count = len(self) if top_k is None else min(top_k, len(self))
+            end = count if limit is None else min(count, offset + limit)
+            positions = list(range(offset, end))
+            return positions, [None] * len(positions), count
+
+        column = self.columns.get(sort_by, [None] * len(self))
+        if any(reported and value is None for reported, value in zip(self.reported, column)):
+            raise MetricNotFound(sort_by)
+
+        filtered = top_k is not None or minimum is not None or maximum is not None
+        unscored = [] if filtered else [position for position, reported in enumerate(self.reported) if not reported]
+        scored = [(float(value), position) for position, value in enumerate(column)
+                  if value is not None
+                  and (minimum is None or float(value) >= minimum)
+                  and (maximum is None or float(value) <= maximum)]
+
+        count = len(unscored) + (len(scored) if top_k is None else min(top_k, len(scored)))
+        end = count if limit is None else min(count, offset + limit)
+
+        # only the scored partitions up to the end of the page are ordered (ties in position order)
+        n_ranked = max(end - len(unscored), 0)
+        if ascending:
+            ranked = heapq.nsmallest(n_ranked, scored)
+        else:
+            ranked = heapq.nsmallest(n_ranked, scored, key=lambda item: (-item[0], item[1]))
+
+        selected = ([(position, None) for position in unscored] +
+                    [(position, f"{value:0.4f}") for value, position in ranked])[offset:end]
+        return [position for position, _ in selected], [score for _, score in selected], count
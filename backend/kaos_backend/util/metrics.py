@@ -0,0 +1,354 @@
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import request
+
+from kaos_backend.util.helpers import is_process_alive
+
+# seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# gRPC calls issued while serving a single HTTP request
+RPC_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """
+    Cumulative histogram (Prometheus semantics: a bucket counts every observation lower or equal to its bound).
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        # counts are kept per bucket and accumulated when rendering
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield float("inf"), self.count
+
+
+class RequestStats:
+    """
+    Calls issued on behalf of the current HTTP request (shared by the threads and tasks working on it).
+    """
+
+    def __init__(self):
+        self.rpcs = 0
+        self.operations = 0
+        self._lock = threading.Lock()
+
+    def add(self, rpcs=0, operations=0):
+        with self._lock:
+            self.rpcs += rpcs
+            self.operations += operations
+
+
+# context variables are copied into executor threads and bridged coroutines (see `copy_current_app_context`)
+current_request_stats = contextvars.ContextVar("current_request_stats", default=None)
+
+
+class PachydermMetrics:
+    """
+    Process-wide registry of Pachyderm call metrics, rendered in the Prometheus text format.
+
+    Tracks the latency and errors of each `PachydermClient` operation, the count and payload bytes of each gRPC
+    method, and the number of gRPC calls per HTTP endpoint.
+
+    Once shared (see `share`), every process publishes its metrics to a common directory and `render` aggregates
+    the metrics of all of them, so counters stay monotonic whichever worker serves the scrape.
+    """
+
+    COUNTERS = ("operation_errors", "rpcs", "sent_bytes", "received_bytes", "admission_rejections")
+    HISTOGRAMS = ("operation_seconds", "request_rpcs", "admission_wait_seconds")
+    GAUGES = ("admission_waiting", "admission_reserved_bytes")
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, rpc_count_buckets=RPC_COUNT_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.rpc_count_buckets = rpc_count_buckets
+        self.directory = None
+        self.flush_interval = 0
+        self._flushed_at = 0
+        self._lock = threading.Lock()
+        # publications run from request teardowns and scrapes (of any thread), one at a time
+        self._flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operation_seconds = {}
+            self.operation_errors = {}
+            self.rpcs = {}
+            self.sent_bytes = {}
+            self.received_bytes = {}
+            self.request_rpcs = {}
+            self.admission_waiting = 0
+            self.admission_reserved_bytes = 0
+            self.admission_wait_seconds = {}
+            self.admission_rejections = {}
+
+    @contextmanager
+    def operation(self, name: str):
+        """
+        Times a client operation, counting the error it raises (if any).
+        """
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add(operations=1)
+
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                key = (name, type(e).__name__)
+                self.operation_errors[key] = self.operation_errors.get(key, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                if name not in self.operation_seconds:
+                    self.operation_seconds[name] = Histogram(self.latency_buckets)
+                self.operation_seconds[name].observe(elapsed)
+
+    def record_rpc(self, method: str, sent_bytes: int = 0):
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add(rpcs=1)
+
+        key = (method,)
+        with self._lock:
+            self.rpcs[key] = self.rpcs.get(key, 0) + 1
+            self.sent_bytes[key] = self.sent_bytes.get(key, 0) + sent_bytes
+
+    def record_bytes(self, method: str, sent_bytes: int = 0, received_bytes: int = 0):
+        key = (method,)
+        with self._lock:
+            self.sent_bytes[key] = self.sent_bytes.get(key, 0) + sent_bytes
+            self.received_bytes[key] = self.received_bytes.get(key, 0) + received_bytes
+
+    def begin_request(self):
+        stats = RequestStats()
+        current_request_stats.set(stats)
+        return stats
+
+    def end_request(self, endpoint: str):
+        stats = current_request_stats.get()
+        if stats is None:
+            return None
+        current_request_stats.set(None)
+
+        with self._lock:
+            if endpoint not in self.request_rpcs:
+                self.request_rpcs[endpoint] = Histogram(self.rpc_count_buckets)
+            self.request_rpcs[endpoint].observe(stats.rpcs)
+
+        if self.directory is not None:
+            self.flush(self.flush_interval)
+        return stats
+
+    def admission_queued(self):
+        with self._lock:
+            self.admission_waiting += 1
+
+    def admission_done(self, endpoint: str, waited: float, reserved: int = None):
+        """
+        Records the end of the wait of a request for admission (`reserved` is None if it timed out).
+        """
+        with self._lock:
+            self.admission_waiting -= 1
+            if endpoint not in self.admission_wait_seconds:
+                self.admission_wait_seconds[endpoint] = Histogram(self.latency_buckets)
+            self.admission_wait_seconds[endpoint].observe(waited)
+            if reserved is None:
+                key = (endpoint,)
+                self.admission_rejections[key] = self.admission_rejections.get(key, 0) + 1
+            else:
+                self.admission_reserved_bytes += reserved
+
+    def admission_released(self, reserved: int):
+        with self._lock:
+            self.admission_reserved_bytes -= reserved
+
+    def share(self, directory: str, flush_interval: float):
+        """
+        Publishes the metrics of this process under `directory`, shared by the processes to aggregate.
+
+        Args:
+            directory (str): directory holding one file per process
+            flush_interval (float): minimum time (in seconds) between two publications at the end of a request
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_interval = flush_interval
+
+    def flush(self, min_interval: float = 0):
+        """
+        Publishes the metrics of this process (atomically replacing its previous publication), unless they were
+        published less than `min_interval` seconds ago.
+        """
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with self._flush_lock:
+            now = time.monotonic()
+            if now - self._flushed_at < min_interval:
+                return
+            self._flushed_at = now
+            with self._lock:
+                snapshot = self.snapshot()
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(snapshot, f)
+            os.replace(f"{path}.tmp", path)
+
+    def snapshot(self):
+        counters = {name: [[list(key), value] for key, value in getattr(self, name).items()] for name in self.COUNTERS}
+        histograms = {name: {key: [h.buckets, h.counts, h.count, h.sum] for key, h in getattr(self, name).items()}
+                      for name in self.HISTOGRAMS}
+        gauges = {name: getattr(self, name) for name in self.GAUGES}
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def merge(self, snapshot: dict, gauges=True):
+        """
+        Adds the metrics of a snapshot (see `snapshot`) to these metrics, leaving the gauges out unless `gauges`.
+        """
+        with self._lock:
+            for name, values in snapshot["counters"].items():
+                counter = getattr(self, name)
+                for key, value in values:
+                    counter[tuple(key)] = counter.get(tuple(key), 0) + value
+            for name, values in snapshot["histograms"].items():
+                histograms = getattr(self, name)
+                for key, (buckets, counts, count, total) in values.items():
+                    histogram = histograms.setdefault(key, Histogram(tuple(buckets)))
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                    histogram.count += count
+                    histogram.sum += total
+            if gauges:
+                for name, value in snapshot["gauges"].items():
+                    setattr(self, name, getattr(self, name) + value)
+
+    def aggregate(self):
+        """
+        Returns the metrics of every process published under the shared directory.
+
+        Counters and histograms of exited processes are kept (so totals never decrease), their gauges are not.
+        """
+        self.flush()
+        metrics = PachydermMetrics(self.latency_buckets, self.rpc_count_buckets)
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                # replaced (or removed) while listing
+                continue
+            metrics.merge(snapshot, gauges=is_process_alive(int(name[:-len(".json")])))
+        return metrics
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format (version 0.0.4), aggregated over the
+        processes sharing the metrics (if shared).
+        """
+        if self.directory is not None:
+            return self.aggregate()._render()
+        return self._render()
+
+    def _render(self):
+        lines = []
+        with self._lock:
+            _render_histogram(lines, "kaos_pachyderm_operation_seconds", "Latency of Pachyderm client operations",
+                              "operation", self.operation_seconds)
+            _render_counter(lines, "kaos_pachyderm_operation_errors_total",
+                            "Errors raised by Pachyderm client operations", ("operation", "error"),
+                            self.operation_errors)
+            _render_counter(lines, "kaos_pachyderm_rpcs_total", "gRPC calls issued to Pachyderm",
+                            ("method",), self.rpcs)
+            _render_counter(lines, "kaos_pachyderm_sent_bytes_total", "Payload bytes sent to Pachyderm",
+                            ("method",), self.sent_bytes)
+            _render_counter(lines, "kaos_pachyderm_received_bytes_total", "Payload bytes received from Pachyderm",
+                            ("method",), self.received_bytes)
+            _render_histogram(lines, "kaos_http_request_pachyderm_rpcs", "gRPC calls issued per HTTP request",
+                              "endpoint", self.request_rpcs)
+            _render_gauge(lines, "kaos_admission_queue_depth", "HTTP requests waiting for memory to be admitted",
+                          self.admission_waiting)
+            _render_gauge(lines, "kaos_admission_reserved_bytes", "Memory reserved by admitted HTTP requests",
+                          self.admission_reserved_bytes)
+            _render_histogram(lines, "kaos_admission_wait_seconds", "Time HTTP requests waited for admission",
+                              "endpoint", self.admission_wait_seconds)
+            _render_counter(lines, "kaos_admission_rejections_total",
+                            "HTTP requests rejected after waiting too long for admission", ("endpoint",),
+                            self.admission_rejections)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple):
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+def _format_bound(bound: float):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _render_counter(lines: list, name: str, help_text: str, label_names: tuple, values: dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key in sorted(values):
+        lines.append(f"{name}{{{_labels(label_names, key)}}} {values[key]}")
+
+
+def _render_gauge(lines: list, name: str, help_text: str, value: float):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name} {value}")
+
+
+def _render_histogram(lines: list, name: str, help_text: str, label_name: str, histograms: dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key in sorted(histograms):
+        histogram = histograms[key]
+        label = _labels((label_name,), (key,))
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label},le="{_format_bound(bound)}"}} {count}')
+        lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+
+METRICS = PachydermMetrics()
+
+
+def register_request_metrics(app):
+    """
+    Counts the Pachyderm calls issued while serving each request of `app`
+    """
+
+    @app.before_request
+    def begin_request():
+        METRICS.begin_request()
+
+    @app.teardown_request
+    def end_request(exc=None):
+        rule = request.url_rule
+        METRICS.end_request(rule.rule if rule is not None else "<unmatched>")
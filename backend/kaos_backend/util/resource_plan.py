@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from flask import current_app as app
+
+from kaos_backend.util.helpers import copy_current_app_context
+
+
+class PlanReport:
+    """
+    Outcome of a plan, per resource (labelled `<kind>/<name>`): done (e.g. created, deleted), failed (with the error)
+    or skipped (not attempted since a resource it waits for failed).
+    """
+
+    def __init__(self, outcome: str):
+        self.outcome = outcome
+        self.done = []
+        self.failed = {}
+        self.skipped = []
+
+    def to_dict(self):
+        return {self.outcome: self.done, "failed": self.failed, "skipped": self.skipped}
+
+
+class ResourcePlan:
+    """
+    Actions on resources (e.g. creations, deletions) where the action on some resources must wait for the action on
+    others (e.g. a repo is deleted once the pipelines consuming it are deleted, and created before them).
+
+    Every action runs as soon as the actions it waits for are done, so independent resources (and whole workspaces)
+    are handled concurrently. A failure does not stop the plan: only the actions waiting for the failed one are
+    skipped.
+    """
+
+    def __init__(self, outcome: str):
+        """
+        ResourcePlan constructor.
+
+        Args:
+            outcome (str): outcome of a successful action, as reported (e.g. created, deleted)
+        """
+        self.outcome = outcome
+        self._actions = {}
+        self._after = {}
+
+    def add(self, kind: str, name: str, action: callable, after=()):
+        """
+        Adds an action on a resource to the plan.
+
+        Args:
+            kind (str): kind of resource (e.g. pipeline, repo)
+            name (str): name of the resource
+            action (callable): acts on the resource
+            after (iterable): (kind, name) of the resources to act on first (ignored if not in the plan)
+
+        """
+        self._actions[(kind, name)] = action
+        self._after.setdefault((kind, name), set()).update(after)
+
+    def __len__(self):
+        return len(self._actions)
+
+    def run(self, concurrency: int):
+        """
+        Runs the actions of the plan, at most `concurrency` at a time.
+
+        Args:
+            concurrency (int): maximum number of concurrent actions
+
+        Returns:
+            <PlanReport>
+
+        """
+        report = PlanReport(self.outcome)
+        waiting = {key: after & self._actions.keys() for key, after in self._after.items()}
+        dependents = {}
+        for key, after in waiting.items():
+            for dependency in after:
+                dependents.setdefault(dependency, []).append(key)
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+
+            def submit_ready():
+                for key in [key for key, after in waiting.items() if not after]:
+                    del waiting[key]
+                    futures[executor.submit(copy_current_app_context(self._actions[key]))] = key
+
+            submit_ready()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures.pop(future)
+                    label = "/".join(key)
+                    error = future.exception()
+                    if error is None:
+                        report.done.append(label)
+                        for dependent in dependents.get(key, ()):
+                            waiting[dependent].discard(key)
+                    else:
+                        report.failed[label] = getattr(error, "message", None) or str(error)
+                        app.logger.warning("@%s: %s failed: %s", ResourcePlan.__name__, label, report.failed[label])
+                    app.logger.info("@%s: %d/%d resources %s or failed (%s)", ResourcePlan.__name__,
+                                    len(report.done) + len(report.failed), len(self), self.outcome, label)
+                submit_ready()
+
+        # whatever still waits depends (possibly indirectly) on a failed resource
+        report.skipped = ["/".join(key) for key in waiting]
+        return report
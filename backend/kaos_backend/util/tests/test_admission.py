@@ -0,0 +1,91 @@
+import json
+import threading
+
+import flask
+import pytest
+from kaos_backend.exceptions.register import register_application_exception
+from kaos_backend.util.admission import AdmissionController, admission_required, register_admission_control
+from kaos_backend.util.budget import MemoryBudget
+from kaos_backend.util.metrics import METRICS
+
+
+@pytest.fixture()
+def admission():
+    METRICS.reset()
+    yield AdmissionController(MemoryBudget(100), timeout=0.05, retry_after=7)
+    METRICS.reset()
+
+
+def create_app(admission, served=None):
+    app = flask.Flask("Test")
+    register_application_exception(app)
+    register_admission_control(app, admission)
+
+    @app.route("/upload", methods=["POST"])
+    @admission_required
+    def upload():
+        if served is not None:
+            served.append(admission.budget.in_use)
+        return "ok"
+
+    return app
+
+
+def test_admission_reserves_content_length(admission):
+    served = []
+    response = create_app(admission, served).test_client().post("/upload", data=b"x" * 40)
+
+    assert response.status_code == 200
+    assert served == [40]
+    assert admission.budget.in_use == 0
+    assert METRICS.admission_reserved_bytes == 0
+    assert METRICS.admission_wait_seconds["/upload"].count == 1
+
+
+def test_admission_rejects_after_timeout(admission):
+    admission.budget.acquire(80)
+
+    response = create_app(admission).test_client().post("/upload", data=b"x" * 40)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert json.loads(response.data)["error_code"] == "SERVICE_OVERLOADED"
+    assert METRICS.admission_rejections == {("/upload",): 1}
+    assert METRICS.admission_waiting == 0
+    assert "kaos_admission_rejections_total{endpoint=\"/upload\"} 1" in METRICS.render()
+
+
+def test_admission_waits_for_memory(admission):
+    admission.timeout = 5
+    reserved = admission.budget.acquire(80)
+    client = create_app(admission).test_client()
+
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(client.post("/upload", data=b"x" * 40)))
+    thread.start()
+    while METRICS.admission_waiting == 0:
+        pass
+    assert "kaos_admission_queue_depth 1" in METRICS.render()
+
+    admission.budget.release(reserved)
+    thread.join()
+
+    assert responses[0].status_code == 200
+    assert METRICS.admission_waiting == 0
+
+
+def test_admission_is_skipped_without_controller():
+    app = flask.Flask("Test")
+
+    @app.route("/upload", methods=["POST"])
+    @admission_required
+    def upload():
+        return "ok"
+
+    assert app.test_client().post("/upload", data=b"x").status_code == 200
+
+
+def test_admission_budget_is_split_between_workers():
+    admission = AdmissionController.for_worker(1000, fraction=0.5, workers=5)
+
+    assert admission.budget.capacity == 100
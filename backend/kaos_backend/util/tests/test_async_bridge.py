@@ -0,0 +1,46 @@
+import asyncio
+
+import flask
+import pytest
+from flask import current_app
+from kaos_backend.util.async_bridge import AsyncBridge, gather_limited
+
+
+def test_gather_limited_keeps_order_and_limit():
+    in_flight = []
+    peak = []
+
+    async def work(i):
+        in_flight.append(i)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01 * (5 - i % 5))
+        in_flight.remove(i)
+        return i
+
+    result = asyncio.get_event_loop().run_until_complete(gather_limited([work(i) for i in range(10)], 3))
+
+    assert result == list(range(10))
+    assert max(peak) == 3
+
+
+def test_bridge_runs_coroutines_with_app_context():
+    async def app_name():
+        await asyncio.sleep(0)
+        return current_app.name
+
+    with flask.Flask("Test").app_context():
+        bridge = AsyncBridge()
+        assert bridge.run(app_name()) == "Test"
+        # the loop is reused
+        loop = bridge._loop
+        assert bridge.run(app_name()) == "Test"
+        assert bridge._loop is loop
+
+
+def test_bridge_raises_coroutine_errors():
+    async def fail():
+        raise ValueError("boom")
+
+    with flask.Flask("Test").app_context():
+        with pytest.raises(ValueError, match="boom"):
+            AsyncBridge().run(fail())
@@ -0,0 +1,41 @@
+import threading
+
+from kaos_backend.util.budget import MemoryBudget
+
+
+def test_budget_acquire_release():
+    budget = MemoryBudget(10)
+
+    assert budget.acquire(4) == 4
+    assert budget.in_use == 4
+    budget.release(4)
+    assert budget.in_use == 0
+
+
+def test_budget_clamps_oversized_request():
+    budget = MemoryBudget(10)
+
+    assert budget.acquire(100) == 10
+    assert budget.available == 0
+
+
+def test_budget_timeout():
+    budget = MemoryBudget(10)
+    budget.acquire(8)
+
+    assert budget.acquire(5, timeout=0.01) is None
+
+
+def test_budget_blocks_until_released():
+    budget = MemoryBudget(10)
+    budget.acquire(10)
+    acquired = []
+
+    t = threading.Thread(target=lambda: acquired.append(budget.acquire(5)))
+    t.start()
+    t.join(0.05)
+    assert acquired == []
+
+    budget.release(10)
+    t.join(1)
+    assert acquired == [5]
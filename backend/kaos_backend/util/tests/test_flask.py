@@ -0,0 +1,49 @@
+import flask
+import pytest
+
+from kaos_backend.exceptions.register import register_application_exception
+from kaos_backend.util.flask import StreamSlots, boolean
+
+
+@pytest.fixture()
+def slots():
+    return StreamSlots(size=1, retry_after=7)
+
+
+@pytest.fixture()
+def client(slots):
+    app = flask.Flask("Test")
+    register_application_exception(app)
+
+    @app.route("/stream")
+    def stream():
+        if flask.request.args.get("missing", default=False, type=boolean):
+            return slots.ndjson(lambda: flask.abort(404))
+        return slots.ndjson(lambda: iter([{"n": 1}, {"n": 2}]))
+
+    return app.test_client()
+
+
+def test_stream_slots_reject_streams_beyond_the_bound(client):
+    first = client.get("/stream", buffered=False)
+    assert first.status_code == 200
+
+    rejected = client.get("/stream")
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "7"
+    assert b"SERVICE_OVERLOADED" in rejected.data
+
+    assert first.get_data() == b'{"n": 1}\n{"n": 2}\n'
+    first.close()
+    assert client.get("/stream").status_code == 200
+
+
+def test_stream_slots_are_released_on_errors(client):
+    assert client.get("/stream?missing=TRUE").status_code == 404
+    assert client.get("/stream").status_code == 200
+
+
+@pytest.mark.parametrize("value, expected", [("True", True), ("true", True), ("TRUE", True), ("False", False),
+                                             ("yes", False)])
+def test_boolean(value, expected):
+    assert boolean(value) is expected
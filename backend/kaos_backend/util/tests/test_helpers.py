@@ -6,7 +6,7 @@ from tempfile import TemporaryDirectory, NamedTemporaryFile
 
 import pytest
 from kaos_backend.exceptions.exceptions import InvalidBundleError
-from kaos_backend.util.helpers import BundleDirectory, NotebookDirectory, TemporaryZipDirectory
+from kaos_backend.util.helpers import BundleDirectory, NotebookDirectory, TemporaryZipDirectory, iter_file_chunks
 from kaos_backend.util.tests import create_zip, create_zip_with_ds_store
 from kaos_backend.util.utility import get_dir_and_files
 
@@ -78,3 +78,16 @@ def test_temporary_zip_directory():
 
     t.cleanup()
     assert not os.path.exists(z.name)
+
+
+def test_iter_file_chunks():
+    with NamedTemporaryFile() as f:
+        f.write(b"0123456789")
+        f.flush()
+
+        assert list(iter_file_chunks(f.name, 4)) == [b"0123", b"4567", b"89"]
+
+
+def test_iter_file_chunks_empty_file():
+    with NamedTemporaryFile() as f:
+        assert list(iter_file_chunks(f.name, 4)) == []
@@ -0,0 +1,52 @@
+import pytest
+
+from kaos_backend.exceptions.exceptions import MetricNotFound
+from kaos_backend.util.metric_table import MetricTable
+
+# as reported by 6 partitions (the second reports no metrics)
+METRICS = [{"accuracy": 0.5, "loss": 2}, None, {"accuracy": 0.75, "loss": 1}, {"accuracy": 0.5, "loss": 3},
+           {"accuracy": 10, "loss": 0.5}, {"accuracy": 0.9, "loss": 1.5}]
+
+
+@pytest.fixture()
+def table():
+    return MetricTable.build(METRICS)
+
+
+def test_metric_table_columns(table):
+    assert table.metrics == ["accuracy", "loss"]
+    assert table.columns["loss"] == [2, None, 1, 3, 0.5, 1.5]
+    assert len(MetricTable.from_json(table.to_json())) == 6
+
+
+def test_metric_table_unsorted_pages(table):
+    assert table.select(offset=2, limit=3) == ([2, 3, 4], [None] * 3, 6)
+    assert table.select(offset=4, limit=10) == ([4, 5], [None] * 2, 6)
+
+
+def test_metric_table_sorts_numerically(table):
+    # unscored partitions first, then by decreasing score (ties in position order)
+    positions, scores, count = table.select(sort_by="accuracy")
+    assert count == 6
+    assert positions == [1, 4, 5, 2, 0, 3]
+    assert scores == [None, "10.0000", "0.9000", "0.7500", "0.5000", "0.5000"]
+
+    assert table.select(sort_by="accuracy", offset=2, limit=2)[0] == [5, 2]
+    assert table.select(sort_by="loss", ascending=True)[0] == [1, 4, 2, 5, 0, 3]
+
+
+def test_metric_table_top_k_and_range(table):
+    assert table.select(sort_by="accuracy", top_k=2) == ([4, 5], ["10.0000", "0.9000"], 2)
+    assert table.select(sort_by="loss", ascending=True, top_k=3, offset=2, limit=10) == ([5], ["1.5000"], 3)
+    assert table.select(sort_by="accuracy", minimum=0.5, maximum=0.9) == ([5, 2, 0, 3],
+                                                                          ["0.9000", "0.7500", "0.5000", "0.5000"], 4)
+    assert table.select(top_k=2) == ([0, 1], [None, None], 2)
+
+
+def test_metric_table_missing_metric():
+    table = MetricTable.build([None, {"accuracy": 0.5}, {"loss": 1}])
+
+    with pytest.raises(MetricNotFound):
+        table.select(sort_by="accuracy")
+    with pytest.raises(MetricNotFound):
+        table.select(sort_by="precision")
@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import flask
+import pytest
+from kaos_backend.util.helpers import copy_current_app_context
+from kaos_backend.util.metrics import Histogram, PachydermMetrics, METRICS, register_request_metrics
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 1, 3, 7, 50):
+        histogram.observe(value)
+
+    assert list(histogram.cumulative()) == [(1, 2), (5, 3), (10, 4), (float("inf"), 5)]
+    assert histogram.sum == 61.5
+
+
+def test_operation_records_latency_and_errors():
+    metrics = PachydermMetrics()
+
+    with metrics.operation("PachydermClient.list_file"):
+        pass
+    with pytest.raises(KeyError):
+        with metrics.operation("PachydermClient.list_file"):
+            raise KeyError()
+
+    assert metrics.operation_seconds["PachydermClient.list_file"].count == 2
+    assert metrics.operation_errors == {("PachydermClient.list_file", "KeyError"): 1}
+
+    text = metrics.render()
+    assert '# TYPE kaos_pachyderm_operation_seconds histogram' in text
+    assert 'kaos_pachyderm_operation_seconds_count{operation="PachydermClient.list_file"} 2' in text
+    assert 'kaos_pachyderm_operation_errors_total{operation="PachydermClient.list_file",error="KeyError"} 1' in text
+
+
+def test_rpcs_are_counted_per_request_across_threads():
+    app = flask.Flask("Test")
+    register_request_metrics(app)
+    executor = ThreadPoolExecutor(4)
+
+    @app.route("/fan-out/<int:n>")
+    def fan_out(n):
+        call = copy_current_app_context(lambda: METRICS.record_rpc("/pfs.API/InspectFile"))
+        for future in [executor.submit(call) for _ in range(n)]:
+            future.result()
+        return "ok"
+
+    METRICS.reset()
+    client = app.test_client()
+    client.get("/fan-out/3")
+    client.get("/fan-out/5")
+
+    histogram = METRICS.request_rpcs["/fan-out/<int:n>"]
+    assert histogram.count == 2
+    assert histogram.sum == 8
+    assert METRICS.rpcs[("/pfs.API/InspectFile",)] == 8
+
+
+def test_shared_metrics_are_aggregated_over_processes(mocker, tmpdir):
+    metrics = PachydermMetrics()
+    metrics.share(str(tmpdir), flush_interval=60)
+
+    # an exited worker: its counters and histograms still count, its gauges do not
+    metrics.record_rpc("/pfs.API/GetFile", sent_bytes=3)
+    metrics.admission_queued()
+    mocker.patch("kaos_backend.util.metrics.os.getpid", return_value=2 ** 22 + 1)
+    metrics.flush()
+    mocker.stopall()
+
+    metrics.reset()
+    metrics.record_rpc("/pfs.API/GetFile", sent_bytes=4)
+    metrics.admission_queued()
+    with metrics.operation("PachydermClient.list_file"):
+        pass
+
+    text = metrics.render()
+    assert 'kaos_pachyderm_rpcs_total{method="/pfs.API/GetFile"} 2' in text
+    assert 'kaos_pachyderm_sent_bytes_total{method="/pfs.API/GetFile"} 7' in text
+    assert 'kaos_pachyderm_operation_seconds_count{operation="PachydermClient.list_file"} 1' in text
+    assert "kaos_admission_queue_depth 1" in text
+    # the worker's own metrics are untouched by the aggregation
+    assert metrics.rpcs == {("/pfs.API/GetFile",): 1}
+
+
+def test_concurrent_flushes_publish_whole_snapshots(tmpdir):
+    metrics = PachydermMetrics()
+    metrics.share(str(tmpdir), flush_interval=0)
+    metrics.record_rpc("/pfs.API/GetFile")
+
+    def flush(i):
+        for _ in range(50):
+            if i % 2:
+                metrics.flush()
+            else:
+                metrics.aggregate()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # raises the first error of a flush (e.g. its temporary file replaced by another thread)
+        list(executor.map(flush, range(8)))
+
+    assert [path.basename for path in tmpdir.listdir()] == [f"{os.getpid()}.json"]
+    assert 'kaos_pachyderm_rpcs_total{method="/pfs.API/GetFile"} 1' in metrics.render()
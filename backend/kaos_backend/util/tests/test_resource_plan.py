@@ -0,0 +1,72 @@
+import threading
+import time
+
+import flask
+import pytest
+from kaos_backend.util.resource_plan import ResourcePlan
+
+
+@pytest.fixture()
+def app_context():
+    with flask.Flask("Test").app_context():
+        yield
+
+
+def recorder(deleted: list, lock: threading.Lock, name: str, error=None):
+    def delete():
+        time.sleep(0.01)
+        if error is not None:
+            raise error
+        with lock:
+            deleted.append(name)
+    return delete
+
+
+def test_plan_waits_for_dependencies(app_context):
+    deleted, lock = [], threading.Lock()
+    plan = ResourcePlan("deleted")
+    plan.add("repo", "data", recorder(deleted, lock, "data"), after=[("pipeline", "train"), ("pipeline", "build")])
+    plan.add("pipeline", "build", recorder(deleted, lock, "build"), after=[("pipeline", "train")])
+    plan.add("pipeline", "train", recorder(deleted, lock, "train"), after=[("pipeline", "elsewhere")])
+    plan.add("docker", "image", recorder(deleted, lock, "image"))
+
+    report = plan.run(concurrency=4)
+
+    assert deleted.index("train") < deleted.index("build") < deleted.index("data")
+    assert sorted(report.done) == ["docker/image", "pipeline/build", "pipeline/train", "repo/data"]
+    assert report.failed == {} and report.skipped == []
+
+
+def test_plan_bounds_concurrency(app_context):
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def delete():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    plan = ResourcePlan("deleted")
+    for i in range(12):
+        plan.add("repo", f"repo-{i}", delete)
+
+    assert len(plan.run(concurrency=3).done) == 12
+    assert 1 < peak[0] <= 3
+
+
+def test_plan_skips_dependents_of_failures(app_context):
+    deleted, lock = [], threading.Lock()
+    plan = ResourcePlan("deleted")
+    plan.add("pipeline", "serve", recorder(deleted, lock, "serve", error=RuntimeError("boom")))
+    plan.add("pipeline", "train", recorder(deleted, lock, "train"), after=[("pipeline", "serve")])
+    plan.add("repo", "data", recorder(deleted, lock, "data"), after=[("pipeline", "train")])
+    plan.add("repo", "other", recorder(deleted, lock, "other"))
+
+    report = plan.run(concurrency=2)
+
+    assert deleted == ["other"]
+    assert report.to_dict() == {"deleted": ["repo/other"], "failed": {"pipeline/serve": "boom"},
+                                "skipped": ["pipeline/train", "repo/data"]}
@@ -1,3 +1,4 @@
+import datetime as dt
 import os
 import re
 
@@ -5,7 +6,7 @@ from flask import request
 from kaos_backend.constants import MAX_CPU, MAX_GPU, MAX_MEMORY
 from kaos_backend.exceptions.exceptions import InvalidBundleError, \
     MemoryRequestError, GPURequestError, CPURequestError, \
-    AuthorizationError
+    AuthorizationError, BadRequestMethodError
 
 SOURCE_URL = "https://kubernetes.io/docs/concepts/configuration/manage-compute-resources-container/#meaning-of-memory"
 
@@ -147,6 +148,25 @@ def validate_gpu_request(gpu):
         raise GPURequestError("GPUs are not enabled")
 
 
+def parse_since(since):
+    """
+    Parses the ISO date of a `since` filter
+
+    Args:
+        since (str): ISO date (e.g. 2019-10-01T12:00:00), or None
+
+    Returns:
+        <timestamp of the date> (None if not set)
+
+    """
+    if since is None:
+        return None
+    try:
+        return dt.datetime.fromisoformat(since).timestamp()
+    except ValueError:
+        raise BadRequestMethodError(f"since must be an ISO date (e.g. 2019-10-01T12:00:00), not {since}")
+
+
 def validate_resources(function):
     """
     Validation of resource requests
@@ -8,7 +8,7 @@ setup(
     version="1.0.0",
     author_email="kaos@ki-labs.com",
     python_requires='>=3.7',
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=requirements,
     include_package_data=True,
     classifiers=[
@@ -210,10 +210,13 @@ def get_bundle(facade: ServeFacade, endpoint, ind, out_dir):
 @click.option('-o', '--out_dir', default=os.getcwd(),
               type=click.Path(exists=True, file_okay=False, dir_okay=True),
               required=False, help='output directory')
+@click.option('-f', '--follow', is_flag=True, help='stream logs as they arrive (until interrupted)')
+@click.option('--since', type=str, help='only logs since (ISO date, e.g. 2019-10-01T12:00:00)', required=False)
+@click.option('--tail', type=int, help='number of most recent lines (per worker)', required=False)
 @health_check
 @workspace_check
 @pass_obj(ServeFacade)
-def get_logs(facade: ServeFacade, endpoint, ind, out_dir):
+def get_logs(facade: ServeFacade, endpoint, ind, out_dir, follow, since, tail):
     """
     Retrieve logs from a running endpoint.
     """
@@ -231,9 +234,14 @@ def get_logs(facade: ServeFacade, endpoint, ind, out_dir):
             click.style("logs", bold=True),
             click.style(endpoint, bold=True, fg='green', dim=True)))
 
-        logs = facade.get_serve_logs(endpoint)
-        click.echo_via_pager(logs)
-        facade.write_serve_logs(endpoint, logs, out_dir)
+        if follow or since or tail is not None:
+            # lines are written as they arrive
+            for line in facade.stream_serve_logs(endpoint, out_dir, follow=follow, since=since, tail=tail):
+                click.echo(line)
+        else:
+            logs = facade.get_serve_logs(endpoint)
+            click.echo_via_pager(logs)
+            facade.write_serve_logs(endpoint, logs, out_dir)
 
     except Exception as e:
         handle_specific_exception(e)
@@ -32,17 +32,21 @@ def train():
 # ==========
 @train.command(name='list',
                short_help='List all training jobs')
+@click.option('-l', '--limit', type=int, help='number of most recent jobs', required=False)
+@click.option('--since', type=str, help='only jobs started since (ISO date, e.g. 2019-10-01)', required=False)
+@click.option('--state', type=click.Choice(['JOB_STARTING', 'JOB_RUNNING', 'JOB_FAILURE', 'JOB_SUCCESS', 'JOB_KILLED',
+                                            'JOB_MERGING']), help='only jobs in state', required=False)
 @health_check
 @workspace_check
 @pass_obj(TrainFacade)
-def list_jobs(facade: TrainFacade):
+def list_jobs(facade: TrainFacade, limit, since, state):
     """
     List all training jobs.
     """
 
     try:
 
-        data = facade.list()['response']
+        data = facade.list(limit=limit, since=since, state=state)['response']
 
         building_table, n_building = render_queued_table(data['building'], header='BUILDING', include_ind=False,
                                                          drop_cols={'hyperopt', 'progress'})
@@ -84,10 +88,14 @@ def list_jobs(facade: TrainFacade):
               not_required_if='job_id')
 @click.option('-s', '--sort_by', type=str, help='sort by metric', required=False)
 @click.option('-p', '--page_id', type=str, help='page of the job list', required=False)
+@click.option('-a', '--ascending', is_flag=True, help='sort by increasing metric', required=False)
+@click.option('-k', '--top_k', type=int, help='only the k best scores', required=False)
+@click.option('--min', 'minimum', type=float, help='minimum score', required=False)
+@click.option('--max', 'maximum', type=float, help='maximum score', required=False)
 @health_check
 @workspace_check
 @pass_obj(TrainFacade)
-def job_info(facade: TrainFacade, job_id, ind, sort_by, page_id):
+def job_info(facade: TrainFacade, job_id, ind, sort_by, page_id, ascending, top_k, minimum, maximum):
     """
     Describe a training job.
     """
@@ -105,7 +113,8 @@ def job_info(facade: TrainFacade, job_id, ind, sort_by, page_id):
             click.style("info", bold=True),
             click.style(job_id, bold=True, fg='green', dim=True)))
 
-        data = facade.info(job_id, sort_by, page_id)
+        data = facade.info(job_id, sort_by, page_id, ascending=ascending, top_k=top_k, minimum=minimum,
+                           maximum=maximum)
 
         formatted_info = render_job_info(data, sort_by)
         click.echo(formatted_info)
@@ -371,10 +380,14 @@ def job_provenance(facade: TrainFacade, model_id, out_dir):
 @click.option('-o', '--out_dir', default=os.getcwd(),
               type=click.Path(exists=True, file_okay=False, dir_okay=True),
               required=False, help='output directory')
+@click.option('-f', '--follow', is_flag=True, help='stream logs as they arrive (until interrupted)')
+@click.option('--since', type=str, help='only logs since (ISO date, e.g. 2019-10-01T12:00:00)', required=False)
+@click.option('--tail', type=int, help='number of most recent lines (per worker)', required=False)
+@click.option('--datum_id', type=str, help='only logs of a datum', required=False)
 @health_check
 @workspace_check
 @pass_obj(TrainFacade)
-def get_logs(facade: TrainFacade, job_id, ind, out_dir):
+def get_logs(facade: TrainFacade, job_id, ind, out_dir, follow, since, tail, datum_id):
     """
     Retrieve logs from a training job.
     """
@@ -395,9 +408,15 @@ def get_logs(facade: TrainFacade, job_id, ind, out_dir):
             click.style("logs", bold=True),
             click.style(job_id, bold=True, fg='green', dim=True)))
 
-        logs = facade.get_train_logs(job_id)
-        click.echo_via_pager(logs)
-        facade.write_train_logs(job_id, logs, out_dir)
+        if follow or since or tail is not None or datum_id:
+            # lines are written as they arrive
+            for line in facade.stream_train_logs(job_id, out_dir, follow=follow, since=since, tail=tail,
+                                                 datum_id=datum_id):
+                click.echo(line)
+        else:
+            logs = facade.get_train_logs(job_id)
+            click.echo_via_pager(logs)
+            facade.write_train_logs(job_id, logs, out_dir)
 
     except Exception as e:
         handle_specific_exception(e)
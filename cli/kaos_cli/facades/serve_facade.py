@@ -5,7 +5,7 @@ import requests
 from kaos_cli.constants import BACKEND, PACHYDERM, SERVE_CACHE, ACTIVE, DEFAULT
 from kaos_cli.exceptions.exceptions import NoServingJobsError, RequestError
 from kaos_cli.services.state_service import StateService
-from kaos_cli.utils.helpers import build_dir, upload_with_progress_bar
+from kaos_cli.utils.helpers import build_dir, iter_log_lines, upload_with_progress_bar
 from kaos_cli.utils.validators import validate_index, validate_cache, invalidate_cache
 from kaos_model.api import Response, Error
 
@@ -131,6 +131,33 @@ class ServeFacade:
         with open(os.path.join(log_dir, f"{endpoint}.log"), 'w') as dst:
             dst.write(logs)
 
+    def stream_serve_logs(self, endpoint, out_dir, follow=False, since=None, tail=None):
+        base_url = self.url
+        name = self.workspace
+
+        params = {"follow": follow, "since": since, "tail": tail}
+
+        # GET /inference/<endpoint>/logs/stream
+        r = requests.get(f"{base_url}/inference/{endpoint}/logs/stream",
+                         params={k: v for k, v in params.items() if v is not None and v is not False},
+                         headers={"X-Token": self.token},
+                         stream=True)
+
+        if 400 <= r.status_code < 500:
+            err = Error.from_dict(r.json())
+            raise RequestError(err.message)
+        elif r.status_code >= 300:
+            raise RequestError(r.text)
+
+        log_dir = build_dir(out_dir, name, 'logs')
+
+        # save to file (as lines arrive)
+        with open(os.path.join(log_dir, f"{endpoint}.log"), 'w') as dst:
+            for line in iter_log_lines(r):
+                dst.write(f"{line}\n")
+                dst.flush()
+                yield line
+
     def get_build_logs(self, job_id):
         base_url = self.url
         name = self.workspace
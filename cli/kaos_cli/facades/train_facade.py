@@ -4,7 +4,7 @@ import os
 import requests
 from kaos_cli.constants import PACHYDERM, BACKEND, TRAIN_CACHE, ACTIVE, DEFAULT
 from kaos_cli.exceptions.exceptions import RequestError
-from kaos_cli.utils.helpers import build_dir, upload_with_progress_bar
+from kaos_cli.utils.helpers import build_dir, iter_log_lines, upload_with_progress_bar
 from kaos_cli.utils.validators import validate_cache, validate_index
 from kaos_model.api import Error
 
@@ -33,12 +33,13 @@ class TrainFacade:
     def token(self):
         return self.state_service.get_section(self.active_context, BACKEND, 'token')
 
-    def list(self):
+    def list(self, limit=None, since=None, state=None):
         base_url = self.url
         name = self.workspace
 
         # GET /train/<name>
-        r = requests.get(f"{base_url}/train/{name}", headers={"X-Token": self.token})
+        r = requests.get(f"{base_url}/train/{name}", params={'limit': limit, 'since': since, 'state': state},
+                         headers={"X-Token": self.token})
         if r.status_code < 300:
             return r.json()
         elif 400 <= r.status_code < 500:
@@ -47,13 +48,14 @@ class TrainFacade:
         else:
             raise RequestError(r.text)
 
-    def info(self, job_id, sort_by, page_id):
+    def info(self, job_id, sort_by, page_id, ascending=False, top_k=None, minimum=None, maximum=None):
         base_url = self.url
         name = self.workspace
 
         # GET /train/<name>/<job_id>
-        r = requests.get(f"{base_url}/train/{name}/{job_id}", params={'sort_by': sort_by, 'page_id': page_id},
-                         headers={"X-Token": self.token})
+        params = {'sort_by': sort_by, 'page_id': page_id, 'order': 'asc' if ascending else None, 'top_k': top_k,
+                  'min': minimum, 'max': maximum}
+        r = requests.get(f"{base_url}/train/{name}/{job_id}", params=params, headers={"X-Token": self.token})
 
         if r.status_code < 300:
             return r.json()
@@ -160,6 +162,33 @@ class TrainFacade:
         with open(os.path.join(log_dir, f"train-{job_id}.log"), 'w') as dst:
             dst.write(logs)
 
+    def stream_train_logs(self, job_id, out_dir, follow=False, since=None, tail=None, datum_id=None):
+        base_url = self.url
+        name = self.workspace
+
+        params = {"follow": follow, "since": since, "tail": tail, "datum_id": datum_id}
+
+        # GET /train/<name>/<job_id>/logs/stream
+        r = requests.get(f"{base_url}/train/{name}/{job_id}/logs/stream",
+                         params={k: v for k, v in params.items() if v is not None and v is not False},
+                         headers={"X-Token": self.token},
+                         stream=True)
+
+        if 400 <= r.status_code < 500:
+            err = Error.from_dict(r.json())
+            raise RequestError(err.message)
+        elif r.status_code >= 300:
+            raise RequestError(r.text)
+
+        log_dir = build_dir(out_dir, name, 'logs')
+
+        # save to file (as lines arrive)
+        with open(os.path.join(log_dir, f"train-{job_id}.log"), 'w') as dst:
+            for line in iter_log_lines(r):
+                dst.write(f"{line}\n")
+                dst.flush()
+                yield line
+
     def get_build_logs(self, job_id):
         base_url = self.url
         name = self.workspace
@@ -1,4 +1,5 @@
 import io
+import json
 import os
 import shlex
 import zipfile
@@ -7,6 +8,7 @@ from tempfile import TemporaryDirectory
 from zipfile import ZipFile
 
 import requests
+from kaos_cli.exceptions.exceptions import RequestError
 from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 from tqdm import tqdm
 
@@ -103,6 +105,21 @@ def upload_with_progress_bar(data, url, kwargs, label=None, token=None):
     return r
 
 
+def iter_log_lines(response):
+    """
+    Reads the records of a streamed log response (one JSON document per line) as they arrive.
+    :param response: streamed response (requests.get(..., stream=True))
+    :return: generator of log lines
+    """
+    for line in response.iter_lines():
+        if not line:
+            continue
+        record = json.loads(line)
+        if "error" in record:
+            raise RequestError(record["error"])
+        yield f"[{record['ts']}] {record['message']}"
+
+
 class Compressor(TemporaryDirectory):
     """
         Helper Class that compresses a source directory into a TemporaryDirectory
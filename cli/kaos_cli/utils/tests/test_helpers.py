@@ -1,7 +1,9 @@
 import os
 from tempfile import TemporaryDirectory, NamedTemporaryFile
 
-from kaos_cli.utils.helpers import Compressor, build_dir
+import pytest
+from kaos_cli.exceptions.exceptions import RequestError
+from kaos_cli.utils.helpers import Compressor, build_dir, iter_log_lines
 
 
 def create_tmp():
@@ -25,3 +27,22 @@ def test_build_dir():
     path = build_dir(t.name, "something", "something")
     assert os.path.exists(path)
     t.cleanup()
+
+
+class StreamedResponse:
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self):
+        yield from self.lines
+
+
+def test_iter_log_lines():
+    response = StreamedResponse([b'{"ts": "2019-10-01 12:00:00", "message": "epoch 0"}', b'',
+                                 b'{"error": "boom"}'])
+    lines = iter_log_lines(response)
+
+    assert next(lines) == "[2019-10-01 12:00:00] epoch 0"
+    with pytest.raises(RequestError):
+        next(lines)